@@ -1,4 +1,5 @@
 import pytest
+from django.core.cache import caches
 from rest_framework.test import APIClient
 
 pytest_plugins = 'toDoListProject.tests.factories'
@@ -13,3 +14,32 @@ def client() -> APIClient:
 def auth_client(client, user) -> APIClient:
     client.force_login(user)
     return client
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """
+    Идентификаторы в тестовой БД переиспользуются после отката транзакции,
+    поэтому закешированные роли, версии досок и страницы списков не должны переживать тест
+    """
+    for backend in caches.all():
+        backend.clear()
+    yield
+    for backend in caches.all():
+        backend.clear()
+
+
+@pytest.fixture(autouse=True)
+def local_cache(settings):
+    """
+    Тесты идут в одном процессе, поэтому версии досок и страницы списков можно хранить в кеше в памяти
+    """
+    settings.GOALS_ALLOW_LOCAL_CACHE = True
+
+
+@pytest.fixture(autouse=True)
+def fast_password_hasher(settings):
+    """
+    Фабрика пользователей хеширует пароль; в тестах стойкость хеша не нужна, а PBKDF2 медленный
+    """
+    settings.PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
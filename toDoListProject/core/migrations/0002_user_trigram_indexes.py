@@ -0,0 +1,38 @@
+# Generated by Django 4.1.7 on 2026-10-18 19:20
+
+from django.db import migrations
+
+# Django строит icontains/istartswith на PostgreSQL как UPPER(колонка::text) LIKE UPPER(...),
+# поэтому триграммный индекс строится по тому же выражению
+TRIGRAM_COLUMNS = ("username", "email", "first_name", "last_name")
+
+
+def create_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for column in TRIGRAM_COLUMNS:
+        schema_editor.execute(
+            f"CREATE INDEX CONCURRENTLY IF NOT EXISTS core_user_{column}_trgm_idx "
+            f"ON core_user USING gin ((UPPER({column}::text)) gin_trgm_ops)"
+        )
+
+
+def drop_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for column in TRIGRAM_COLUMNS:
+        schema_editor.execute(f"DROP INDEX CONCURRENTLY IF EXISTS core_user_{column}_trgm_idx")
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY не выполняется в транзакции, зато не блокирует запись в таблицу пользователей
+    atomic = False
+
+    dependencies = [
+        ('core', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_indexes, drop_indexes),
+    ]
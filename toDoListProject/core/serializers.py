@@ -99,3 +99,20 @@ class UpdatePasswordSerializer(serializers.Serializer):
 
     def create(self, validated_data):
         pass
+
+
+class UserAutocompleteQuerySerializer(serializers.Serializer):
+    """
+    Параметры подсказки пользователей: q – начало username, limit – число подсказок
+    """
+    q = serializers.CharField(min_length=2, max_length=150)
+    limit = serializers.IntegerField(min_value=1, max_value=20, default=10)
+
+
+class UserAutocompleteSerializer(serializers.ModelSerializer):
+    """
+    Сериалайзер подсказки пользователя: без email, подсказки видны всем авторизованным пользователям
+    """
+    class Meta:
+        model = User
+        fields = ["id", "username", "first_name", "last_name"]
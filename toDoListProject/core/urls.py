@@ -1,6 +1,7 @@
 from django.urls import path
 
-from toDoListProject.core.views import UserRegistrationView, LoginView, UpdateUserView, PasswordUpdateView
+from toDoListProject.core.views import UserRegistrationView, LoginView, UpdateUserView, PasswordUpdateView, \
+    UserAutocompleteView
 
 app_name = 'toDoListProject'
 urlpatterns = [
@@ -8,5 +9,6 @@ urlpatterns = [
     path('login', LoginView.as_view(), name="login"),
     path('profile', UpdateUserView.as_view(), name="user_details"),
     path('update_password', PasswordUpdateView.as_view(), name="change_password"),
+    path('autocomplete', UserAutocompleteView.as_view(), name="user_autocomplete"),
 ]
 
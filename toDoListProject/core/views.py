@@ -1,11 +1,15 @@
 from django.contrib.auth import login, authenticate, logout
+from django.core.cache import cache
+from django.db.models.functions import Length
 
 from rest_framework import status, generics, permissions
 from rest_framework.response import Response
 
 from toDoListProject.core.models import User
 from toDoListProject.core.serializers import CreateUserSerializer, LoginSerializer, UserSerializer, \
-    UpdatePasswordSerializer
+    UpdatePasswordSerializer, UserAutocompleteQuerySerializer, UserAutocompleteSerializer
+
+AUTOCOMPLETE_CACHE_TIMEOUT = 60
 
 
 class UserRegistrationView(generics.CreateAPIView):
@@ -52,3 +56,30 @@ class PasswordUpdateView(generics.UpdateAPIView):
 
     def get_object(self):
         return self.request.user
+
+
+class UserAutocompleteView(generics.GenericAPIView):
+    """
+    View подсказок пользователей для добавления участников доски: активные пользователи, чей username
+    начинается с q (без учета регистра), короткие совпадения первыми. Сам пользователь в подсказки не входит.
+    Подсказки по одному и тому же началу ненадолго кешируются для всех пользователей
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    serializer_class = UserAutocompleteQuerySerializer
+
+    def get(self, request, *args, **kwargs) -> Response:
+        serializer = self.get_serializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        prefix, limit = serializer.validated_data["q"].lower(), serializer.validated_data["limit"]
+
+        key = f"core:autocomplete:{limit}:{prefix}"
+        users = cache.get(key)
+        if users is None:
+            # На одну подсказку больше: после исключения самого пользователя их все равно останется limit
+            users = UserAutocompleteSerializer(
+                User.objects.filter(username__istartswith=prefix, is_active=True)
+                .order_by(Length("username"), "username")[:limit + 1],
+                many=True,
+            ).data
+            cache.set(key, users, AUTOCOMPLETE_CACHE_TIMEOUT)
+        return Response([user for user in users if user["id"] != request.user.id][:limit])
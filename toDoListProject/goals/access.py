@@ -0,0 +1,125 @@
+from typing import Iterable, Optional
+
+from django.core.cache import cache
+from django.db import transaction
+
+from toDoListProject.core.serializers import UserSerializer
+from toDoListProject.goals.models import BoardParticipant, Goal, GoalCategory, GoalComment
+from toDoListProject.goals.versions import bump_board_versions, bump_user_versions
+
+ROLE_CACHE_TIMEOUT = 60 * 60
+NO_ROLE = 0  # В кеше сохраняем и отсутствие доступа, чтобы не ходить в БД за чужими досками
+# Поля пользователя, которые выводятся в ответах досок (автор категорий, целей, комментариев; участники)
+USER_DATA_FIELDS = frozenset(UserSerializer.Meta.fields) - {"id"}
+
+
+def role_cache_key(user_id: int, board_id: int) -> str:
+    return f"goals:role:{user_id}:{board_id}"
+
+
+def get_board_role(user_id: int, board_id: int) -> Optional[int]:
+    """
+    Роль пользователя на доске (BoardParticipant.Role) или None, если пользователь не участник
+    или доска удалена.
+    Результат кешируется между запросами, поэтому повторные проверки прав не обращаются к БД
+    """
+    key = role_cache_key(user_id, board_id)
+    role = cache.get(key)
+    if role is None:
+        role = BoardParticipant.objects.filter(
+            user_id=user_id, board_id=board_id, board__is_deleted=False
+        ).values_list("role", flat=True).first() or NO_ROLE
+        cache.set(key, role, ROLE_CACHE_TIMEOUT)
+    return role or None
+
+
+def invalidate_board_roles(board_id: int, user_ids: Iterable[int]) -> None:
+    """
+    Сброс закешированных ролей после изменения состава участников доски.
+    Заодно меняются версии доски и набора досок этих пользователей
+    """
+    user_ids = set(user_ids)
+    bump_board_versions([board_id])
+    bump_user_versions(user_ids)
+    keys = [role_cache_key(user_id, board_id) for user_id in user_ids]
+    cache.delete_many(keys)
+    # Повторно после коммита: параллельный запрос мог успеть закешировать роль из еще не измененных данных
+    transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def user_board_ids(user_id: int) -> set:
+    """
+    Доски, в ответах которых есть данные пользователя: где он участник или автор категорий, целей, комментариев
+    """
+    board_ids = set(BoardParticipant.objects.filter(user_id=user_id).values_list("board_id", flat=True))
+    for model in (GoalCategory, Goal, GoalComment):
+        board_ids.update(model.objects.filter(user_id=user_id).values_list("board_id", flat=True).distinct())
+    return board_ids
+
+
+def bump_user_boards(sender, instance, update_fields=None, raw=False, **kwargs) -> None:
+    """
+    Обработчик post_save пользователя: после изменения профиля версии его досок меняются, чтобы условный GET
+    и кеш страниц не отдавали старые имя и email. Сохранения без этих полей (last_login при входе) не считаются
+    """
+    if raw or (update_fields is not None and not USER_DATA_FIELDS & set(update_fields)):
+        return
+    bump_board_versions(user_board_ids(instance.pk))
+
+
+class AccessContext:
+    """
+    Права пользователя в рамках одного запроса. Вычисляется лениво и запоминается на объекте запроса,
+    поэтому view, классы прав и валидаторы сериалайзеров не повторяют одни и те же запросы к участникам
+    """
+
+    def __init__(self, user):
+        self.user = user
+        self._roles = {}
+        self._all_roles = None
+
+    def role(self, board_id: int) -> Optional[int]:
+        """
+        Роль пользователя на доске или None
+        """
+        if self._all_roles is not None:
+            return self._all_roles.get(board_id)
+        if board_id not in self._roles:
+            self._roles[board_id] = get_board_role(self.user.id, board_id) if self.user.is_authenticated else None
+        return self._roles[board_id]
+
+    @property
+    def roles(self) -> dict:
+        """
+        Все роли пользователя: {board_id: role} для неудаленных досок, одним запросом
+        """
+        if self._all_roles is None:
+            self._all_roles = dict(
+                BoardParticipant.objects.filter(user_id=self.user.id, board__is_deleted=False)
+                .values_list("board_id", "role")
+            ) if self.user.is_authenticated else {}
+        return self._all_roles
+
+    @property
+    def board_ids(self) -> set:
+        return set(self.roles)
+
+    def can_read(self, board_id: int) -> bool:
+        return self.role(board_id) is not None
+
+    def can_write(self, board_id: int) -> bool:
+        return self.role(board_id) in (BoardParticipant.Role.owner, BoardParticipant.Role.writer)
+
+    def is_owner(self, board_id: int) -> bool:
+        return self.role(board_id) == BoardParticipant.Role.owner
+
+
+def get_access_context(request) -> AccessContext:
+    """
+    AccessContext текущего запроса, создается при первом обращении
+    """
+    context = getattr(request, "goals_access", None)
+    if context is None or context.user != request.user:
+        context = AccessContext(request.user)
+        request.goals_access = context
+    return context
@@ -1,24 +1,73 @@
 from django.contrib import admin
 
-from toDoListProject.goals.models import GoalCategory, Goal, GoalComment
+from toDoListProject.goals.models import GoalCategory, Goal, GoalComment, BoardArchiveJob, ChangeLogEntry
+from toDoListProject.goals.pagination import EstimatedCountPaginator
+from toDoListProject.goals.search import search_queryset
+
+
+class LargeTableAdminMixin:
+    """
+    Список админки для больших таблиц: число строк – оценка вместо COUNT(*), без второго подсчета
+    «всего записей», страница по индексу в порядке -id; связанные объекты выбираются по id, а не списком
+    """
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    ordering = ("-id",)
+
+
+class FullTextSearchAdminMixin:
+    """
+    Поиск в списке админки через полнотекстовый индекс (goals/search.py) вместо icontains по search_fields
+    """
+
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term.strip():
+            return queryset, False
+        return search_queryset(queryset, search_term, rank=False), False
 
 
 @admin.register(GoalCategory)
-class GoalCategoryAdmin(admin.ModelAdmin):
+class GoalCategoryAdmin(LargeTableAdminMixin, admin.ModelAdmin):
     list_display = ("id", "title", "user", "created", "updated")
-    search_fields = ("title", "user")
+    search_fields = ("title", "user__username")
+    list_select_related = ("user",)
+    raw_id_fields = ("user", "board")
 
 
 @admin.register(Goal)
-class GoalAdmin(admin.ModelAdmin):
+class GoalAdmin(FullTextSearchAdminMixin, LargeTableAdminMixin, admin.ModelAdmin):
     list_display = ("id", "title", "user", "description", "category", "status", "priority", "due_date", "created", "updated")
     search_fields = ["title", "description"]
     list_filter = ("status", "priority",)
     list_display_links = ("title", "user",)
+    list_select_related = ("user", "category")
+    raw_id_fields = ("user", "category")
 
 
 @admin.register(GoalComment)
-class GoalCommentAdmin(admin.ModelAdmin):
+class GoalCommentAdmin(FullTextSearchAdminMixin, LargeTableAdminMixin, admin.ModelAdmin):
     list_display = ("id", "text", "goal", "user", "created", "updated")
     search_fields = ["text"]
     list_display_links = ("text", "goal",)
+    list_select_related = ("goal", "user")
+    raw_id_fields = ("goal", "user")
+
+
+@admin.register(BoardArchiveJob)
+class BoardArchiveJobAdmin(admin.ModelAdmin):
+    list_display = ("id", "board", "status", "goals_archived", "goals_total", "categories_deleted",
+                    "categories_total", "created", "updated")
+    list_filter = ("status",)
+    list_select_related = ("board",)
+
+
+@admin.register(ChangeLogEntry)
+class ChangeLogEntryAdmin(LargeTableAdminMixin, admin.ModelAdmin):
+    list_display = ("id", "board_id", "kind", "object_id", "action", "created")
+    list_filter = ("kind", "action")
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
@@ -1,6 +1,15 @@
 from django.apps import AppConfig
+from django.conf import settings
+from django.db.models.signals import post_migrate, post_save
 
 
 class GoalsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'toDoListProject.goals'
+
+    def ready(self):
+        from toDoListProject.goals.search import ensure_search_indexes
+        post_migrate.connect(ensure_search_indexes, sender=self)
+        from toDoListProject.goals.access import bump_user_boards
+        # Данные пользователей выводятся в ответах досок: их изменение меняет версии досок
+        post_save.connect(bump_user_boards, sender=settings.AUTH_USER_MODEL)
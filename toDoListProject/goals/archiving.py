@@ -0,0 +1,109 @@
+from typing import Callable, Optional
+
+from django.db import transaction
+from django.utils import timezone
+
+from toDoListProject.goals.access import invalidate_board_roles
+from toDoListProject.goals.models import Board, BoardArchiveJob, BoardParticipant, BoardSummary, ChangeLogEntry, \
+    Goal, GoalCategory
+from toDoListProject.goals.versions import bump_board_versions
+
+ARCHIVE_CHUNK_SIZE = 1000
+
+
+def schedule_board_archive(board: Board) -> BoardArchiveJob:
+    """
+    Удаление доски: сама доска помечается is_deleted сразу, а архивация ее категорий и целей
+    ставится в очередь. Данные доски перестают быть доступны сразу – доступ проверяется по участникам
+    неудаленных досок (board_participation, get_board_role)
+    """
+    with transaction.atomic():
+        board.is_deleted = True
+        board.save(update_fields=("is_deleted", "updated"))
+        job, _ = BoardArchiveJob.objects.get_or_create(board=board)
+        # Все цели доски будут архивированы – сводка больше не нужна
+        BoardSummary.objects.filter(board=board).delete()
+        invalidate_board_roles(board.pk, BoardParticipant.objects.filter(board=board).values_list("user_id", flat=True))
+    return job
+
+
+def archive_chunk(queryset, values: dict, chunk_size: int) -> int:
+    """
+    Изменяет до chunk_size строк queryset в короткой транзакции и возвращает их число.
+    queryset должен исключать уже измененные строки: тогда прерванную архивацию можно просто запустить снова.
+    Строки записываются в журнал изменений как архивированные
+    """
+    with transaction.atomic():
+        rows = list(queryset.order_by("pk").values_list("pk", "board_id")[:chunk_size])
+        if rows:
+            queryset.model.objects.filter(pk__in=[pk for pk, _ in rows]).update(updated=timezone.now(), **values)
+            ChangeLogEntry.record(queryset.model.change_kind, ChangeLogEntry.Action.archive,
+                                  [(board_id, pk) for pk, board_id in rows])
+    return len(rows)
+
+
+def claim_archive_job(job_id: int) -> Optional[BoardArchiveJob]:
+    """
+    Блокирует незавершенную задачу до конца текущей транзакции. None – задачу уже обрабатывает другой
+    обработчик (строка заблокирована, SKIP LOCKED) или она завершена
+    """
+    return (BoardArchiveJob.objects.select_for_update(skip_locked=True)
+            .exclude(status=BoardArchiveJob.Status.done).filter(pk=job_id).first())
+
+
+def run_archive_job(job: BoardArchiveJob, chunk_size: int = ARCHIVE_CHUNK_SIZE,
+                    progress: Optional[Callable[[BoardArchiveJob], None]] = None) -> BoardArchiveJob:
+    """
+    Архивирует цели и удаляет категории доски порциями по chunk_size строк.
+    Каждая порция выполняется под блокировкой задачи (claim_archive_job) вместе с сохранением прогресса,
+    поэтому несколько обработчиков не считают одни и те же строки дважды: занятую задачу обработчик
+    пропускает и возвращает как есть. После каждой порции прогресс передается в progress
+    """
+    goals = Goal.objects.filter(board_id=job.board_id).exclude(status=Goal.Status.archived)
+    categories = GoalCategory.objects.filter(board_id=job.board_id, is_deleted=False)
+    with transaction.atomic():
+        claimed = claim_archive_job(job.pk)
+        if claimed is None:
+            return job
+        job = claimed
+        if job.status != BoardArchiveJob.Status.running:
+            job.status = BoardArchiveJob.Status.running
+            job.goals_total = job.goals_archived + goals.count()
+            job.categories_total = job.categories_deleted + categories.count()
+            job.save(update_fields=("status", "goals_total", "categories_total", "updated"))
+
+    for queryset, values, counter in (
+        (goals, {"status": Goal.Status.archived}, "goals_archived"),
+        (categories, {"is_deleted": True}, "categories_deleted"),
+    ):
+        while True:
+            with transaction.atomic():
+                claimed = claim_archive_job(job.pk)
+                if claimed is None:
+                    return job
+                job = claimed
+                done = archive_chunk(queryset, values, chunk_size)
+                if done:
+                    setattr(job, counter, getattr(job, counter) + done)
+                    job.save(update_fields=(counter, "updated"))
+            if not done:
+                break
+            if progress is not None:
+                progress(job)
+
+    with transaction.atomic():
+        claimed = claim_archive_job(job.pk)
+        if claimed is None:
+            return job
+        job = claimed
+        job.status = BoardArchiveJob.Status.done
+        job.save(update_fields=("status", "updated"))
+    bump_board_versions([job.board_id])
+    return job
+
+
+def pending_archive_jobs():
+    """
+    Незавершенные задачи, в том числе прерванные во время выполнения. Задачу захватывает run_archive_job
+    """
+    return BoardArchiveJob.objects.exclude(status=BoardArchiveJob.Status.done).order_by("pk")
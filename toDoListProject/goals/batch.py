@@ -0,0 +1,195 @@
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import QuerySet
+from django.utils import timezone
+from rest_framework import status
+
+from toDoListProject.goals.access import get_access_context
+from toDoListProject.goals.models import BoardSummary, ChangeLogEntry, Goal, GoalCategory, GoalComment, move_goals
+from toDoListProject.goals.serializers import GoalBatchItemSerializer, GoalBatchOperationSerializer as Operation, \
+    GoalSerializer
+from toDoListProject.goals.summary import count_goals, goal_delta, goal_summary_rows, merge_deltas, negate
+from toDoListProject.goals.versions import bump_board_versions
+
+
+class GoalBatch:
+    """
+    Выполнение пакета операций над целями в одной транзакции.
+
+    Категории и изменяемые цели загружаются двумя запросами на весь пакет, роль пользователя
+    на каждой доске проверяется один раз (AccessContext), а запись идет через bulk_create/bulk_update
+    с проставлением created/updated и записью в журнал изменений, как это делает DatesModelMixin.save.
+    Ошибка в одной операции не отменяет остальные: результат возвращается для каждой операции отдельно
+    """
+
+    def __init__(self, request, operations: list):
+        self.request = request
+        self.access = get_access_context(request)
+        self.operations = operations
+        self.results = [None] * len(operations)
+
+    def error(self, index: int, code: int, errors) -> None:
+        self.results[index] = {"status": code, "errors": errors}
+
+    def run(self) -> list:
+        now = timezone.now()
+        with transaction.atomic():
+            categories = self.load_categories()
+            goals = self.load_goals()
+            created, updated = [], {}
+            for index, operation in enumerate(self.operations):
+                if operation["op"] == Operation.CREATE:
+                    goal = self.prepare_create(index, operation, categories)
+                    if goal is not None:
+                        goal.created = goal.updated = now
+                        created.append((index, goal))
+                    continue
+
+                goal = goals.get(operation["id"])
+                if goal is None:
+                    self.error(index, status.HTTP_404_NOT_FOUND, {"id": "Not found."})
+                elif goal.pk in updated:
+                    self.error(index, status.HTTP_400_BAD_REQUEST, {"id": "Goal is already changed in this batch."})
+                elif not self.access.can_write(goal.board_id):
+                    self.error(index, status.HTTP_403_FORBIDDEN, {"id": "Permission Denied"})
+                else:
+                    fields = self.prepare_update(index, operation, goal, categories)
+                    if fields is not None:
+                        goal.updated = now
+                        updated[goal.pk] = (index, goal, fields | {"updated"})
+
+            self.save(created, list(updated.values()))
+        return self.results
+
+    def load_categories(self) -> dict:
+        ids = set()
+        for operation in self.operations:
+            try:
+                ids.add(int(operation.get("data", {}).get("category")))
+            except (TypeError, ValueError):
+                continue
+        return GoalCategory.objects.in_bulk(ids) if ids else {}
+
+    def load_goals(self) -> dict:
+        ids = {operation["id"] for operation in self.operations if operation["op"] != Operation.CREATE}
+        if not ids:
+            return {}
+        return Goal.objects.alive().select_related("user").select_for_update(of=("self",)).in_bulk(ids)
+
+    def get_item_serializer(self, categories: dict, **kwargs) -> GoalBatchItemSerializer:
+        return GoalBatchItemSerializer(context={"request": self.request, "categories": categories}, **kwargs)
+
+    def prepare_create(self, index: int, operation: dict, categories: dict):
+        serializer = self.get_item_serializer(categories, data=operation["data"])
+        if not serializer.is_valid():
+            self.error(index, status.HTTP_400_BAD_REQUEST, serializer.errors)
+            return None
+        goal = Goal(**serializer.validated_data)
+        goal.board_id = goal.category.board_id
+        return goal
+
+    def prepare_update(self, index: int, operation: dict, goal: Goal, categories: dict):
+        """
+        Изменяет цель в памяти и возвращает множество измененных полей
+        """
+        if operation["op"] == Operation.ARCHIVE:
+            goal.status = Goal.Status.archived
+            return {"status"}
+
+        serializer = self.get_item_serializer(categories, instance=goal, data=operation["data"], partial=True)
+        if not serializer.is_valid():
+            self.error(index, status.HTTP_400_BAD_REQUEST, serializer.errors)
+            return None
+        fields = set()
+        for name, value in serializer.validated_data.items():
+            setattr(goal, name, value)
+            fields.add(name)
+        if "category" in fields and goal.board_id != goal.category.board_id:
+            goal.board_id = goal.category.board_id
+            fields.add("board")
+        return fields
+
+    def save(self, created: list, updated: list) -> None:
+        boards = set()
+        deltas = []
+        if created:
+            Goal.objects.bulk_create([goal for _, goal in created])
+            ChangeLogEntry.record(ChangeLogEntry.Kind.goal, ChangeLogEntry.Action.create,
+                                  [(goal.board_id, goal.pk) for _, goal in created])
+            for index, goal in created:
+                boards.add(goal.board_id)
+                deltas.append(goal_delta(None, None, goal.board_id, goal.get_summary_values()))
+                self.results[index] = {"status": status.HTTP_201_CREATED, "data": GoalSerializer(goal).data}
+
+        # Каждая группа обновляет только свои поля, чтобы не перезаписать параллельные изменения остальных
+        groups = defaultdict(list)
+        moved = defaultdict(list)
+        changes = defaultdict(list)
+        for index, goal, fields in updated:
+            groups[frozenset(fields)].append(goal)
+            boards.update((goal._loaded_board_id, goal.board_id))
+            if "board" in fields:
+                moved[goal.board_id].append((goal.pk, goal._loaded_board_id))
+            archived = goal.status == Goal.Status.archived and goal._loaded_summary[0] != Goal.Status.archived
+            changes[ChangeLogEntry.Action.archive if archived else ChangeLogEntry.Action.update].append(
+                (goal.board_id, goal.pk)
+            )
+            deltas.append(goal_delta(goal._loaded_board_id, goal._loaded_summary, goal.board_id,
+                                     goal.get_summary_values()))
+            self.results[index] = {"status": status.HTTP_200_OK, "data": GoalSerializer(goal).data}
+        for fields, goals in groups.items():
+            Goal.objects.bulk_update(goals, sorted(fields))
+        for action, objects in changes.items():
+            ChangeLogEntry.record(ChangeLogEntry.Kind.goal, action, objects)
+        for board_id, goals in moved.items():
+            # Комментарии переносятся на доску цели вместе с ней (как в Goal.save)
+            move_goals(goals, board_id)
+        BoardSummary.apply(merge_deltas(*deltas))
+        bump_board_versions(boards)
+
+
+def bulk_change_goals(queryset: QuerySet, changes: dict, dry_run: bool = False) -> dict:
+    """
+    Меняет статус, приоритет и/или категорию всех целей queryset одним UPDATE, не загружая экземпляры
+    (updated проставляется в том же UPDATE). Для журнала изменений читаются только id целей и их доски.
+    Возвращает число целей – всего и по доскам (до изменения).
+    При dry_run только считает цели.
+    Сводки досок пересчитываются по тому же GROUP BY, по которому считаются цели
+    """
+    with transaction.atomic():
+        rows = list(goal_summary_rows(queryset))
+        by_board = defaultdict(int)
+        for row in rows:
+            by_board[row["board_id"]] += row["count"]
+        result = {"dry_run": dry_run, "count": sum(by_board.values()), "by_board": dict(by_board)}
+        if dry_run or not by_board:
+            return result
+
+        values = {name: changes[name] for name in ("status", "priority") if name in changes}
+        boards = set(by_board)
+        category = changes.get("category")
+        action = (ChangeLogEntry.Action.archive if changes.get("status") == Goal.Status.archived
+                  else ChangeLogEntry.Action.update)
+        if category is not None:
+            values.update(category_id=category.pk, board_id=category.board_id)
+            boards.add(category.board_id)
+        # id целей читаются до UPDATE: после него цели могут перестать подходить под фильтр queryset
+        goals = list(queryset.values_list("id", "board_id"))
+        result["count"] = queryset.update(updated=timezone.now(), **values)
+        if category is not None:
+            # Комментарии переносятся на доску новой категории вместе с целями (как в Goal.save)
+            move_goals(goals, category.board_id)
+            goals = [(pk, category.board_id) for pk, _ in goals]
+        ChangeLogEntry.record(ChangeLogEntry.Kind.goal, action, [(board_id, pk) for pk, board_id in goals])
+
+        changed = []
+        for row in rows:
+            row = dict(row)
+            if category is not None:
+                row.update(board_id=category.board_id, category_id=category.pk)
+            row.update({name: changes[name] for name in ("status", "priority") if name in changes})
+            changed.append(row)
+        BoardSummary.apply(merge_deltas(negate(count_goals(rows)), count_goals(changed)))
+        bump_board_versions(boards)
+    return result
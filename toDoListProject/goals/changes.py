@@ -0,0 +1,205 @@
+import datetime
+from typing import Optional
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from toDoListProject.goals.models import Board, BoardParticipant, ChangeLogEntry, Goal, GoalCategory, GoalComment, \
+    board_participation
+from toDoListProject.goals.projections import get_projection
+from toDoListProject.goals.serializers import BoardListSerializer, BoardParticipantSerializer, \
+    GoalCategorySerializer, GoalCommentSerializer, GoalSerializer
+
+CHANGES_LIMIT = 500
+# Записи журнала отдаются только через столько секунд после записи (см. settled_until)
+CHANGES_LAG_SECONDS = 2
+CHANGES_RETENTION_DAYS = 30
+COMPACT_CHUNK_SIZE = 10000
+
+Kind, Action = ChangeLogEntry.Kind, ChangeLogEntry.Action
+
+
+def board_data(user, ids: list) -> dict:
+    return projected(Board.objects.visible_to(user), BoardListSerializer, ids)
+
+
+def participant_data(user, ids: list) -> dict:
+    participants = BoardParticipant.objects.filter(board_participation(user, "board_id"))
+    return projected(participants, BoardParticipantSerializer, ids)
+
+
+def category_data(user, ids: list) -> dict:
+    return projected(GoalCategory.objects.visible_to(user), GoalCategorySerializer, ids)
+
+
+def goal_data(user, ids: list) -> dict:
+    return projected(Goal.objects.visible_to(user), GoalSerializer, ids)
+
+
+def comment_data(user, ids: list) -> dict:
+    return projected(GoalComment.objects.visible_to(user), GoalCommentSerializer, ids)
+
+
+def projected(queryset, serializer_class, ids: list) -> dict:
+    """
+    Текущие данные объектов ids в формате serializer_class, одним запросом: {id: данные}
+    """
+    projection = get_projection(serializer_class)
+    rows = queryset.filter(pk__in=ids).order_by().values(*projection.columns)
+    return {item["id"]: item for item in projection.represent(rows)}
+
+
+DATA_LOADERS = {
+    Kind.board: board_data,
+    Kind.participant: participant_data,
+    Kind.category: category_data,
+    Kind.goal: goal_data,
+    Kind.comment: comment_data,
+}
+
+
+def oldest_write_transaction_start(using: str = "default") -> Optional[datetime.datetime]:
+    """
+    Начало самой старой незавершенной транзакции, которая уже что-то записала (PostgreSQL, pg_stat_activity).
+    На других БД – None: SQLite пишет одной транзакцией за раз
+    """
+    connection = connections[using]
+    if connection.vendor != "postgresql":
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT min(xact_start) FROM pg_stat_activity "
+            "WHERE datname = current_database() AND backend_xid IS NOT NULL AND pid <> pg_backend_pid()"
+        )
+        return cursor.fetchone()[0]
+
+
+def settled_until() -> datetime.datetime:
+    """
+    Граница отдаваемых записей журнала по created. Записи вставляются в транзакции изменения, а видны после
+    ее коммита, поэтому запись с меньшим id может появиться позже уже отданной метки. Записи незавершенной
+    транзакции созданы не раньше ее начала, так что граница не позже начала самой старой пишущей транзакции;
+    запас GOALS_CHANGES_LAG_SECONDS покрывает время между created и INSERT
+    """
+    until = timezone.now()
+    oldest = oldest_write_transaction_start()
+    if oldest is not None:
+        until = min(until, oldest)
+    return until - datetime.timedelta(seconds=getattr(settings, "GOALS_CHANGES_LAG_SECONDS", CHANGES_LAG_SECONDS))
+
+
+def latest_change_id(until: datetime.datetime) -> int:
+    return ChangeLogEntry.objects.filter(created__lte=until).order_by("-id").values_list("id", flat=True).first() or 0
+
+
+def is_compacted_since(since: int) -> bool:
+    """
+    Могли ли записи после since быть удалены по сроку хранения (compact_changes). Самая новая запись
+    не удаляется никогда, поэтому первая оставшаяся запись показывает, докуда журнал обрезан
+    """
+    oldest = ChangeLogEntry.objects.order_by("id").values_list("id", flat=True).first()
+    return oldest is not None and since < oldest - 1
+
+
+def collect_changes(user, since: Optional[int] = None, limit: int = CHANGES_LIMIT) -> dict:
+    """
+    Изменения на досках пользователя после метки since (id записи журнала), не больше limit записей.
+
+    Записи схлопываются по объекту: для каждого объекта – последнее действие (create, update, archive, delete)
+    и текущие данные в формате API списков (data, для create и update). data: null – объект уже не виден
+    пользователю, его нужно убрать так же, как при archive/delete. Удаленная цель уносит свои комментарии.
+    next – метка для следующего запроса, has_more – есть ли еще записи сразу после нее.
+    Без since возвращается только текущая метка; reset – журнал до since уже удален, данные нужно
+    загрузить заново (снимком доски) и продолжить с next. Записи доски, из участников которой пользователя
+    удалили, ему больше не видны: потерю доступа клиент видит по списку досок
+    """
+    until = settled_until()
+    result = {"changes": [], "next": since, "has_more": False, "reset": False}
+    if since is None or is_compacted_since(since):
+        result.update(next=latest_change_id(until), reset=since is not None)
+        return result
+
+    # Доски, где пользователь участник, в том числе удаленные: удаление доски тоже изменение
+    board_ids = list(BoardParticipant.objects.filter(user_id=user.id).values_list("board_id", flat=True))
+    rows = list(
+        ChangeLogEntry.objects.filter(board_id__in=board_ids, id__gt=since, created__lte=until)
+        .order_by("id").values_list("id", "board_id", "kind", "object_id", "action")[:limit + 1]
+    )
+    result["has_more"] = len(rows) > limit
+    rows = rows[:limit]
+    if result["has_more"]:
+        result["next"] = rows[-1][0]
+    else:
+        # Чужие изменения тоже сдвигают метку: иначе у неактивного клиента она устарела бы к удалению журнала
+        result["next"] = max(since, latest_change_id(until))
+
+    latest = {}
+    for _entry_id, board_id, kind, object_id, action in rows:
+        latest.pop((kind, object_id), None)
+        latest[(kind, object_id)] = (board_id, action)
+    wanted = {}
+    for (kind, object_id), (_board_id, action) in latest.items():
+        if action in (Action.create, Action.update):
+            wanted.setdefault(kind, []).append(object_id)
+    data = {kind: DATA_LOADERS[kind](user, ids) for kind, ids in wanted.items()}
+
+    for (kind, object_id), (board_id, action) in latest.items():
+        change = {"type": Kind(kind).name, "id": object_id, "board": board_id, "action": Action(action).name}
+        if kind in data:
+            change["data"] = data[kind].get(object_id)
+        result["changes"].append(change)
+    return result
+
+
+def delete_expired_changes(before: datetime.datetime, chunk_size: int = COMPACT_CHUNK_SIZE) -> int:
+    """
+    Удаляет записи журнала старше before порциями по chunk_size, кроме самой новой записи
+    (по ней клиенты узнают, что журнал обрезан). Возвращает число удаленных записей
+    """
+    newest = ChangeLogEntry.objects.order_by("-id").values_list("id", flat=True).first()
+    if newest is None:
+        return 0
+    expired = ChangeLogEntry.objects.filter(created__lt=before, id__lt=newest)
+    return delete_in_chunks(expired, chunk_size)
+
+
+def collapse_changes(before: datetime.datetime, chunk_size: int = COMPACT_CHUNK_SIZE) -> int:
+    """
+    Удаляет записи старше before, для которых на той же доске есть более новая запись того же объекта:
+    ответ collect_changes все равно содержит только последнее действие. Запись на другой доске
+    (перенос цели) не заменяет запись прежней доски – ее клиенты иначе не узнали бы о переносе
+    """
+    newer = ChangeLogEntry.objects.filter(
+        board_id=OuterRef("board_id"), kind=OuterRef("kind"), object_id=OuterRef("object_id"), id__gt=OuterRef("id")
+    )
+    return delete_in_chunks(ChangeLogEntry.objects.filter(Exists(newer), created__lt=before), chunk_size)
+
+
+def delete_in_chunks(queryset, chunk_size: int) -> int:
+    deleted = 0
+    last_id = 0
+    while True:
+        # Короткие транзакции: запись в журнал не ждет окончания всей очистки
+        with transaction.atomic():
+            ids = list(queryset.filter(id__gt=last_id).order_by("id").values_list("id", flat=True)[:chunk_size])
+            if not ids:
+                return deleted
+            ChangeLogEntry.objects.filter(pk__in=ids).delete()
+        deleted += len(ids)
+        last_id = ids[-1]
+
+
+def compact_changes(retention_days: Optional[int] = None, collapse_after: Optional[datetime.timedelta] = None,
+                    chunk_size: int = COMPACT_CHUNK_SIZE) -> dict:
+    """
+    Ограничивает размер журнала: удаляет записи старше retention_days (GOALS_CHANGES_RETENTION_DAYS)
+    и схлопывает записи старше collapse_after до последней записи по каждому объекту
+    """
+    if retention_days is None:
+        retention_days = getattr(settings, "GOALS_CHANGES_RETENTION_DAYS", CHANGES_RETENTION_DAYS)
+    now = timezone.now()
+    expired = delete_expired_changes(now - datetime.timedelta(days=retention_days), chunk_size)
+    collapsed = collapse_changes(now - (collapse_after or datetime.timedelta(hours=1)), chunk_size)
+    return {"expired": expired, "collapsed": collapsed}
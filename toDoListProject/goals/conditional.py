@@ -0,0 +1,65 @@
+import hashlib
+import time
+from typing import Iterable, Optional
+
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+
+from toDoListProject.goals.versions import get_board_versions, get_user_version, versions_are_shared
+
+
+class ConditionalGetMixin:
+    """
+    Условный GET (ETag / Last-Modified) для опрашиваемых клиентом эндпоинтов.
+
+    Валидаторы строятся из версий досок (goals/versions.py), а не из данных ответа: версия доски меняется
+    при каждом сохранении доски, ее участников, категорий, целей и комментариев. Поэтому на
+    If-None-Match / If-Modified-Since можно ответить 304 до выполнения запроса списка и сериализации.
+    Если версии хранятся в кеше одного процесса (versions_are_shared), изменения из других процессов
+    их не увеличивают, и условный GET отключается
+    """
+
+    def get_version_board_ids(self) -> Optional[Iterable[int]]:
+        """
+        Доски, от которых зависит ответ. None – условный GET не применяется (например, нет доступа,
+        и ответ с ошибкой должен сформировать обычный обработчик)
+        """
+        raise NotImplementedError
+
+    def get_validators(self) -> Optional[tuple]:
+        if not versions_are_shared():
+            return None
+        board_ids = self.get_version_board_ids()
+        if board_ids is None:
+            return None
+        user_id = self.request.user.id
+        board_versions = sorted(get_board_versions(board_ids).items())
+        # Версия пользователя меняется, когда его добавляют на доску или убирают с нее
+        user_version = get_user_version(user_id)
+        key = repr((
+            user_id, user_version, board_versions,
+            self.request.accepted_renderer.format, self.request.get_full_path(),
+        ))
+        etag = quote_etag(hashlib.md5(key.encode()).hexdigest())
+        last_modified = max([user_version] + [version for _, version in board_versions]) // 1_000_000
+        if last_modified >= int(time.time()):
+            # Last-Modified точен до секунды: пока секунда изменения не закончилась, в ней возможны еще
+            # изменения с той же датой, и If-Modified-Since дал бы 304 на устаревший ответ. Остается только ETag
+            last_modified = None
+        return etag, last_modified
+
+    def get(self, request, *args, **kwargs):
+        validators = self.get_validators()
+        if validators is None:
+            return super().get(request, *args, **kwargs)
+        etag, last_modified = validators
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = super().get(request, *args, **kwargs)
+        if response.status_code in (200, 304):
+            response["ETag"] = etag
+            if last_modified is not None:
+                response["Last-Modified"] = http_date(last_modified)
+            # Ответ зависит от пользователя: общие кеши его хранить не должны, а браузер – перепроверять
+            patch_cache_control(response, private=True, no_cache=True)
+        return response
@@ -0,0 +1,106 @@
+import csv
+import datetime
+import io
+import zlib
+from typing import Iterable, Iterator
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import QuerySet
+
+from toDoListProject.goals.models import Board, Goal, GoalCategory, GoalComment
+
+NDJSON, CSV = "ndjson", "csv"
+EXPORT_CHUNK_SIZE = 2000
+FLUSH_SIZE = 64 * 1024
+
+# Поля записей экспорта: (имя в файле, колонка values()). Пользователи выгружаются по username –
+# по нему записи сопоставляются при импорте в другую инсталляцию
+BOARD_FIELDS = (("id", "id"), ("title", "title"), ("created", "created"), ("updated", "updated"))
+CATEGORY_FIELDS = (("id", "id"), ("board", "board_id"), ("title", "title"), ("user", "user__username"),
+                   ("created", "created"), ("updated", "updated"))
+GOAL_FIELDS = (("id", "id"), ("board", "board_id"), ("category", "category_id"), ("title", "title"),
+               ("description", "description"), ("status", "status"), ("priority", "priority"),
+               ("due_date", "due_date"), ("user", "user__username"), ("created", "created"), ("updated", "updated"))
+COMMENT_FIELDS = (("id", "id"), ("goal", "goal_id"), ("text", "text"), ("user", "user__username"),
+                  ("created", "created"), ("updated", "updated"))
+# В CSV только цели, поэтому к ним добавлено название категории
+CSV_GOAL_FIELDS = GOAL_FIELDS[:3] + (("category_title", "category__title"),) + GOAL_FIELDS[3:]
+
+
+def iter_rows(queryset: QuerySet, fields: tuple) -> Iterator[dict]:
+    """
+    Строки queryset с именами полей экспорта. iterator() читает серверным курсором порциями,
+    поэтому память не растет с размером доски
+    """
+    columns = [column for _name, column in fields]
+    for row in queryset.order_by("id").values_list(*columns).iterator(chunk_size=EXPORT_CHUNK_SIZE):
+        yield {name: value for (name, _column), value in zip(fields, row)}
+
+
+def iter_ndjson(board_ids: Iterable[int]) -> Iterator[str]:
+    """
+    Экспорт досок в NDJSON: по строке на доску, категорию, цель и комментарий, с полем type.
+    Записи идут так, что ссылки указывают только на уже выгруженные: доски, категории, цели, комментарии
+    """
+    board_ids = list(board_ids)
+    goals = Goal.objects.alive().filter(board_id__in=board_ids)
+    sources = (
+        ("board", Board.objects.alive().filter(id__in=board_ids), BOARD_FIELDS),
+        ("category", GoalCategory.objects.alive().filter(board_id__in=board_ids), CATEGORY_FIELDS),
+        ("goal", goals, GOAL_FIELDS),
+        ("comment", GoalComment.objects.filter(board_id__in=board_ids, goal__in=goals.values("id")), COMMENT_FIELDS),
+    )
+    encoder = DjangoJSONEncoder(ensure_ascii=False)
+    for record_type, queryset, fields in sources:
+        for row in iter_rows(queryset, fields):
+            yield encoder.encode({"type": record_type, **row}) + "\n"
+
+
+def csv_value(value):
+    if value is None:
+        return ""
+    if isinstance(value, datetime.date):
+        # Тот же формат дат, что и в JSON
+        return DjangoJSONEncoder().default(value)
+    return value
+
+
+def iter_csv(board_ids: Iterable[int]) -> Iterator[str]:
+    """
+    Экспорт целей досок в CSV: строка заголовка и по строке на цель
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow([name for name, _column in CSV_GOAL_FIELDS])
+    for row in iter_rows(Goal.objects.alive().filter(board_id__in=list(board_ids)), CSV_GOAL_FIELDS):
+        writer.writerow([csv_value(value) for value in row.values()])
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    yield buffer.getvalue()
+
+
+def iter_export(board_ids: Iterable[int], output: str = NDJSON) -> Iterator[str]:
+    return iter_csv(board_ids) if output == CSV else iter_ndjson(board_ids)
+
+
+def encode_stream(lines: Iterable[str], compress: bool = False) -> Iterator[bytes]:
+    """
+    Строки экспорта в байты, склеенные в куски не меньше FLUSH_SIZE; при compress=True – сразу в gzip
+    """
+    compressor = zlib.compressobj(wbits=zlib.MAX_WBITS | 16) if compress else None
+    buffer, size = [], 0
+    for line in lines:
+        buffer.append(line)
+        size += len(line)
+        if size >= FLUSH_SIZE:
+            chunk = "".join(buffer).encode()
+            buffer, size = [], 0
+            chunk = compressor.compress(chunk) if compressor is not None else chunk
+            if chunk:
+                yield chunk
+    chunk = "".join(buffer).encode()
+    if compressor is not None:
+        chunk = compressor.compress(chunk) + compressor.flush()
+    if chunk:
+        yield chunk
@@ -0,0 +1,102 @@
+from functools import lru_cache
+from typing import Optional
+
+from django.db.models import QuerySet
+from rest_framework import permissions, serializers
+from rest_framework.exceptions import ValidationError
+
+
+@lru_cache(maxsize=None)
+def get_readable_fields(serializer_class) -> tuple:
+    """
+    Поля, которые сериалайзер выводит в ответе: ((имя, поле), ...)
+    """
+    return tuple((name, field) for name, field in serializer_class().fields.items() if not field.write_only)
+
+
+def split_param(value: Optional[str]) -> list:
+    return [name.strip() for name in (value or "").split(",") if name.strip()]
+
+
+class SparseFieldsetMixin:
+    """
+    Выбор полей ответа через ?fields=id,title,status или ?exclude=description,user.
+
+    Сокращается не только JSON, но и SQL: в queryset остаются только колонки запрошенных полей (only()),
+    а join'ы и prefetch для вложенных объектов выполняются, только если эти объекты запрошены.
+    Параметры учитываются в запросах на чтение; запросы на изменение всегда работают с полным набором полей
+    """
+    fields_query_param = "fields"
+    exclude_query_param = "exclude"
+
+    def get_requested_fields(self) -> Optional[frozenset]:
+        if not hasattr(self, "_requested_fields"):
+            self._requested_fields = self.parse_requested_fields()
+        return self._requested_fields
+
+    def parse_requested_fields(self) -> Optional[frozenset]:
+        params = self.request.query_params
+        if self.request.method not in permissions.SAFE_METHODS or \
+                (self.fields_query_param not in params and self.exclude_query_param not in params):
+            return None
+
+        available = [name for name, _field in get_readable_fields(self.get_serializer_class())]
+        requested = split_param(params.get(self.fields_query_param)) or available
+        excluded = split_param(params.get(self.exclude_query_param))
+        errors = {}
+        for param, names in ((self.fields_query_param, requested), (self.exclude_query_param, excluded)):
+            unknown = [name for name in names if name not in available]
+            if unknown:
+                errors[param] = [f"Unknown field: {name}" for name in unknown]
+        if errors:
+            raise ValidationError(errors)
+        return frozenset(name for name in requested if name not in excluded)
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        fields = self.get_requested_fields()
+        if fields is not None:
+            target = serializer.child if isinstance(serializer, serializers.ListSerializer) else serializer
+            for name in list(target.fields):
+                if name not in fields and not target.fields[name].write_only:
+                    target.fields.pop(name)
+        return serializer
+
+    def filter_queryset(self, queryset: QuerySet) -> QuerySet:
+        # get_queryset переопределяют сами view, а filter_queryset вызывается и для списков, и в get_object
+        return self.prune_queryset(super().filter_queryset(queryset))
+
+    def prune_queryset(self, queryset: QuerySet) -> QuerySet:
+        """
+        Оставляет в queryset только колонки, join'ы и prefetch, нужные запрошенным полям
+        """
+        fields = self.get_requested_fields()
+        if fields is None:
+            return queryset
+
+        # Первичный и внешние ключи загружаются всегда: по ним проверяются права (board_id, user_id)
+        columns = [field.name for field in queryset.model._meta.concrete_fields
+                   if field.primary_key or field.is_relation]
+        related = []
+        needs_prefetch = False
+        for name, field in get_readable_fields(self.get_serializer_class()):
+            if name not in fields:
+                continue
+            if isinstance(field, (serializers.ListSerializer, serializers.ManyRelatedField)):
+                needs_prefetch = True
+                continue
+            source = field.source.replace(".", "__")
+            if source in queryset.query.annotations:
+                continue  # Аннотации не колонки модели: их набор view задает сам
+            if isinstance(field, serializers.Serializer):
+                related.append(source)
+                columns += [f"{source}__{nested.source}" for nested in field.fields.values() if not nested.write_only]
+            else:
+                columns.append(source)
+
+        queryset = queryset.select_related(None)
+        if related:
+            queryset = queryset.select_related(*related)
+        if not needs_prefetch:
+            queryset = queryset.prefetch_related(None)
+        return queryset.only(*columns)
@@ -1,8 +1,10 @@
 import django_filters
 from django.db import models
 from django_filters import rest_framework
+from rest_framework import filters
 
 from toDoListProject.goals.models import Goal
+from toDoListProject.goals.search import has_search_index, search_queryset, search_terms
 
 
 class GoalDateFilter(rest_framework.FilterSet):
@@ -10,6 +12,7 @@ class GoalDateFilter(rest_framework.FilterSet):
         model = Goal
         fields = {
             "due_date": ("lte", "gte"),
+            "board": ("exact", "in"),
             "category": ("exact", "in"),
             "status": ("exact", "in"),
             "priority": ("exact", "in"),
@@ -18,3 +21,33 @@ class GoalDateFilter(rest_framework.FilterSet):
     filter_overrides = {
         models.DateTimeField: {"filter_class": django_filters.IsoDateTimeFilter},
     }
+
+
+class FullTextSearchFilter(filters.SearchFilter):
+    """
+    ?search= через полнотекстовый индекс (goals/search.py) вместо icontains по search_fields.
+    Если клиент не задал ?ordering= и не использует курсорную пагинацию, результаты сортируются
+    по релевантности. Для моделей без индекса работает как обычный SearchFilter
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        if not has_search_index(queryset.model):
+            return super().filter_queryset(request, queryset, view)
+        text = request.query_params.get(self.search_param, "")
+        # Запрос без слов (?search=!!!) не фильтрует: search_queryset тогда не добавляет search_rank
+        if not search_terms(text):
+            return queryset
+        rank = self.should_rank(request, view)
+        queryset = search_queryset(queryset, text, rank=rank)
+        return queryset.order_by("-search_rank", "-pk") if rank else queryset
+
+    @staticmethod
+    def should_rank(request, view) -> bool:
+        if filters.OrderingFilter not in getattr(view, "filter_backends", ()):
+            return False
+        if filters.OrderingFilter.ordering_param in request.query_params:
+            return False
+        paginator = getattr(view, "paginator", None)
+        # Курсорная пагинация сортирует по полям модели; релевантность не поле
+        return not (paginator is not None and hasattr(paginator, "is_cursor_request")
+                    and paginator.is_cursor_request(request))
@@ -0,0 +1,126 @@
+import re
+from contextlib import contextmanager
+from typing import Optional
+
+from django.conf import settings
+from django.db import OperationalError, connections, transaction
+from django.utils.html import escape
+
+from toDoListProject.goals.models import Goal, GoalCategory, GoalComment
+from toDoListProject.goals.search import search_queryset, search_terms
+
+GOAL, CATEGORY, COMMENT = "goal", "category", "comment"
+SEARCH_TYPES = (GOAL, CATEGORY, COMMENT)
+SEARCH_TIMEOUT_MS = 2000
+SNIPPET_WIDTH = 120
+QUERY_CANCELED = "57014"  # SQLSTATE отмены запроса по statement_timeout
+
+
+class SearchTimeout(Exception):
+    pass
+
+
+@contextmanager
+def statement_timeout(using: str, milliseconds: int):
+    """
+    Ограничение времени запросов внутри блока (PostgreSQL: SET LOCAL statement_timeout).
+    Превышение – SearchTimeout; на других БД ограничение не действует
+    """
+    connection = connections[using]
+    with transaction.atomic(using=using):
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute("SET LOCAL statement_timeout = %s", [milliseconds])
+        try:
+            yield
+        except OperationalError as error:
+            if getattr(error.__cause__, "pgcode", None) != QUERY_CANCELED:
+                raise
+            raise SearchTimeout from error
+
+
+def terms_pattern(terms: list) -> re.Pattern:
+    return re.compile(r"\b(?:" + "|".join(re.escape(term) for term in terms) + r")\w*", re.IGNORECASE)
+
+
+def contains_terms(text: Optional[str], terms: list) -> bool:
+    return bool(text) and terms_pattern(terms).search(text) is not None
+
+
+def highlight(text: Optional[str], terms: list, width: int = SNIPPET_WIDTH) -> str:
+    """
+    Фрагмент text вокруг первого найденного слова; найденные слова обернуты в <mark>, остальное экранировано
+    """
+    if not text:
+        return ""
+    pattern = terms_pattern(terms)
+    first = pattern.search(text)
+    start = max(0, (first.start() if first else 0) - width // 3)
+    fragment = text[start:start + width]
+    parts, position = [], 0
+    for match in pattern.finditer(fragment):
+        parts.append(escape(fragment[position:match.start()]))
+        parts.append(f"<mark>{escape(match.group())}</mark>")
+        position = match.end()
+    parts.append(escape(fragment[position:]))
+    prefix = "…" if start > 0 else ""
+    suffix = "…" if start + width < len(text) else ""
+    return prefix + "".join(parts) + suffix
+
+
+def search_goals(user, text: str, limit: int) -> list:
+    terms = search_terms(text)
+    rows = search_queryset(Goal.objects.visible_to(user), text).order_by("-search_rank", "-id").values(
+        "id", "board_id", "category_id", "status", "title", "description", "search_rank"
+    )[:limit]
+    return [{
+        "type": GOAL, "id": row["id"], "board": row["board_id"], "category": row["category_id"],
+        "status": row["status"], "title": row["title"], "rank": row["search_rank"],
+        # Описание – только если слова найдены в нем, иначе цель нашлась по названию
+        "snippet": highlight(row["description"] if contains_terms(row["description"], terms) else row["title"], terms),
+    } for row in rows]
+
+
+def search_categories(user, text: str, limit: int) -> list:
+    terms = search_terms(text)
+    rows = search_queryset(GoalCategory.objects.visible_to(user), text).order_by("-search_rank", "-id").values(
+        "id", "board_id", "title", "search_rank"
+    )[:limit]
+    return [{
+        "type": CATEGORY, "id": row["id"], "board": row["board_id"], "title": row["title"],
+        "rank": row["search_rank"], "snippet": highlight(row["title"], terms),
+    } for row in rows]
+
+
+def search_comments(user, text: str, limit: int) -> list:
+    terms = search_terms(text)
+    rows = search_queryset(GoalComment.objects.visible_to(user), text).order_by("-search_rank", "-id").values(
+        "id", "board_id", "goal_id", "goal__title", "text", "search_rank"
+    )[:limit]
+    return [{
+        "type": COMMENT, "id": row["id"], "board": row["board_id"], "goal": row["goal_id"],
+        "title": row["goal__title"], "rank": row["search_rank"], "snippet": highlight(row["text"], terms),
+    } for row in rows]
+
+
+SEARCHES = {GOAL: search_goals, CATEGORY: search_categories, COMMENT: search_comments}
+
+
+def search_everywhere(user, text: str, types=SEARCH_TYPES, limit: int = 10, using: str = "default") -> dict:
+    """
+    Поиск по целям, категориям и комментариям всех досок пользователя: не больше limit результатов
+    каждого типа, общий список отсортирован по релевантности. Каждый тип ищется в своем лимите времени
+    (GOALS_SEARCH_TIMEOUT_MS); не уложившиеся типы перечислены в timed_out, остальные результаты отдаются
+    """
+    timeout = getattr(settings, "GOALS_SEARCH_TIMEOUT_MS", SEARCH_TIMEOUT_MS)
+    results, timed_out = [], []
+    if not search_terms(text):
+        return {"results": results, "timed_out": timed_out}
+    for search_type in types:
+        try:
+            with statement_timeout(using, timeout):
+                results.extend(SEARCHES[search_type](user, text, limit))
+        except SearchTimeout:
+            timed_out.append(search_type)
+    results.sort(key=lambda item: item["rank"], reverse=True)
+    return {"results": results, "timed_out": timed_out}
@@ -0,0 +1,359 @@
+import csv
+import gzip
+import io
+import json
+import os
+import zlib
+from collections import Counter
+from itertools import islice
+from typing import Callable, IO, Iterable, Iterator, NamedTuple, Optional
+
+from django.db import transaction
+from django.utils import timezone
+from rest_framework import serializers
+
+from toDoListProject.core.models import User
+from toDoListProject.goals.export import CSV, NDJSON
+from toDoListProject.goals.models import Board, BoardSummary, ChangeLogEntry, Goal, GoalCategory, GoalComment
+from toDoListProject.goals.serializers import CategoryImportSerializer, CommentImportSerializer, GoalImportSerializer
+from toDoListProject.goals.summary import goal_counts
+from toDoListProject.goals.versions import bump_board_versions
+
+IMPORT_BATCH_SIZE = 1000
+MAX_REPORTED_ERRORS = 1000
+CATEGORY, GOAL, COMMENT = "category", "goal", "comment"
+
+
+class ImportFileError(ValueError):
+    """
+    Файл импорта не читается целиком: не UTF-8, поврежденный gzip или CSV
+    """
+
+
+class ImportRecord(NamedTuple):
+    line: int
+    type: Optional[str]
+    data: Optional[dict]
+    error: Optional[str] = None
+
+
+def open_import_file(file: IO[bytes]) -> IO[str]:
+    """
+    Текстовый поток для файла импорта; файлы в gzip распаковываются на лету
+    """
+    if file.read(2) == b"\x1f\x8b":
+        file.seek(0)
+        file = gzip.GzipFile(fileobj=file)
+    else:
+        file.seek(0)
+    return io.TextIOWrapper(file, encoding="utf-8", newline="")
+
+
+def guess_format(name: str) -> str:
+    return CSV if name.removesuffix(".gz").endswith(".csv") else NDJSON
+
+
+def read_ndjson(text: IO[str]) -> Iterator[ImportRecord]:
+    """
+    Записи NDJSON в формате выгрузки: по строке на категорию, цель или комментарий. Доски пропускаются –
+    импорт идет в доску, выбранную при запуске
+    """
+    for line, raw in enumerate(text, start=1):
+        if not raw.strip():
+            continue
+        try:
+            data = json.loads(raw)
+        except ValueError:
+            yield ImportRecord(line, None, None, "Invalid JSON")
+            continue
+        record_type = data.get("type") if isinstance(data, dict) else None
+        if record_type == "board":
+            continue
+        if record_type not in (CATEGORY, GOAL, COMMENT):
+            yield ImportRecord(line, None, None, "Unknown record type")
+            continue
+        yield ImportRecord(line, record_type, data)
+
+
+def read_csv(text: IO[str]) -> Iterator[ImportRecord]:
+    """
+    Цели из CSV: колонки как в выгрузке, категория ищется по category_title
+    """
+    reader = csv.DictReader(text)
+    for row in reader:
+        yield ImportRecord(reader.line_num, GOAL, {name: value for name, value in row.items() if value != ""})
+
+
+def read_records(text: IO[str], input_format: str) -> Iterator[ImportRecord]:
+    """
+    Записи файла импорта. Ошибки чтения самого файла (кодировка, gzip, CSV) – ImportFileError:
+    продолжить импорт после них нельзя, в отличие от ошибок отдельных записей
+    """
+    records = read_csv(text) if input_format == CSV else read_ndjson(text)
+    try:
+        yield from records
+    except (UnicodeDecodeError, gzip.BadGzipFile, EOFError, zlib.error, csv.Error) as error:
+        raise ImportFileError(f"Invalid import file: {error}") from error
+
+
+class ImportCheckpoint:
+    """
+    Контрольные точки импорта в файле: по JSON-строке на пакет с номером последней строки входного файла
+    и соответствием id из файла новым id категорий и целей (по нему сопоставляются цели и комментарии
+    после перезапуска).
+
+    Строка дописывается до коммита транзакции пакета. Если процесс упал между записью и коммитом,
+    последней строки нет в БД – при загрузке это проверяется по последней созданной в пакете записи,
+    и такая строка отбрасывается
+    """
+    models = {CATEGORY: GoalCategory, GOAL: Goal, COMMENT: GoalComment}
+
+    def __init__(self, path: str, board_id: int):
+        self.path = path
+        self.board_id = board_id
+
+    def load(self) -> list:
+        if not os.path.exists(self.path):
+            return []
+        with open(self.path) as file:
+            entries = [json.loads(line) for line in file if line.strip()]
+        if any(entry["board"] != self.board_id for entry in entries):
+            raise ValueError(f"Checkpoint {self.path} belongs to another board")
+        if entries and entries[-1]["last"] is not None:
+            record_type, pk = entries[-1]["last"]
+            if not self.models[record_type].objects.filter(pk=pk).exists():
+                entries.pop()
+                with open(self.path, "w") as file:
+                    file.writelines(json.dumps(entry) + "\n" for entry in entries)
+        return entries
+
+    def save(self, entry: dict) -> None:
+        with open(self.path, "a") as file:
+            file.write(json.dumps({"board": self.board_id, **entry}) + "\n")
+            file.flush()
+            os.fsync(file.fileno())
+
+
+class GoalImport:
+    """
+    Импорт категорий, целей и комментариев в доску пакетами по batch_size записей.
+
+    Каждая запись проверяется своим сериалайзером; ссылки из файла на категории и цели заменяются
+    на id созданных записей, категории CSV ищутся (и создаются) по названию. С map_users авторы ищутся
+    по username с кешем на весь импорт, неизвестные заменяются на user, запустившего импорт; без map_users
+    (загрузка через API) автор всех записей – user.
+    Пакет пишется через bulk_create в одной транзакции, после чего обновляются сводка и версия доски.
+    Записи с ошибками пропускаются и попадают в отчет: {"line": номер строки, "errors": ...}
+    """
+
+    def __init__(self, board: Board, user: User, batch_size: int = IMPORT_BATCH_SIZE,
+                 checkpoint: Optional[ImportCheckpoint] = None, on_error: Optional[Callable[[dict], None]] = None,
+                 map_users: bool = True):
+        self.board = board
+        self.user = user
+        self.map_users = map_users
+        self.batch_size = batch_size
+        self.checkpoint = checkpoint
+        self.on_error = on_error
+        self.categories = {}  # id категории в файле -> id созданной категории
+        self.goals = {}  # id цели в файле -> id созданной цели
+        self.category_titles = None  # название -> id категории доски, загружается при первой цели без ссылки
+        self.users = {user.username: user.pk}
+        self.created = Counter()
+        self.errors = []
+        self.error_count = 0
+        self.line = 0
+        self.serializers = {CATEGORY: CategoryImportSerializer(), GOAL: GoalImportSerializer(),
+                            COMMENT: CommentImportSerializer()}
+
+    def resume(self) -> None:
+        """
+        Восстанавливает состояние по контрольным точкам: уже импортированные строки будут пропущены
+        """
+        for entry in self.checkpoint.load():
+            self.line = entry["line"]
+            self.categories.update(entry["categories"])
+            self.goals.update(entry["goals"])
+            self.created.update(entry["created"])
+            self.error_count += entry["errors"]
+
+    def run(self, records: Iterable[ImportRecord]) -> dict:
+        if self.checkpoint is not None:
+            self.resume()
+        records = (record for record in records if record.line > self.line)
+        while True:
+            batch = list(islice(records, self.batch_size))
+            if not batch:
+                break
+            self.import_batch(batch)
+        return self.report()
+
+    def report(self) -> dict:
+        return {"line": self.line, "created": dict(self.created), "errors_total": self.error_count,
+                "errors": self.errors}
+
+    def error(self, record: ImportRecord, errors) -> None:
+        item = {"line": record.line, "errors": errors}
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append(item)
+        if self.on_error is not None:
+            self.on_error(item)
+
+    def validate(self, record: ImportRecord) -> Optional[dict]:
+        if record.error is not None:
+            self.error(record, {"non_field_errors": [record.error]})
+            return None
+        errors = {}
+        user = record.data.get("user")
+        if self.map_users and user is not None and not isinstance(user, str):
+            errors["user"] = ["Not a valid string."]
+        if record.type == GOAL and "category_title" in record.data:
+            title = record.data["category_title"]
+            try:
+                # Название проверяется как у новой категории: по нему категория может быть создана
+                if not isinstance(title, str):
+                    raise serializers.ValidationError({"title": ["Not a valid string."]})
+                record.data["category_title"] = self.serializers[CATEGORY].run_validation({"title": title})["title"]
+            except serializers.ValidationError as error:
+                errors["category_title"] = error.detail["title"]
+        try:
+            values = self.serializers[record.type].run_validation(record.data)
+        except serializers.ValidationError as error:
+            errors = {**error.detail, **errors}
+        if errors:
+            self.error(record, errors)
+            return None
+        return values
+
+    def dates(self, values: dict, now) -> dict:
+        """
+        Извлекает из values даты записи
+        """
+        created = values.pop("created", None) or now
+        return {"created": created, "updated": values.pop("updated", None) or created}
+
+    def load_users(self, batch: list) -> None:
+        if not self.map_users:
+            return
+        names = {
+            record.data["user"] for record in batch if record.data and isinstance(record.data.get("user"), str)
+        } - set(self.users)
+        if names:
+            found = dict(User.objects.filter(username__in=names).values_list("username", "id"))
+            # Отсутствующих тоже запоминаем, чтобы не искать их в каждом пакете
+            self.users.update({name: found.get(name, self.user.pk) for name in names})
+
+    def user_id(self, record: ImportRecord) -> int:
+        if not self.map_users:
+            return self.user.pk
+        return self.users.get(record.data.get("user"), self.user.pk)
+
+    def category_id(self, record: ImportRecord, created: list) -> Optional[int]:
+        source = record.data.get("category")
+        if source is not None and str(source) in self.categories:
+            return self.categories[str(source)]
+        title = record.data.get("category_title")
+        if title is None:
+            return None
+        if self.category_titles is None:
+            self.category_titles = dict(
+                GoalCategory.objects.alive().filter(board=self.board).order_by("-id").values_list("title", "id")
+            )
+        if title not in self.category_titles:
+            category = GoalCategory.objects.create(board=self.board, user=self.user, title=title)
+            self.category_titles[title] = category.pk
+            created.append(category)
+        return self.category_titles[title]
+
+    def import_batch(self, batch: list) -> None:
+        now = timezone.now()
+        errors_before = self.error_count
+        valid = {CATEGORY: [], GOAL: [], COMMENT: []}
+        for record in batch:
+            values = self.validate(record)
+            if values is not None:
+                valid[record.type].append((record, values, self.dates(values, now)))
+
+        with transaction.atomic():
+            self.load_users(batch)
+            new_categories, new_goals = {}, {}
+            categories = self.create_categories(valid[CATEGORY], new_categories)
+            goals = self.create_goals(valid[GOAL], new_goals, categories)
+            comments = self.create_comments(valid[COMMENT])
+            last = ([COMMENT, comments[-1].pk] if comments else
+                    [GOAL, goals[-1].pk] if goals else
+                    [CATEGORY, categories[-1].pk] if categories else None)
+
+            # Как и сводка, версия доски при bulk_create сама не меняется
+            bump_board_versions([self.board.pk])
+
+            created = {CATEGORY: len(categories), GOAL: len(goals), COMMENT: len(comments)}
+            self.created.update(created)
+            self.line = batch[-1].line
+            if self.checkpoint is not None:
+                self.checkpoint.save({
+                    "line": self.line, "last": last, "created": created, "errors": self.error_count - errors_before,
+                    "categories": new_categories, "goals": new_goals,
+                })
+
+    @staticmethod
+    def remember(mapping: dict, record: ImportRecord, pk: int) -> None:
+        source = record.data.get("id")
+        if source is not None:
+            mapping[str(source)] = pk
+
+    def log_created(self, kind: int, objects: list) -> None:
+        # bulk_create не вызывает save(), поэтому созданные записи попадают в журнал изменений отсюда
+        ChangeLogEntry.record(kind, ChangeLogEntry.Action.create, [(self.board.pk, item.pk) for item in objects])
+
+    def create_categories(self, items: list, mapping: dict) -> list:
+        categories = [GoalCategory(board=self.board, user_id=self.user_id(record), **values, **dates)
+                      for record, values, dates in items]
+        GoalCategory.objects.bulk_create(categories)
+        self.log_created(ChangeLogEntry.Kind.category, categories)
+        for (record, _values, _dates), category in zip(items, categories):
+            self.remember(mapping, record, category.pk)
+        # Цели пакета могут ссылаться на категории этого же пакета
+        self.categories.update(mapping)
+        return categories
+
+    def create_goals(self, items: list, mapping: dict, categories: list) -> list:
+        """
+        Создает цели; категории CSV, созданные по названию, добавляются в categories
+        """
+        goals, sources = [], []
+        for record, values, dates in items:
+            category_id = self.category_id(record, categories)
+            if category_id is None:
+                self.error(record, {"category": ["Unknown category"]})
+                continue
+            goals.append(Goal(board=self.board, category_id=category_id, user_id=self.user_id(record),
+                              **values, **dates))
+            sources.append(record)
+        Goal.objects.bulk_create(goals)
+        self.log_created(ChangeLogEntry.Kind.goal, goals)
+        for record, goal in zip(sources, goals):
+            self.remember(mapping, record, goal.pk)
+        # Комментарии пакета могут ссылаться на цели этого же пакета
+        self.goals.update(mapping)
+
+        # bulk_create не вызывает Goal.save, поэтому сводка обновляется здесь
+        counts = Counter()
+        for goal in goals:
+            counts.update(goal_counts(goal.status, goal.priority, goal.category_id, goal.due_date))
+        BoardSummary.apply({self.board.pk: counts})
+        return goals
+
+    def create_comments(self, items: list) -> list:
+        comments = []
+        for record, values, dates in items:
+            goal_id = self.goals.get(str(record.data.get("goal")))
+            if goal_id is None:
+                self.error(record, {"goal": ["Unknown goal"]})
+                continue
+            comments.append(GoalComment(board=self.board, goal_id=goal_id, user_id=self.user_id(record),
+                                        **values, **dates))
+        GoalComment.objects.bulk_create(comments)
+        self.log_created(ChangeLogEntry.Kind.comment, comments)
+        return comments
@@ -0,0 +1,31 @@
+import time
+
+from django.core.management import BaseCommand
+
+from toDoListProject.goals.archiving import ARCHIVE_CHUNK_SIZE, pending_archive_jobs, run_archive_job
+from toDoListProject.goals.models import BoardArchiveJob
+
+
+class Command(BaseCommand):
+    help = "Фоновый обработчик архивации удаленных досок: архивирует цели и удаляет категории порциями"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=ARCHIVE_CHUNK_SIZE,
+                            help="Число строк, изменяемых в одной транзакции")
+        parser.add_argument("--once", action="store_true", help="Обработать очередь и завершиться")
+        parser.add_argument("--interval", type=float, default=5, help="Пауза между проверками очереди, в секундах")
+
+    def handle(self, *args, **options):
+        while True:
+            for job in pending_archive_jobs():
+                job = run_archive_job(job, options["chunk_size"], progress=self.report)
+                # Задачу, которую обрабатывает другой обработчик, он и завершит
+                if job.status == BoardArchiveJob.Status.done:
+                    self.stdout.write(f"Доска {job.board_id}: архивация завершена")
+            if options["once"]:
+                return
+            time.sleep(options["interval"])
+
+    def report(self, job: BoardArchiveJob):
+        self.stdout.write(f"Доска {job.board_id}: целей {job.goals_archived}/{job.goals_total}, "
+                          f"категорий {job.categories_deleted}/{job.categories_total}")
@@ -0,0 +1,68 @@
+import time
+
+from django.core.management import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from toDoListProject.core.models import User
+from toDoListProject.goals.models import Board, BoardParticipant, GoalCategory, Goal
+from toDoListProject.goals.projections import get_projection
+from toDoListProject.goals.serializers import GoalSerializer
+
+
+class Command(BaseCommand):
+    help = "Сравнивает скорость сериализации списка целей: ModelSerializer против Projection (values())"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--goals", type=int, default=2000, help="Число целей на тестовой доске")
+        parser.add_argument("--repeat", type=int, default=5, help="Число повторов каждого варианта")
+
+    def handle(self, *args, **options):
+        # Данные создаются в транзакции и откатываются после замера
+        with transaction.atomic():
+            board = self.create_board(options["goals"])
+            queryset = Goal.objects.filter(board=board).order_by("title", "created")
+            projection = get_projection(GoalSerializer)
+
+            before = self.measure(options["repeat"],
+                                  lambda: GoalSerializer(queryset.select_related("user"), many=True).data)
+            after = self.measure(options["repeat"],
+                                 lambda: projection.represent(queryset.values(*projection.columns)))
+
+            renderer = JSONRenderer()
+            same = renderer.render(GoalSerializer(queryset.select_related("user"), many=True).data) == \
+                renderer.render(projection.represent(queryset.values(*projection.columns)))
+            transaction.set_rollback(True)
+
+        rows = options["goals"]
+        self.stdout.write(f"ModelSerializer: {rows / before:,.0f} целей/с ({before * 1000:.1f} мс на список)")
+        self.stdout.write(f"Projection:      {rows / after:,.0f} целей/с ({after * 1000:.1f} мс на список)")
+        self.stdout.write(f"Ускорение: x{before / after:.1f}, ответы совпадают: {'да' if same else 'НЕТ'}")
+
+    @staticmethod
+    def measure(repeat: int, func) -> float:
+        """
+        Лучшее время из repeat запусков, в секундах
+        """
+        best = None
+        for _ in range(repeat):
+            started = time.perf_counter()
+            func()
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        return best
+
+    @staticmethod
+    def create_board(goals: int) -> Board:
+        now = timezone.now()
+        user = User.objects.create_user(username=f"benchmark-{now.timestamp()}")
+        board = Board.objects.create(title="benchmark")
+        BoardParticipant.objects.create(board=board, user=user)
+        category = GoalCategory.objects.create(title="benchmark", user=user, board=board)
+        Goal.objects.bulk_create(
+            Goal(title=f"goal {number}", description="description " * 20, category=category, board=board,
+                 user=user, due_date=now, created=now, updated=now)
+            for number in range(goals)
+        )
+        return board
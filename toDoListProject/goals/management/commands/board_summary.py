@@ -0,0 +1,86 @@
+from django.core.management import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from toDoListProject.goals.models import Board, BoardSummary, Goal
+from toDoListProject.goals.summary import count_goals, goal_summary_rows
+
+CHUNK_SIZE = 500
+
+
+class Command(BaseCommand):
+    help = "Сверяет сводки досок (BoardSummary) с целями; --fix исправляет расхождения, --rebuild пересчитывает все"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--fix", action="store_true", help="Перезаписать сводки, которые разошлись с целями")
+        parser.add_argument("--rebuild", action="store_true", help="Пересчитать сводки всех досок с нуля")
+        parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE,
+                            help="Число досок, сверяемых в одной транзакции")
+
+    def handle(self, *args, **options):
+        drifted = written = 0
+        last_id = 0
+        while True:
+            board_ids = list(Board.objects.filter(id__gt=last_id).order_by("id")
+                             .values_list("id", flat=True)[:options["chunk_size"]])
+            if not board_ids:
+                break
+            last_id = board_ids[-1]
+            chunk_drifted, chunk_written = self.check_chunk(board_ids, options["fix"], options["rebuild"])
+            drifted += chunk_drifted
+            written += chunk_written
+
+        if options["rebuild"] or options["fix"]:
+            self.stdout.write(f"Пересчитано сводок: {written}")
+        elif drifted:
+            raise CommandError(f"Расхождения в сводках досок: {drifted}")
+        else:
+            self.stdout.write("Сводки совпадают с целями")
+
+    def check_chunk(self, board_ids: list, fix: bool, rebuild: bool) -> tuple:
+        """
+        Сверяет и при fix/rebuild исправляет сводки досок board_ids в одной короткой транзакции.
+        Блокируются только сводки этих досок: изменения целей других досок (BoardSummary.apply) не ждут.
+        Возвращает число расхождений и число исправленных сводок
+        """
+        with transaction.atomic():
+            # Блокируем сводки, чтобы инкрементальные изменения не вклинились между подсчетом и записью
+            summaries = {
+                summary.board_id: summary
+                for summary in BoardSummary.objects.select_for_update().filter(board_id__in=board_ids).order_by("pk")
+            }
+            expected = {
+                board_id: {key: value for key, value in counts.items() if value}
+                for board_id, counts in count_goals(goal_summary_rows(
+                    Goal.objects.alive().filter(board_id__in=board_ids, board__is_deleted=False)
+                )).items()
+            }
+            alive_boards = set(Board.objects.alive().filter(id__in=board_ids).values_list("id", flat=True))
+
+            drifted = sorted(
+                board_id for board_id in (set(summaries) | set(expected))
+                if (summaries[board_id].counts if board_id in summaries else {}) != expected.get(board_id, {})
+            )
+            for board_id in drifted:
+                stored = summaries[board_id].counts if board_id in summaries else None
+                self.stdout.write(f"Доска {board_id}: сводка {stored}, по целям {expected.get(board_id)}")
+
+            if not (fix or rebuild):
+                return len(drifted), 0
+            targets = set(summaries) | set(expected) if rebuild else set(drifted)
+            BoardSummary.objects.filter(board_id__in=targets - alive_boards).delete()
+            now = timezone.now()
+            changed, created = [], []
+            for board_id in sorted(targets & alive_boards):
+                counts = expected.get(board_id, {})
+                if board_id in summaries:
+                    summary = summaries[board_id]
+                    summary.counts, summary.updated = counts, now
+                    changed.append(summary)
+                else:
+                    created.append(BoardSummary(board_id=board_id, counts=counts))
+            BoardSummary.objects.bulk_update(changed, ["counts", "updated"])
+            # Сводку новой доски могла успеть создать параллельная транзакция (первая цель доски) –
+            # ее счетчики уже учитывают эту цель, поэтому вставка такую сводку не трогает
+            BoardSummary.objects.bulk_create(created, ignore_conflicts=True)
+        return len(drifted), len(targets)
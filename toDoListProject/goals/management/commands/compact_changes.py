@@ -0,0 +1,22 @@
+import datetime
+
+from django.core.management import BaseCommand
+
+from toDoListProject.goals.changes import COMPACT_CHUNK_SIZE, compact_changes
+
+
+class Command(BaseCommand):
+    help = "Очистка журнала изменений: удаляет старые записи и схлопывает записи до последней по каждому объекту"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=None,
+                            help="Срок хранения записей в днях (по умолчанию GOALS_CHANGES_RETENTION_DAYS)")
+        parser.add_argument("--collapse-hours", type=float, default=1,
+                            help="Схлопывать записи старше стольких часов")
+        parser.add_argument("--chunk-size", type=int, default=COMPACT_CHUNK_SIZE,
+                            help="Число записей, удаляемых в одной транзакции")
+
+    def handle(self, *args, **options):
+        result = compact_changes(options["days"], datetime.timedelta(hours=options["collapse_hours"]),
+                                 options["chunk_size"])
+        self.stdout.write(f"Удалено по сроку хранения: {result['expired']}, схлопнуто: {result['collapsed']}")
@@ -0,0 +1,40 @@
+from django.core.management import BaseCommand, CommandError
+
+from toDoListProject.core.models import User
+from toDoListProject.goals.export import CSV, NDJSON, encode_stream, iter_export
+from toDoListProject.goals.models import Board
+
+
+class Command(BaseCommand):
+    help = "Выгружает доску или все доски пользователя в NDJSON (доски, категории, цели, комментарии) или CSV (цели)"
+
+    def add_arguments(self, parser):
+        scope = parser.add_mutually_exclusive_group(required=True)
+        scope.add_argument("--board", type=int, help="id доски")
+        scope.add_argument("--user", help="username: выгрузить все доски, участником которых он является")
+        parser.add_argument("--format", choices=(NDJSON, CSV), default=NDJSON)
+        parser.add_argument("--gzip", action="store_true", help="Сжать выгрузку (только вместе с --output)")
+        parser.add_argument("--output", help="Файл для выгрузки; по умолчанию – stdout")
+
+    def handle(self, *args, **options):
+        if options["board"] is not None:
+            if not Board.objects.alive().filter(pk=options["board"]).exists():
+                raise CommandError(f"Доска {options['board']} не найдена")
+            board_ids = [options["board"]]
+        else:
+            user = User.objects.filter(username=options["user"]).first()
+            if user is None:
+                raise CommandError(f"Пользователь {options['user']} не найден")
+            board_ids = list(Board.objects.visible_to(user).values_list("id", flat=True))
+
+        lines = iter_export(board_ids, options["format"])
+        if options["output"] is None:
+            if options["gzip"]:
+                raise CommandError("--gzip требует --output")
+            for line in lines:
+                self.stdout.write(line, ending="")
+            return
+
+        with open(options["output"], "wb") as file:
+            for chunk in encode_stream(lines, compress=options["gzip"]):
+                file.write(chunk)
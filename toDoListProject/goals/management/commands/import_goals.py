@@ -0,0 +1,52 @@
+import json
+
+from django.core.management import BaseCommand, CommandError
+
+from toDoListProject.core.models import User
+from toDoListProject.goals.export import CSV, NDJSON
+from toDoListProject.goals.importing import IMPORT_BATCH_SIZE, GoalImport, ImportCheckpoint, guess_format, \
+    open_import_file, read_records
+from toDoListProject.goals.models import Board
+
+
+class Command(BaseCommand):
+    help = "Загружает категории, цели и комментарии в доску из NDJSON (формат export_goals) или CSV целей"
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Файл для загрузки, можно в gzip")
+        parser.add_argument("--board", type=int, required=True, help="id доски, в которую идет импорт")
+        parser.add_argument("--user", required=True,
+                            help="username автора для записей, чьих пользователей нет в системе, и новых категорий")
+        parser.add_argument("--format", choices=(NDJSON, CSV), help="Формат файла; по умолчанию – по расширению")
+        parser.add_argument("--batch-size", type=int, default=IMPORT_BATCH_SIZE,
+                            help="Число записей, сохраняемых в одной транзакции")
+        parser.add_argument("--checkpoint", help="Файл контрольных точек: при повторном запуске импорт продолжится")
+        parser.add_argument("--errors", help="Файл для отчета об ошибках (NDJSON: номер строки и ошибки)")
+
+    def handle(self, *args, **options):
+        board = Board.objects.alive().filter(pk=options["board"]).first()
+        if board is None:
+            raise CommandError(f"Доска {options['board']} не найдена")
+        user = User.objects.filter(username=options["user"]).first()
+        if user is None:
+            raise CommandError(f"Пользователь {options['user']} не найден")
+
+        checkpoint = ImportCheckpoint(options["checkpoint"], board.pk) if options["checkpoint"] else None
+        errors = open(options["errors"], "a") if options["errors"] else None
+        try:
+            goal_import = GoalImport(
+                board, user, batch_size=options["batch_size"], checkpoint=checkpoint,
+                on_error=(lambda item: errors.write(json.dumps(item, ensure_ascii=False) + "\n")) if errors else None,
+            )
+            with open(options["path"], "rb") as file:
+                records = read_records(open_import_file(file), options["format"] or guess_format(options["path"]))
+                report = goal_import.run(records)
+        except ValueError as error:
+            raise CommandError(error)
+        finally:
+            if errors is not None:
+                errors.close()
+
+        created = report["created"]
+        self.stdout.write(f"Доска {board.pk}: категорий {created.get('category', 0)}, целей {created.get('goal', 0)}, "
+                          f"комментариев {created.get('comment', 0)}; ошибок {report['errors_total']}")
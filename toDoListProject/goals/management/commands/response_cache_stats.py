@@ -0,0 +1,27 @@
+from django.core.management import BaseCommand, CommandError
+
+from toDoListProject.goals.response_cache import HIT, MISS, get_counters, reset_counters, response_cache_is_shared
+from toDoListProject.goals.views import BoardSnapshotView, GlobalSearchView, GoalCategoryListView, GoalListView
+
+CACHED_VIEWS = [GoalListView, GoalCategoryListView, BoardSnapshotView, GlobalSearchView]
+
+
+class Command(BaseCommand):
+    help = "Показывает число попаданий и промахов кеша страниц списков целей и категорий, снимков досок и поиска"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--reset", action="store_true", help="Обнулить счетчики после вывода")
+
+    def handle(self, *args, **options):
+        if not response_cache_is_shared():
+            # Счетчики кеша в памяти процесса принадлежат api, команда в своем процессе видела бы только нули
+            raise CommandError("Кеш страниц хранится в памяти процесса и отключен: задайте общий бэкенд "
+                               "через CACHE_URL и RESPONSE_CACHE_URL")
+        view_names = [view.get_response_cache_name() for view in CACHED_VIEWS]
+        for name, counters in get_counters(view_names).items():
+            total = counters[HIT] + counters[MISS]
+            ratio = counters[HIT] / total * 100 if total else 0
+            self.stdout.write(f"{name}: попаданий {counters[HIT]}, промахов {counters[MISS]} ({ratio:.0f}% из кеша)")
+        if options["reset"]:
+            reset_counters(view_names)
+            self.stdout.write("Счетчики обнулены")
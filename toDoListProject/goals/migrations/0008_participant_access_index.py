@@ -0,0 +1,17 @@
+# Generated by Django 4.1.7 on 2026-10-18 18:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('goals', '0007_alter_goalcategory_board'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='boardparticipant',
+            index=models.Index(fields=['user', 'board', 'role'], name='goals_participant_access_idx'),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 4.1.7 on 2026-10-18 18:13
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('goals', '0008_participant_access_index'),
+    ]
+
+    operations = [
+        # Сначала поля допускают NULL: существующие строки заполняются следующей миграцией
+        migrations.AddField(
+            model_name='goal',
+            name='board',
+            field=models.ForeignKey(editable=False, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='goals', to='goals.board', verbose_name='Доска'),
+        ),
+        migrations.AddField(
+            model_name='goalcomment',
+            name='board',
+            field=models.ForeignKey(editable=False, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='comments', to='goals.board', verbose_name='Доска'),
+        ),
+    ]
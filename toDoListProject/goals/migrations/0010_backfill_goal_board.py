@@ -0,0 +1,43 @@
+# Generated by Django 4.1.7 on 2026-10-18 18:14
+
+from django.db import migrations, transaction
+from django.db.models import Max, OuterRef, Subquery
+
+CHUNK_SIZE = 5000
+
+
+def backfill_chunks(model, source, source_ref):
+    """
+    Проставляет board_id диапазонами первичного ключа по CHUNK_SIZE строк,
+    каждый диапазон – в своей короткой транзакции, чтобы не держать блокировки на всю таблицу.
+    Повторный запуск продолжает с незаполненных строк
+    """
+    last_id = model.objects.aggregate(last_id=Max("id"))["last_id"] or 0
+    board_id = Subquery(source.objects.filter(pk=OuterRef(source_ref)).values("board_id")[:1])
+    for start in range(0, last_id + 1, CHUNK_SIZE):
+        with transaction.atomic():
+            model.objects.filter(
+                id__gte=start, id__lt=start + CHUNK_SIZE, board__isnull=True
+            ).update(board_id=board_id)
+
+
+def backfill_board(apps, schema_editor):
+    # Модели загружаются через apps.get_model – в том состоянии, которое было на момент миграции
+    GoalCategory = apps.get_model("goals", "GoalCategory")
+    Goal = apps.get_model("goals", "Goal")
+    GoalComment = apps.get_model("goals", "GoalComment")
+
+    backfill_chunks(Goal, GoalCategory, "category_id")
+    backfill_chunks(GoalComment, Goal, "goal_id")
+
+
+class Migration(migrations.Migration):
+    atomic = False  # Каждая порция коммитится отдельно
+
+    dependencies = [
+        ('goals', '0009_goal_board'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_board, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 4.1.7 on 2026-10-18 18:15
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('goals', '0010_backfill_goal_board'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='goal',
+            name='board',
+            field=models.ForeignKey(editable=False, on_delete=django.db.models.deletion.PROTECT, related_name='goals', to='goals.board', verbose_name='Доска'),
+        ),
+        migrations.AlterField(
+            model_name='goalcomment',
+            name='board',
+            field=models.ForeignKey(editable=False, on_delete=django.db.models.deletion.PROTECT, related_name='comments', to='goals.board', verbose_name='Доска'),
+        ),
+        migrations.AddIndex(
+            model_name='goal',
+            index=models.Index(fields=['board', 'status', 'due_date'], name='goals_goal_board_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='goal',
+            index=models.Index(fields=['board', 'priority'], name='goals_goal_board_priority_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='goalcomment',
+            index=models.Index(fields=['goal', '-created'], name='goals_comment_goal_created_idx'),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 4.1.7 on 2026-10-18 18:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('goals', '0011_alter_goal_board_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='board',
+            index=models.Index(condition=models.Q(('is_deleted', False)), fields=['title'], name='goals_board_alive_title_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='goal',
+            index=models.Index(condition=models.Q(('status', 4), _negated=True), fields=['board', 'title', 'created'], name='goals_goal_alive_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='goalcategory',
+            index=models.Index(condition=models.Q(('is_deleted', False)), fields=['board', 'title'], name='goals_category_alive_idx'),
+        ),
+    ]
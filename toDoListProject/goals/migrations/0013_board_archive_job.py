@@ -0,0 +1,32 @@
+# Generated by Django 4.1.7 on 2026-10-18 18:33
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('goals', '0012_alive_partial_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BoardArchiveJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created', models.DateTimeField(verbose_name='Дата создания')),
+                ('updated', models.DateTimeField(verbose_name='Дата последнего обновления')),
+                ('status', models.PositiveSmallIntegerField(choices=[(1, 'Ожидает'), (2, 'Выполняется'), (3, 'Завершена')], default=1, verbose_name='Статус')),
+                ('goals_total', models.PositiveIntegerField(blank=True, null=True, verbose_name='Целей к архивации')),
+                ('goals_archived', models.PositiveIntegerField(default=0, verbose_name='Целей архивировано')),
+                ('categories_total', models.PositiveIntegerField(blank=True, null=True, verbose_name='Категорий к удалению')),
+                ('categories_deleted', models.PositiveIntegerField(default=0, verbose_name='Категорий удалено')),
+                ('board', models.OneToOneField(on_delete=django.db.models.deletion.PROTECT, related_name='archive_job', to='goals.board', verbose_name='Доска')),
+            ],
+            options={
+                'verbose_name': 'Архивация доски',
+                'verbose_name_plural': 'Архивация досок',
+            },
+        ),
+    ]
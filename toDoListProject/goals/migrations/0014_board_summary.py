@@ -0,0 +1,59 @@
+# Generated by Django 4.1.7 on 2026-10-18 18:37
+
+from collections import Counter, defaultdict
+
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import TruncDate
+import django.db.models.deletion
+
+# Подсчет зафиксирован в миграции, а не берется из goals/summary.py: миграция должна строить сводки
+# в том формате, который был на момент ее написания
+OPEN_STATUSES = (1, 2)  # Goal.Status.to_do, Goal.Status.in_progress
+ARCHIVED = 4  # Goal.Status.archived
+
+
+def build_summaries(apps, schema_editor):
+    # Сводки существующих досок считаются одним GROUP BY по целям; дальше их поддерживают модели
+    Goal = apps.get_model("goals", "Goal")
+    BoardSummary = apps.get_model("goals", "BoardSummary")
+    rows = Goal.objects.exclude(status=ARCHIVED).filter(
+        category__is_deleted=False, board__is_deleted=False
+    ).annotate(due_day=TruncDate("due_date")).order_by().values(
+        "board_id", "status", "priority", "category_id", "due_day"
+    ).annotate(count=Count("id"))
+
+    summaries = defaultdict(Counter)
+    for row in rows:
+        counts = summaries[row["board_id"]]
+        for key in ("total", f"status:{row['status']}", f"priority:{row['priority']}",
+                    f"category:{row['category_id']}"):
+            counts[key] += row["count"]
+        if row["status"] in OPEN_STATUSES and row["due_day"] is not None:
+            counts[f"due:{row['due_day'].isoformat()}"] += row["count"]
+    BoardSummary.objects.bulk_create(
+        BoardSummary(board_id=board_id, counts=dict(counts)) for board_id, counts in summaries.items()
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('goals', '0013_board_archive_job'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BoardSummary',
+            fields=[
+                ('board', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='summary', serialize=False, to='goals.board', verbose_name='Доска')),
+                ('counts', models.JSONField(default=dict, verbose_name='Счетчики')),
+                ('updated', models.DateTimeField(auto_now=True, verbose_name='Дата последнего обновления')),
+            ],
+            options={
+                'verbose_name': 'Сводка доски',
+                'verbose_name_plural': 'Сводки досок',
+            },
+        ),
+        migrations.RunPython(build_summaries, migrations.RunPython.noop),
+    ]
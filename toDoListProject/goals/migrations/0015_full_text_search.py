@@ -0,0 +1,108 @@
+# Generated by Django 4.1.7 on 2026-10-18 19:02
+
+from django.db import migrations
+
+# SQL зафиксирован в миграции, а не берется из goals/search.py: миграция должна создавать ту схему,
+# которая была на момент ее написания, даже если SEARCH_INDEXES потом изменится.
+# Генерируемая колонка пересчитывается самой БД при любом insert/update, в том числе bulk_create и update()
+POSTGRESQL_INSTALL = [
+    "ALTER TABLE goals_goal ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS ("
+    "setweight(to_tsvector('simple', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(description, '')), 'B')) STORED",
+    "CREATE INDEX IF NOT EXISTS goals_goal_search_idx ON goals_goal USING gin (search_vector)",
+    "ALTER TABLE goals_goalcategory ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS ("
+    "setweight(to_tsvector('simple', coalesce(title, '')), 'A')) STORED",
+    "CREATE INDEX IF NOT EXISTS goals_goalcategory_search_idx ON goals_goalcategory USING gin (search_vector)",
+    "ALTER TABLE goals_goalcomment ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS ("
+    "setweight(to_tsvector('simple', coalesce(text, '')), 'A')) STORED",
+    "CREATE INDEX IF NOT EXISTS goals_goalcomment_search_idx ON goals_goalcomment USING gin (search_vector)",
+]
+
+POSTGRESQL_REMOVE = [
+    "DROP INDEX IF EXISTS goals_goal_search_idx",
+    "ALTER TABLE goals_goal DROP COLUMN IF EXISTS search_vector",
+    "DROP INDEX IF EXISTS goals_goalcategory_search_idx",
+    "ALTER TABLE goals_goalcategory DROP COLUMN IF EXISTS search_vector",
+    "DROP INDEX IF EXISTS goals_goalcomment_search_idx",
+    "ALTER TABLE goals_goalcomment DROP COLUMN IF EXISTS search_vector",
+]
+
+# external content: FTS5 хранит только индекс, текст читается из самой таблицы
+SQLITE_INSTALL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS goals_goal_fts USING fts5(title, description, content='goals_goal', "
+    "content_rowid='id', tokenize='unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER IF NOT EXISTS goals_goal_fts_insert AFTER INSERT ON goals_goal BEGIN "
+    "INSERT INTO goals_goal_fts(rowid, title, description) VALUES (new.id, new.title, new.description); END",
+    "CREATE TRIGGER IF NOT EXISTS goals_goal_fts_delete AFTER DELETE ON goals_goal BEGIN "
+    "INSERT INTO goals_goal_fts(goals_goal_fts, rowid, title, description) "
+    "VALUES ('delete', old.id, old.title, old.description); END",
+    "CREATE TRIGGER IF NOT EXISTS goals_goal_fts_update AFTER UPDATE OF title, description ON goals_goal BEGIN "
+    "INSERT INTO goals_goal_fts(goals_goal_fts, rowid, title, description) "
+    "VALUES ('delete', old.id, old.title, old.description); "
+    "INSERT INTO goals_goal_fts(rowid, title, description) VALUES (new.id, new.title, new.description); END",
+    "INSERT INTO goals_goal_fts(goals_goal_fts) VALUES ('rebuild')",
+
+    "CREATE VIRTUAL TABLE IF NOT EXISTS goals_goalcategory_fts USING fts5(title, content='goals_goalcategory', "
+    "content_rowid='id', tokenize='unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER IF NOT EXISTS goals_goalcategory_fts_insert AFTER INSERT ON goals_goalcategory BEGIN "
+    "INSERT INTO goals_goalcategory_fts(rowid, title) VALUES (new.id, new.title); END",
+    "CREATE TRIGGER IF NOT EXISTS goals_goalcategory_fts_delete AFTER DELETE ON goals_goalcategory BEGIN "
+    "INSERT INTO goals_goalcategory_fts(goals_goalcategory_fts, rowid, title) VALUES ('delete', old.id, old.title); "
+    "END",
+    "CREATE TRIGGER IF NOT EXISTS goals_goalcategory_fts_update AFTER UPDATE OF title ON goals_goalcategory BEGIN "
+    "INSERT INTO goals_goalcategory_fts(goals_goalcategory_fts, rowid, title) VALUES ('delete', old.id, old.title); "
+    "INSERT INTO goals_goalcategory_fts(rowid, title) VALUES (new.id, new.title); END",
+    "INSERT INTO goals_goalcategory_fts(goals_goalcategory_fts) VALUES ('rebuild')",
+
+    "CREATE VIRTUAL TABLE IF NOT EXISTS goals_goalcomment_fts USING fts5(text, content='goals_goalcomment', "
+    "content_rowid='id', tokenize='unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER IF NOT EXISTS goals_goalcomment_fts_insert AFTER INSERT ON goals_goalcomment BEGIN "
+    "INSERT INTO goals_goalcomment_fts(rowid, text) VALUES (new.id, new.text); END",
+    "CREATE TRIGGER IF NOT EXISTS goals_goalcomment_fts_delete AFTER DELETE ON goals_goalcomment BEGIN "
+    "INSERT INTO goals_goalcomment_fts(goals_goalcomment_fts, rowid, text) VALUES ('delete', old.id, old.text); END",
+    "CREATE TRIGGER IF NOT EXISTS goals_goalcomment_fts_update AFTER UPDATE OF text ON goals_goalcomment BEGIN "
+    "INSERT INTO goals_goalcomment_fts(goals_goalcomment_fts, rowid, text) VALUES ('delete', old.id, old.text); "
+    "INSERT INTO goals_goalcomment_fts(rowid, text) VALUES (new.id, new.text); END",
+    "INSERT INTO goals_goalcomment_fts(goals_goalcomment_fts) VALUES ('rebuild')",
+]
+
+SQLITE_REMOVE = [
+    f"DROP {kind} IF EXISTS {table}_fts{suffix}"
+    for table in ("goals_goal", "goals_goalcategory", "goals_goalcomment")
+    for kind, suffix in (("TRIGGER", "_insert"), ("TRIGGER", "_delete"), ("TRIGGER", "_update"), ("TABLE", ""))
+]
+
+STATEMENTS = {
+    "postgresql": (POSTGRESQL_INSTALL, POSTGRESQL_REMOVE),
+    "sqlite": (SQLITE_INSTALL, SQLITE_REMOVE),
+}
+
+
+def execute(schema_editor, index: int) -> None:
+    # Схема индексов зависит от БД (tsvector + GIN на PostgreSQL, FTS5 на SQLite), поэтому это не AddField.
+    # Для остальных БД поиск остается на icontains
+    statements = STATEMENTS.get(schema_editor.connection.vendor)
+    if statements is None:
+        return
+    with schema_editor.connection.cursor() as cursor:
+        for statement in statements[index]:
+            cursor.execute(statement)
+
+
+def install(apps, schema_editor):
+    execute(schema_editor, 0)
+
+
+def remove(apps, schema_editor):
+    execute(schema_editor, 1)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('goals', '0014_board_summary'),
+    ]
+
+    operations = [
+        migrations.RunPython(install, remove),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 4.1.7 on 2026-10-18 19:20
+
+from django.db import migrations
+
+# Поиск в админке категорий и icontains по названиям: UPPER(title::text) LIKE UPPER(...) на PostgreSQL
+TRIGRAM_TABLES = ("goals_goal", "goals_goalcategory")
+
+
+def create_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for table in TRIGRAM_TABLES:
+        schema_editor.execute(
+            f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {table}_title_trgm_idx "
+            f"ON {table} USING gin ((UPPER(title::text)) gin_trgm_ops)"
+        )
+
+
+def drop_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for table in TRIGRAM_TABLES:
+        schema_editor.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {table}_title_trgm_idx")
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('goals', '0015_full_text_search'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_indexes, drop_indexes),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.1.7 on 2026-10-18 19:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('goals', '0016_title_trigram_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='goal',
+            index=models.Index(fields=['status', '-id'], name='goals_goal_status_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='goal',
+            index=models.Index(fields=['priority', '-id'], name='goals_goal_priority_id_idx'),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 4.1.7 on 2026-10-18 18:55
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('goals', '0017_goal_status_priority_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChangeLogEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.PositiveSmallIntegerField(choices=[(1, 'Доска'), (2, 'Участник'), (3, 'Категория'), (4, 'Цель'), (5, 'Комментарий')], verbose_name='Тип объекта')),
+                ('object_id', models.BigIntegerField(verbose_name='id объекта')),
+                ('action', models.PositiveSmallIntegerField(choices=[(1, 'Создание'), (2, 'Изменение'), (3, 'Архивация'), (4, 'Удаление')], verbose_name='Действие')),
+                ('created', models.DateTimeField(verbose_name='Дата изменения')),
+                ('board', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='goals.board', verbose_name='Доска')),
+            ],
+            options={
+                'verbose_name': 'Изменение',
+                'verbose_name_plural': 'Журнал изменений',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='changelogentry',
+            index=models.Index(fields=['board', 'id'], name='goals_changelog_board_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='changelogentry',
+            index=models.Index(fields=['kind', 'object_id'], name='goals_changelog_object_idx'),
+        ),
+    ]
@@ -1,7 +1,73 @@
-from django.db import models
+from collections import Counter
+from typing import Iterable, Optional
+
+from django.db import models, transaction
+from django.db.models.functions import Coalesce, Greatest
 from django.utils import timezone
 
 from toDoListProject.core.models import User
+from toDoListProject.goals.summary import count_goals, goal_delta, goal_summary_rows, negate
+from toDoListProject.goals.versions import bump_board_versions
+
+# Условия «живых» строк. Одни и те же выражения используются в частичных индексах и в фильтрах querysets:
+# PostgreSQL применяет частичный индекс, только если может вывести его условие из WHERE запроса
+ALIVE_BOARD = models.Q(is_deleted=False)
+ALIVE_CATEGORY = models.Q(is_deleted=False)
+ALIVE_GOAL = ~models.Q(status=4)  # Goal.Status.archived
+
+
+class ChangeLogEntry(models.Model):
+    """
+    Журнал изменений данных досок (только добавление): кто из объектов доски создан, изменен, архивирован
+    или удален. id записи – метка для синхронизации клиентов (goals/changes.py); старые записи
+    удаляет и схлопывает команда compact_changes
+    """
+    class Meta:
+        verbose_name = "Изменение"
+        verbose_name_plural = "Журнал изменений"
+        indexes = [
+            models.Index(fields=["board", "id"], name="goals_changelog_board_id_idx"),
+            # Поиск более новых записей того же объекта при схлопывании журнала
+            models.Index(fields=["kind", "object_id"], name="goals_changelog_object_idx"),
+        ]
+
+    class Kind(models.IntegerChoices):
+        board = 1, "Доска"
+        participant = 2, "Участник"
+        category = 3, "Категория"
+        goal = 4, "Цель"
+        comment = 5, "Комментарий"
+
+    class Action(models.IntegerChoices):
+        create = 1, "Создание"
+        update = 2, "Изменение"
+        archive = 3, "Архивация"
+        delete = 4, "Удаление"
+
+    # Без внешнего ключа в БД: записи журнала не должны мешать удалению объектов и не нужны в join'ах
+    board = models.ForeignKey("Board", verbose_name="Доска", on_delete=models.DO_NOTHING, db_constraint=False,
+                              related_name="+")
+    kind = models.PositiveSmallIntegerField(verbose_name="Тип объекта", choices=Kind.choices)
+    object_id = models.BigIntegerField(verbose_name="id объекта")
+    action = models.PositiveSmallIntegerField(verbose_name="Действие", choices=Action.choices)
+    created = models.DateTimeField(verbose_name="Дата изменения")
+
+    def __str__(self):
+        return f"{self.get_kind_display()} {self.object_id}: {self.get_action_display()}"
+
+    @classmethod
+    def record(cls, kind: int, action: int, objects: Iterable[tuple]) -> None:
+        """
+        Записывает одно действие для объектов одного типа: objects – пары (board_id, object_id).
+        Записи вставляются одним INSERT в транзакции самого изменения: изменение без записи в журнале
+        не сохраняется. Записи видны после коммита, поэтому порядок id может расходиться с порядком коммитов –
+        это учитывает goals/changes.py (settled_until)
+        """
+        now = timezone.now()
+        entries = [cls(board_id=board_id, kind=kind, object_id=object_id, action=action, created=now)
+                   for board_id, object_id in objects if board_id]
+        if entries:
+            cls.objects.bulk_create(entries)
 
 
 class DatesModelMixin(models.Model):
@@ -11,17 +77,149 @@ class DatesModelMixin(models.Model):
     created = models.DateTimeField(verbose_name="Дата создания")
     updated = models.DateTimeField(verbose_name="Дата последнего обновления")
 
+    change_kind = None  # ChangeLogEntry.Kind: изменения записей модели попадают в журнал изменений
+
+    def get_board_id(self):
+        """
+        Доска, к данным которой относится запись: при каждом изменении записи увеличивается версия доски
+        """
+        return getattr(self, "board_id", None)
+
+    def get_change_action(self, created: bool) -> int:
+        """
+        Действие для журнала изменений при сохранении записи
+        """
+        return ChangeLogEntry.Action.create if created else ChangeLogEntry.Action.update
+
     def save(self, *args, **kwargs):
-        if not self.id:  # Когда модель только создается – у нее нет id
+        created = not self.id
+        if created:  # Когда модель только создается – у нее нет id
             self.created = timezone.now()
         self.updated = timezone.now()  # Каждый раз, когда вызывается save, проставляем свежую дату обновления
-        return super().save(*args, **kwargs)
+        action = self.get_change_action(created)
+        # Запись и журнал изменений сохраняются вместе или не сохраняются вовсе
+        with transaction.atomic(savepoint=False):
+            result = super().save(*args, **kwargs)
+            if self.change_kind is not None:
+                ChangeLogEntry.record(self.change_kind, action, [(self.get_board_id(), self.pk)])
+        bump_board_versions([self.get_board_id()])
+        return result
+
+    def delete(self, *args, **kwargs):
+        board_id, pk = self.get_board_id(), self.pk
+        with transaction.atomic(savepoint=False):
+            result = super().delete(*args, **kwargs)
+            if self.change_kind is not None:
+                ChangeLogEntry.record(self.change_kind, ChangeLogEntry.Action.delete, [(board_id, pk)])
+        bump_board_versions([board_id])
+        return result
+
+
+def board_participation(user, board_ref: str) -> models.Exists:
+    """
+    Коррелированный подзапрос «пользователь является участником неудаленной доски board_ref».
+    В отличие от join'а по participants не размножает строки внешнего запроса
+    и выполняется по индексу (user, board, role) таблицы участников.
+    Условие на доску делает ее данные недоступными сразу после удаления, не дожидаясь,
+    пока BoardArchiveJob архивирует категории и цели
+    """
+    return models.Exists(
+        BoardParticipant.objects.filter(board_id=models.OuterRef(board_ref), user_id=user.id, board__is_deleted=False)
+    )
+
+
+def count_subquery(queryset: models.QuerySet) -> models.Func:
+    """
+    Число строк коррелированного queryset (фильтр по OuterRef) как выражение для annotate; 0, если строк нет
+    """
+    return Coalesce(
+        models.Subquery(queryset.order_by().values("board_id").annotate(count=models.Count("pk")).values("count")[:1]),
+        0,
+    )
+
+
+class BoardQuerySet(models.QuerySet):
+    def alive(self) -> "BoardQuerySet":
+        return self.filter(ALIVE_BOARD)
+
+    def visible_to(self, user) -> "BoardQuerySet":
+        """
+        Доски, участником которых является пользователь
+        """
+        return self.alive().filter(board_participation(user, "pk"))
+
+    def with_stats(self, user, fields: Optional[Iterable[str]] = None) -> "BoardQuerySet":
+        """
+        Статистика досок в том же SQL-запросе, что и сами доски (коррелированные подзапросы по индексам доски):
+        число неархивных целей по статусам, число участников, роль пользователя и время последней активности.
+        fields – какие из аннотаций нужны (None – все)
+        """
+        board = models.OuterRef("pk")
+        goals = Goal.objects.filter(ALIVE_GOAL, board_id=board, category__is_deleted=False)
+        updated = models.F("updated")
+        annotations = {
+            "goals_to_do": count_subquery(goals.filter(status=Goal.Status.to_do)),
+            "goals_in_progress": count_subquery(goals.filter(status=Goal.Status.in_progress)),
+            "goals_done": count_subquery(goals.filter(status=Goal.Status.done)),
+            "participants_count": count_subquery(BoardParticipant.objects.filter(board_id=board)),
+            "role": models.Subquery(BoardParticipant.objects.filter(board_id=board, user_id=user.id).values("role")[:1]),
+            "last_activity": Greatest(
+                updated,
+                Coalesce(models.Subquery(
+                    Goal.objects.filter(board_id=board).order_by("-updated").values("updated")[:1]
+                ), updated),
+                Coalesce(models.Subquery(
+                    GoalComment.objects.filter(board_id=board).order_by("-updated").values("updated")[:1]
+                ), updated),
+                output_field=models.DateTimeField(),
+            ),
+        }
+        if fields is not None:
+            annotations = {name: value for name, value in annotations.items() if name in fields}
+        return self.annotate(**annotations)
+
+
+class GoalCategoryQuerySet(models.QuerySet):
+    def alive(self) -> "GoalCategoryQuerySet":
+        return self.filter(ALIVE_CATEGORY)
+
+    def visible_to(self, user) -> "GoalCategoryQuerySet":
+        """
+        Неудаленные категории с досок, участником которых является пользователь
+        """
+        return self.alive().filter(board_participation(user, "board_id"))
+
+
+class GoalQuerySet(models.QuerySet):
+    def alive(self) -> "GoalQuerySet":
+        return self.filter(ALIVE_GOAL, category__is_deleted=False)
+
+    def visible_to(self, user) -> "GoalQuerySet":
+        """
+        Неархивные цели из неудаленных категорий на досках пользователя
+        """
+        return self.alive().filter(board_participation(user, "board_id"))
+
+
+class GoalCommentQuerySet(models.QuerySet):
+    def visible_to(self, user) -> "GoalCommentQuerySet":
+        """
+        Комментарии к целям на досках, участником которых является пользователь
+        """
+        return self.filter(board_participation(user, "board_id"))
 
 
 class Board(DatesModelMixin):
     class Meta:
         verbose_name = "Доска"
         verbose_name_plural = "Доски"
+        indexes = [
+            models.Index(fields=["title"], condition=ALIVE_BOARD, name="goals_board_alive_title_idx"),
+        ]
+
+    objects = BoardQuerySet.as_manager()
+
+    change_kind = ChangeLogEntry.Kind.board
 
     title = models.CharField(verbose_name="Название", max_length=255)
     is_deleted = models.BooleanField(verbose_name="Удалена", default=False)
@@ -29,13 +227,25 @@ class Board(DatesModelMixin):
     def __str__(self):
         return self.title
 
+    def get_board_id(self):
+        return self.pk
+
+    def get_change_action(self, created: bool) -> int:
+        return ChangeLogEntry.Action.archive if self.is_deleted else super().get_change_action(created)
+
 
 class BoardParticipant(DatesModelMixin):
     class Meta:
         unique_together = ("board", "user")
+        indexes = [
+            # Покрывающий индекс для подзапросов board_participation: проверка доступа без чтения таблицы
+            models.Index(fields=["user", "board", "role"], name="goals_participant_access_idx"),
+        ]
         verbose_name = "Участник"
         verbose_name_plural = "Участники"
 
+    change_kind = ChangeLogEntry.Kind.participant
+
     class Role(models.IntegerChoices):
         owner = 1, "Владелец"
         writer = 2, "Редактор"
@@ -53,6 +263,12 @@ class GoalCategory(DatesModelMixin):
     class Meta:
         verbose_name = "Категория"
         verbose_name_plural = "Категории"
+        indexes = [
+            models.Index(fields=["board", "title"], condition=ALIVE_CATEGORY, name="goals_category_alive_idx"),
+        ]
+
+    objects = GoalCategoryQuerySet.as_manager()
+    change_kind = ChangeLogEntry.Kind.category
 
     title = models.CharField(verbose_name="Название", max_length=255)
     user = models.ForeignKey(User, verbose_name="Автор", on_delete=models.PROTECT)
@@ -62,11 +278,41 @@ class GoalCategory(DatesModelMixin):
     def __str__(self):
         return self.title
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_is_deleted = instance.__dict__.get("is_deleted")
+        return instance
+
+    def get_change_action(self, created: bool) -> int:
+        if self.is_deleted and getattr(self, "_loaded_is_deleted", None) is False:
+            return ChangeLogEntry.Action.archive
+        return super().get_change_action(created)
+
+    def save(self, *args, **kwargs):
+        result = super().save(*args, **kwargs)
+        if self.is_deleted and getattr(self, "_loaded_is_deleted", None) is False:
+            # Цели удаленной категории больше не видны – убираем их из сводки доски
+            BoardSummary.apply(negate(count_goals(goal_summary_rows(Goal.objects.filter(category_id=self.pk)))))
+        self._loaded_is_deleted = self.is_deleted
+        return result
+
 
 class Goal(DatesModelMixin):
     class Meta:
         verbose_name = "Цель"
         verbose_name_plural = "Цели"
+        indexes = [
+            models.Index(fields=["board", "status", "due_date"], name="goals_goal_board_status_idx"),
+            models.Index(fields=["board", "priority"], name="goals_goal_board_priority_idx"),
+            models.Index(fields=["board", "title", "created"], condition=ALIVE_GOAL, name="goals_goal_alive_idx"),
+            # Фильтры админки по статусу и приоритету без доски: страница читается по индексу в порядке -id
+            models.Index(fields=["status", "-id"], name="goals_goal_status_id_idx"),
+            models.Index(fields=["priority", "-id"], name="goals_goal_priority_id_idx"),
+        ]
+
+    objects = GoalQuerySet.as_manager()
+    change_kind = ChangeLogEntry.Kind.goal
 
     class Status(models.IntegerChoices):
         to_do = 1, "К выполнению"
@@ -88,23 +334,177 @@ class Goal(DatesModelMixin):
     priority = models.PositiveSmallIntegerField(verbose_name="Приоритет", choices=Priority.choices,
                                                 default=Priority.medium)
     due_date = models.DateTimeField(verbose_name="Дата дедлайна")
+    # Денормализованная доска категории: доступ и фильтры по доске без join'а через категорию
+    board = models.ForeignKey(Board, verbose_name="Доска", on_delete=models.PROTECT, related_name="goals",
+                              editable=False)
 
     def __str__(self):
         return self.title
 
+    SUMMARY_FIELDS = ("status", "priority", "category_id", "due_date")
+
+    def get_summary_values(self) -> Optional[tuple]:
+        """
+        Поля, от которых зависит вклад цели в BoardSummary, или None, если часть из них не загружена (only())
+        """
+        values = tuple(self.__dict__.get(name, models.DEFERRED) for name in self.SUMMARY_FIELDS)
+        return None if models.DEFERRED in values else values
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_board_id = instance.__dict__.get("board_id")
+        instance._loaded_category_id = instance.__dict__.get("category_id")
+        instance._loaded_summary = instance.get_summary_values()
+        return instance
+
+    def get_change_action(self, created: bool) -> int:
+        loaded_summary = getattr(self, "_loaded_summary", None)
+        if self.status == Goal.Status.archived and not created and (
+                loaded_summary is None or loaded_summary[0] != Goal.Status.archived):
+            return ChangeLogEntry.Action.archive
+        return super().get_change_action(created)
+
+    def save(self, *args, **kwargs):
+        loaded_board_id = getattr(self, "_loaded_board_id", None)
+        loaded_summary = getattr(self, "_loaded_summary", None)
+        if loaded_board_id is not None and loaded_summary is None:
+            loaded_summary = Goal.objects.filter(pk=self.pk).values_list(*self.SUMMARY_FIELDS).first()
+        if loaded_board_id is None or self.category_id != getattr(self, "_loaded_category_id", None):
+            category = self.category
+            if category.pk != self.category_id:  # category_id поменяли напрямую, закешированная категория устарела
+                Goal.category.field.delete_cached_value(self)
+                category = self.category
+            self.board_id = category.board_id
+        summary = self.get_summary_values()
+        with transaction.atomic(savepoint=False):
+            result = super().save(*args, **kwargs)
+            if loaded_board_id is not None and loaded_board_id != self.board_id:
+                # Цель перенесли в категорию другой доски – переносим и ее комментарии
+                move_goals([(self.pk, loaded_board_id)], self.board_id)
+                bump_board_versions([loaded_board_id])
+            BoardSummary.apply(goal_delta(loaded_board_id, loaded_summary, self.board_id, summary))
+        self._loaded_board_id, self._loaded_category_id = self.board_id, self.category_id
+        self._loaded_summary = summary
+        return result
+
+    def delete(self, *args, **kwargs):
+        board_id = getattr(self, "_loaded_board_id", None) or self.board_id
+        summary = getattr(self, "_loaded_summary", None) or self.get_summary_values()
+        with transaction.atomic(savepoint=False):
+            result = super().delete(*args, **kwargs)
+            BoardSummary.apply(goal_delta(board_id, summary, None, None))
+        return result
+
 
 class GoalComment(DatesModelMixin):
     class Meta:
         verbose_name = "Комментарий"
         verbose_name_plural = "Комментарии"
         ordering = ["-created"]
+        indexes = [
+            models.Index(fields=["goal", "-created"], name="goals_comment_goal_created_idx"),
+        ]
+
+    objects = GoalCommentQuerySet.as_manager()
+    change_kind = ChangeLogEntry.Kind.comment
 
     text = models.CharField(verbose_name="Текст", max_length=255)
     goal = models.ForeignKey(Goal, verbose_name="Цель", on_delete=models.CASCADE)
     user = models.ForeignKey(User, verbose_name="Автор", on_delete=models.PROTECT)
+    # Денормализованная доска цели, поддерживается в save() и при переносе цели
+    board = models.ForeignKey(Board, verbose_name="Доска", on_delete=models.PROTECT, related_name="comments",
+                              editable=False)
 
     def __str__(self):
         return self.text
 
+    def save(self, *args, **kwargs):
+        goal = self.goal
+        if goal.pk != self.goal_id:
+            GoalComment.goal.field.delete_cached_value(self)
+            goal = self.goal
+        self.board_id = goal.board_id
+        return super().save(*args, **kwargs)
+
+
+def move_goals(goals: Iterable[tuple], board_id: int) -> None:
+    """
+    Записывает в журнал перенос целей (пары (goal_id, прежняя доска)) на доску board_id и переносит туда
+    их комментарии. Для прежней доски цель и комментарии удалены, для новой – изменены
+    """
+    goals = [(goal_id, old_board_id) for goal_id, old_board_id in goals if old_board_id != board_id]
+    if not goals:
+        return
+    old_boards = dict(goals)
+    comments = list(GoalComment.objects.filter(goal_id__in=old_boards).values_list("id", "goal_id"))
+    GoalComment.objects.filter(goal_id__in=old_boards).update(board_id=board_id)
+    # Удаление с прежней доски записывается раньше изменения: при схлопывании по объекту для клиента,
+    # который видит обе доски, последним остается изменение
+    ChangeLogEntry.record(ChangeLogEntry.Kind.goal, ChangeLogEntry.Action.delete,
+                          [(old_board_id, goal_id) for goal_id, old_board_id in goals])
+    ChangeLogEntry.record(ChangeLogEntry.Kind.comment, ChangeLogEntry.Action.delete,
+                          [(old_boards[goal_id], comment_id) for comment_id, goal_id in comments])
+    ChangeLogEntry.record(ChangeLogEntry.Kind.goal, ChangeLogEntry.Action.update,
+                          [(board_id, goal_id) for goal_id, _ in goals])
+    ChangeLogEntry.record(ChangeLogEntry.Kind.comment, ChangeLogEntry.Action.update,
+                          [(board_id, comment_id) for comment_id, _ in comments])
+
+
+class BoardArchiveJob(DatesModelMixin):
+    """
+    Фоновая архивация категорий и целей удаленной доски (см. goals/archiving.py и команду archive_boards)
+    """
+    class Meta:
+        verbose_name = "Архивация доски"
+        verbose_name_plural = "Архивация досок"
+
+    class Status(models.IntegerChoices):
+        pending = 1, "Ожидает"
+        running = 2, "Выполняется"
+        done = 3, "Завершена"
 
+    board = models.OneToOneField(Board, verbose_name="Доска", on_delete=models.PROTECT, related_name="archive_job")
+    status = models.PositiveSmallIntegerField(verbose_name="Статус", choices=Status.choices, default=Status.pending)
+    goals_total = models.PositiveIntegerField(verbose_name="Целей к архивации", null=True, blank=True)
+    goals_archived = models.PositiveIntegerField(verbose_name="Целей архивировано", default=0)
+    categories_total = models.PositiveIntegerField(verbose_name="Категорий к удалению", null=True, blank=True)
+    categories_deleted = models.PositiveIntegerField(verbose_name="Категорий удалено", default=0)
+
+    def __str__(self):
+        return f"{self.board_id}: {self.get_status_display()}"
+
+
+class BoardSummary(models.Model):
+    """
+    Сводка по целям доски (см. goals/summary.py). Поддерживается инкрементально при изменении целей,
+    поэтому читается одним запросом по первичному ключу; пересчитать и сверить ее можно командой board_summary
+    """
+    class Meta:
+        verbose_name = "Сводка доски"
+        verbose_name_plural = "Сводки досок"
+
+    board = models.OneToOneField(Board, verbose_name="Доска", on_delete=models.CASCADE, primary_key=True,
+                                 related_name="summary")
+    counts = models.JSONField(verbose_name="Счетчики", default=dict)
+    updated = models.DateTimeField(verbose_name="Дата последнего обновления", auto_now=True)
+
+    def __str__(self):
+        return str(self.board_id)
 
+    @classmethod
+    def apply(cls, deltas: dict) -> None:
+        """
+        Прибавляет к сводкам изменения {board_id: Counter}. Строка сводки блокируется на время изменения,
+        доски обрабатываются в порядке id, чтобы параллельные транзакции не блокировали друг друга
+        """
+        for board_id in sorted(deltas):
+            delta = {key: value for key, value in deltas[board_id].items() if value}
+            if not delta:
+                continue
+            with transaction.atomic():
+                summary, _ = cls.objects.select_for_update().get_or_create(board_id=board_id)
+                counts = Counter(summary.counts)
+                counts.update(delta)
+                summary.counts = {key: value for key, value in counts.items() if value}
+                summary.save()
@@ -0,0 +1,223 @@
+import base64
+import binascii
+import datetime
+import json
+from collections import OrderedDict
+
+from django.core.exceptions import FieldDoesNotExist
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Q, QuerySet
+from django.utils.functional import cached_property
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import LimitOffsetPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class CursorOrLimitOffsetPagination(LimitOffsetPagination):
+    """
+    Пагинация для списков целей, категорий, комментариев и досок.
+
+    По умолчанию работает как обычная LimitOffsetPagination (limit/offset + count).
+    Клиент может переключиться на курсорную (keyset) пагинацию, передав ?pagination=cursor
+    (или сразу ?cursor=<token> из ссылки next/previous). В этом режиме:
+    - не выполняется COUNT(*);
+    - вместо OFFSET используется условие «строго после последней записи страницы»
+      по полям сортировки + id, поэтому время ответа не зависит от глубины страницы.
+    """
+    cursor_query_param = "cursor"
+    pagination_query_param = "pagination"
+    cursor_mode = "cursor"
+    default_cursor_page_size = 100
+    max_cursor_page_size = 1000
+    invalid_cursor_message = "Invalid cursor"
+
+    def __init__(self):
+        self.use_cursor = False
+
+    def is_cursor_request(self, request) -> bool:
+        return (self.cursor_query_param in request.query_params
+                or request.query_params.get(self.pagination_query_param) == self.cursor_mode)
+
+    def paginate_queryset(self, queryset: QuerySet, request, view=None):
+        self.request = request
+        self.use_cursor = self.is_cursor_request(request)
+        if not self.use_cursor:
+            return super().paginate_queryset(queryset, request, view)
+        return self.paginate_queryset_by_cursor(queryset, request)
+
+    def get_paginated_response(self, data) -> Response:
+        if not self.use_cursor:
+            return super().get_paginated_response(data)
+        return Response(OrderedDict([
+            ("next", self.get_next_link()),
+            ("previous", self.get_previous_link()),
+            ("results", data),
+        ]))
+
+    def get_next_link(self):
+        if not self.use_cursor:
+            return super().get_next_link()
+        if not self.has_next:
+            return None
+        return self.encode_cursor(self.next_position, reverse=False)
+
+    def get_previous_link(self):
+        if not self.use_cursor:
+            return super().get_previous_link()
+        if not self.has_previous:
+            return None
+        return self.encode_cursor(self.previous_position, reverse=True)
+
+    def get_cursor_page_size(self, request) -> int:
+        try:
+            page_size = int(request.query_params[self.limit_query_param])
+        except (KeyError, ValueError):
+            return api_settings.PAGE_SIZE or self.default_cursor_page_size
+        if page_size <= 0:
+            return api_settings.PAGE_SIZE or self.default_cursor_page_size
+        return min(page_size, self.max_cursor_page_size)
+
+    def get_keyset_ordering(self, queryset: QuerySet) -> list:
+        """
+        Сортировка страницы: то, что уже выставил OrderingFilter (или Meta.ordering модели),
+        плюс id в качестве последнего ключа, чтобы позиция в выборке была однозначной
+        """
+        ordering = list(queryset.query.order_by or queryset.model._meta.ordering)
+        opts = queryset.model._meta
+        keyset = []
+        for item in ordering:
+            if not isinstance(item, str):
+                raise ValidationError("Cursor pagination is not supported for this ordering")
+            name = item.lstrip("-")
+            name = opts.pk.name if name == "pk" else name
+            try:
+                field = opts.get_field(name)
+            except FieldDoesNotExist:
+                raise ValidationError(f"Cursor pagination is not supported for ordering by '{name}'")
+            if not field.concrete or field.null or field.is_relation:
+                raise ValidationError(f"Cursor pagination is not supported for ordering by '{name}'")
+            keyset.append(("-" if item.startswith("-") else "") + field.attname)
+            if field.primary_key:
+                return keyset
+        descending = bool(keyset) and keyset[-1].startswith("-")
+        keyset.append(("-" if descending else "") + opts.pk.attname)
+        return keyset
+
+    def paginate_queryset_by_cursor(self, queryset: QuerySet, request) -> list:
+        self.page_size = self.get_cursor_page_size(request)
+        self.ordering = self.get_keyset_ordering(queryset)
+        position, reverse = self.decode_cursor(request)
+
+        ordering = [self.invert(item) for item in self.ordering] if reverse else self.ordering
+        queryset = queryset.order_by(*ordering)
+        if position is not None:
+            queryset = queryset.filter(self.keyset_filter(ordering, position))
+
+        results = list(queryset[:self.page_size + 1])
+        has_more = len(results) > self.page_size
+        results = results[:self.page_size]
+        if reverse:
+            results.reverse()
+            self.has_next = position is not None
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = position is not None
+
+        if results:
+            self.next_position = self.get_position(results[-1])
+            self.previous_position = self.get_position(results[0])
+        else:
+            # Пустая страница: из нее можно вернуться только туда, откуда пришли
+            self.next_position = self.previous_position = position
+        return results
+
+    @staticmethod
+    def invert(item: str) -> str:
+        return item[1:] if item.startswith("-") else "-" + item
+
+    @staticmethod
+    def keyset_filter(ordering: list, position: list) -> Q:
+        """
+        Лексикографическое сравнение «строка идет после position» с учетом направления сортировки:
+        (a > x) OR (a = x AND b > y) OR (a = x AND b = y AND c > z) ...
+        """
+        condition = Q()
+        equal = Q()
+        for item, value in zip(ordering, position):
+            name = item.lstrip("-")
+            lookup = "lt" if item.startswith("-") else "gt"
+            condition |= equal & Q(**{f"{name}__{lookup}": value})
+            equal &= Q(**{name: value})
+        return condition
+
+    def get_position(self, obj) -> list:
+        position = []
+        for item in self.ordering:
+            # Страница может состоять из моделей или из словарей values() (ProjectionListMixin)
+            value = obj[item.lstrip("-")] if isinstance(obj, dict) else getattr(obj, item.lstrip("-"))
+            if isinstance(value, (datetime.datetime, datetime.date)):
+                value = value.isoformat()
+            position.append(value)
+        return position
+
+    def encode_cursor(self, position: list, reverse: bool) -> str:
+        # Сортировка хранится в курсоре: позиция имеет смысл только для тех же колонок
+        token = json.dumps({"o": self.ordering, "p": position, "r": reverse}, separators=(",", ":"))
+        encoded = base64.urlsafe_b64encode(token.encode()).decode()
+        url = self.request.build_absolute_uri()
+        url = remove_query_param(url, self.offset_query_param)
+        url = remove_query_param(url, self.pagination_query_param)
+        return replace_query_param(url, self.cursor_query_param, encoded)
+
+    def decode_cursor(self, request) -> tuple:
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            token = json.loads(base64.urlsafe_b64decode(encoded.encode()).decode())
+            ordering, position, reverse = token["o"], token["p"], bool(token["r"])
+        except (TypeError, ValueError, KeyError, binascii.Error, UnicodeDecodeError):
+            raise NotFound(self.invalid_cursor_message)
+        # Курсор с другой сортировкой (?ordering= сменили) сравнивался бы не с теми колонками
+        if ordering != self.ordering or not isinstance(position, list) or len(position) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        return position, reverse
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator для списков админки по большим таблицам: вместо COUNT(*) по всей таблице берет оценку
+    планировщика PostgreSQL – pg_class.reltuples для выборки без фильтров и число строк из EXPLAIN
+    для выборки с фильтрами. Если оценка меньше exact_count_limit (или БД не PostgreSQL),
+    считает точно: на небольших выборках COUNT(*) дешевый, а номера страниц точные
+    """
+    exact_count_limit = 100000
+
+    @cached_property
+    def count(self) -> int:
+        estimate = self.estimate_count()
+        if estimate is not None and estimate >= self.exact_count_limit:
+            return estimate
+        return super().count
+
+    def estimate_count(self):
+        queryset = self.object_list
+        if not isinstance(queryset, QuerySet) or connections[queryset.db].vendor != "postgresql":
+            return None
+        with connections[queryset.db].cursor() as cursor:
+            if not queryset.query.where:
+                cursor.execute("SELECT reltuples FROM pg_class WHERE oid = %s::regclass",
+                               [queryset.model._meta.db_table])
+                row = cursor.fetchone()
+                # -1 – таблицу еще ни разу не анализировали
+                if row is not None and row[0] >= 0:
+                    return int(row[0])
+            sql, params = queryset.order_by().query.sql_with_params()
+            cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+            plan = cursor.fetchone()[0]
+        plan = json.loads(plan) if isinstance(plan, str) else plan
+        return int(plan[0]["Plan"]["Plan Rows"])
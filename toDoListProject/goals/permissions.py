@@ -1,6 +1,7 @@
 from rest_framework import permissions
 
-from toDoListProject.goals.models import BoardParticipant, Goal, GoalComment, Board
+from toDoListProject.goals.access import get_access_context
+from toDoListProject.goals.models import Goal, GoalComment, Board, GoalCategory
 
 
 class BoardPermissions(permissions.BasePermission):
@@ -8,24 +9,22 @@ class BoardPermissions(permissions.BasePermission):
         if not request.user.is_authenticated:
             return False
         if request.method in permissions.SAFE_METHODS:
-            return BoardParticipant.objects.filter(
-                user=request.user, board=obj
-            ).exists()
-        return BoardParticipant.objects.filter(
-            user=request.user, board=obj, role=BoardParticipant.Role.owner
-        ).exists()
+            return get_access_context(request).can_read(obj.pk)
+        return get_access_context(request).is_owner(obj.pk)
+
+
+class GoalCategoryPermission(permissions.IsAuthenticated):
+    def has_object_permission(self, request, view, obj: GoalCategory):
+        if request.method in permissions.SAFE_METHODS:
+            return get_access_context(request).can_read(obj.board_id)
+        return get_access_context(request).can_write(obj.board_id)
 
 
 class GoalPermission(permissions.IsAuthenticated):
     def has_object_permission(self, request, view, obj: Goal):
         if request.method in permissions.SAFE_METHODS:
-            return BoardParticipant.objects.filter(
-                user_id=request.user.id, board_id=obj.category.board_id
-            ).exists()
-        return BoardParticipant.objects.filter(
-            user_id=request.user.id, board_id=obj.category.board_id,
-            role__in=[BoardParticipant.Role.owner, BoardParticipant.Role.writer]
-        ).exists()
+            return get_access_context(request).can_read(obj.board_id)
+        return get_access_context(request).can_write(obj.board_id)
 
 
 class IsOwnerOrReadOnly(permissions.BasePermission):
@@ -37,7 +36,11 @@ class IsOwnerOrReadOnly(permissions.BasePermission):
 
 class CommentCreatePermission(permissions.IsAuthenticated):
     def has_permission(self, request, view):
-        return BoardParticipant.objects.filter(
-                user_id=request.user.id, board_id=Goal.objects.get(id=request.data["goal"]).category.board_id,
-                role__in=[BoardParticipant.Role.owner, BoardParticipant.Role.writer]
-            ).exists()
+        if not super().has_permission(request, view):
+            return False
+        try:
+            goal_id = int(request.data["goal"])
+        except (KeyError, TypeError, ValueError):
+            return False
+        board_id = Goal.objects.filter(id=goal_id).values_list("board_id", flat=True).first()
+        return board_id is not None and get_access_context(request).can_write(board_id)
@@ -0,0 +1,117 @@
+from functools import lru_cache
+from typing import Callable, Iterable, Optional
+
+from django.core.exceptions import ImproperlyConfigured
+from rest_framework import serializers
+from rest_framework.response import Response
+
+
+def _passthrough(value):
+    return value
+
+
+class Projection:
+    """
+    Заранее собранное отображение ModelSerializer на колонки values().
+
+    Строит тот же JSON, что и serializer(..., many=True).data, но из словарей values(): без создания
+    экземпляров моделей и без обхода полей сериалайзера для каждой строки. Значения простых полей
+    преобразуются тем же to_representation, что и у сериалайзера, поэтому ответ совпадает побайтно
+    """
+
+    def __init__(self, serializer_class, fields: Optional[frozenset] = None):
+        self.serializer_class = serializer_class
+        self.columns = []
+        self.builders = self.compile(serializer_class(), prefix="", fields=fields)
+
+    def compile(self, serializer, prefix: str, fields: Optional[frozenset] = None) -> list:
+        builders = []
+        for name, field in serializer.fields.items():
+            if field.write_only or (fields is not None and name not in fields):
+                continue
+            if field.source == "*" or isinstance(field, (serializers.ListSerializer, serializers.ManyRelatedField,
+                                                         serializers.SerializerMethodField)):
+                raise ImproperlyConfigured(
+                    f"{self.serializer_class.__name__}.{name}: field is not supported by Projection"
+                )
+            lookup = prefix + field.source.replace(".", "__")
+            if isinstance(field, serializers.Serializer):
+                builders.append((name, self.compile_nested(field, lookup)))
+            elif isinstance(field, serializers.PrimaryKeyRelatedField):
+                builders.append((name, self.compile_column(lookup, _passthrough)))
+            elif isinstance(field, serializers.SlugRelatedField):
+                builders.append((name, self.compile_column(f"{lookup}__{field.slug_field}", _passthrough)))
+            elif isinstance(field, serializers.RelatedField):
+                raise ImproperlyConfigured(
+                    f"{self.serializer_class.__name__}.{name}: field is not supported by Projection"
+                )
+            else:
+                builders.append((name, self.compile_column(lookup, field.to_representation)))
+        return builders
+
+    def compile_column(self, column: str, to_representation: Callable) -> Callable:
+        self.columns.append(column)
+
+        def build(row: dict):
+            value = row[column]
+            return None if value is None else to_representation(value)
+        return build
+
+    def compile_nested(self, serializer, lookup: str) -> Callable:
+        pk_column = f"{lookup}__{serializer.Meta.model._meta.pk.attname}"
+        builders = self.compile(serializer, prefix=f"{lookup}__")
+        if pk_column not in self.columns:
+            self.columns.append(pk_column)
+
+        def build(row: dict):
+            # Пустой внешний ключ – вложенный объект отсутствует, как и у сериалайзера
+            if row[pk_column] is None:
+                return None
+            return {name: builder(row) for name, builder in builders}
+        return build
+
+    def represent(self, rows: Iterable[dict]) -> list:
+        builders = self.builders
+        return [{name: builder(row) for name, builder in builders} for row in rows]
+
+
+@lru_cache(maxsize=None)
+def get_projection(serializer_class, fields: Optional[frozenset] = None) -> Projection:
+    """
+    Projection для сериалайзера (и набора полей fields, если клиент запросил не все поля)
+    """
+    return Projection(serializer_class, fields)
+
+
+class ProjectionListMixin:
+    """
+    list() для ListAPIView через values() и Projection вместо ModelSerializer
+    """
+    use_projection = True
+
+    def get_requested_fields(self) -> Optional[frozenset]:
+        """
+        Поля ответа, выбранные клиентом (см. SparseFieldsetMixin); None – все поля сериалайзера
+        """
+        return None
+
+    def get_projection(self) -> Projection:
+        return get_projection(self.get_serializer_class(), self.get_requested_fields())
+
+    def list(self, request, *args, **kwargs) -> Response:
+        if not self.use_projection:
+            return super().list(request, *args, **kwargs)
+        projection = self.get_projection()
+        queryset = self.filter_queryset(self.get_queryset())
+        # Поля сортировки нужны курсорной пагинации, даже если клиент не запросил их в ответе
+        ordering = [item.lstrip("-") for item in queryset.query.order_by or queryset.model._meta.ordering
+                    if isinstance(item, str)]
+        queryset = queryset.values(*projection.columns, *[
+            name for name in dict.fromkeys(ordering + [queryset.model._meta.pk.attname])
+            if name not in projection.columns
+        ])
+
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(projection.represent(page))
+        return Response(projection.represent(queryset))
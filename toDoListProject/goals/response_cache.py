@@ -0,0 +1,128 @@
+import hashlib
+from typing import Callable, Optional
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.response import Response
+
+from toDoListProject.goals.access import get_access_context
+from toDoListProject.goals.versions import get_board_versions, is_process_local, versions_are_shared
+
+RESPONSE_CACHE_ALIAS = "goals_responses"
+RESPONSE_CACHE_TIMEOUT = 10 * 60
+HIT, MISS = "hit", "miss"
+
+
+def get_response_cache():
+    return caches[getattr(settings, "GOALS_RESPONSE_CACHE", RESPONSE_CACHE_ALIAS)]
+
+
+def response_cache_is_shared() -> bool:
+    """
+    Страницы и версии досок видны всем процессам: иначе запись из бота или фоновой команды не меняет
+    версию в кеше api, и закешированная страница остается устаревшей до таймаута
+    """
+    return versions_are_shared() and not is_process_local(get_response_cache())
+
+
+def counter_key(view_name: str, outcome: str) -> str:
+    return f"goals:response_cache:{outcome}:{view_name}"
+
+
+def count(view_name: str, outcome: str) -> None:
+    response_cache = get_response_cache()
+    key = counter_key(view_name, outcome)
+    # add не перезапишет существующий счетчик, а incr атомарен в memcached/redis
+    response_cache.add(key, 0, None)
+    try:
+        response_cache.incr(key)
+    except ValueError:
+        # Счетчик успели вытеснить между add и incr – один промах в статистике не важен
+        pass
+
+
+def get_counters(view_names) -> dict:
+    """
+    Счетчики попаданий и промахов: {view_name: {"hit": n, "miss": n}}
+    """
+    keys = {(name, outcome): counter_key(name, outcome) for name in view_names for outcome in (HIT, MISS)}
+    values = get_response_cache().get_many(list(keys.values()))
+    counters = {name: {HIT: 0, MISS: 0} for name in view_names}
+    for (name, outcome), key in keys.items():
+        counters[name][outcome] = values.get(key, 0)
+    return counters
+
+
+def reset_counters(view_names) -> None:
+    get_response_cache().delete_many([counter_key(name, outcome) for name in view_names for outcome in (HIT, MISS)])
+
+
+class ResponseCacheMixin:
+    """
+    Общий для пользователей кеш страниц списка.
+
+    Ключ – версии и роли доступных пользователю досок плюс нормализованные параметры запроса
+    (фильтры, поиск, сортировка, пагинация, набор полей). Пользователи с одинаковым набором досок
+    получают одну и ту же закешированную страницу. Любое изменение данных доски, в том числе профиля
+    ее пользователей (bump_user_boards), увеличивает ее версию (goals/versions.py), поэтому старые страницы просто перестают запрашиваться и истекают по таймауту –
+    перебирать ключи при инвалидации не нужно.
+
+    Бэкенд задается отдельным алиасом CACHES (по умолчанию goals_responses, см. RESPONSE_CACHE_URL).
+    С кешем в памяти процесса страницы не кешируются (response_cache_is_shared)
+    """
+    response_cache_timeout = RESPONSE_CACHE_TIMEOUT
+
+    @classmethod
+    def get_response_cache_name(cls) -> str:
+        return cls.__name__
+
+    def get_response_cache_key(self) -> Optional[str]:
+        """
+        Ключ страницы или None, если ответ кешировать нельзя
+        """
+        roles = get_access_context(self.request).roles
+        versions = get_board_versions(roles)
+        return self.make_response_cache_key(sorted((board_id, versions[board_id], roles[board_id]) for board_id in roles))
+
+    def make_response_cache_key(self, *parts) -> str:
+        """
+        Ключ из parts (версий данных) и нормализованных параметров запроса
+        """
+        request = self.request
+        params = sorted((name, value) for name, values in request.query_params.lists() for value in values)
+        key = repr((
+            # Ссылки next/previous пагинации абсолютные, поэтому схема и хост тоже часть ключа
+            request.build_absolute_uri(request.path), request.accepted_renderer.format, params, parts,
+        ))
+        return f"goals:response:{self.get_response_cache_name()}:{hashlib.md5(key.encode()).hexdigest()}"
+
+    def is_response_cacheable(self, response: Response) -> bool:
+        return response.status_code == 200
+
+    def get_cached_response(self, build: Callable[[], Response]) -> Response:
+        """
+        Ответ из кеша или результат build(), который сохраняется в кеш, если он успешный
+        """
+        if not response_cache_is_shared():
+            return build()
+        key = self.get_response_cache_key()
+        if key is None:
+            return build()
+
+        response_cache = get_response_cache()
+        data = response_cache.get(key)
+        if data is not None:
+            count(self.get_response_cache_name(), HIT)
+            response = Response(data)
+            response["X-Cache"] = "HIT"
+            return response
+
+        count(self.get_response_cache_name(), MISS)
+        response = build()
+        if self.is_response_cacheable(response):
+            response_cache.set(key, response.data, self.response_cache_timeout)
+        response["X-Cache"] = "MISS"
+        return response
+
+    def list(self, request, *args, **kwargs) -> Response:
+        return self.get_cached_response(lambda: super(ResponseCacheMixin, self).list(request, *args, **kwargs))
@@ -0,0 +1,149 @@
+import re
+from functools import reduce
+from operator import or_
+from typing import Iterable
+
+from django.db import connections
+from django.db.models import FloatField, Q, QuerySet, Value
+from django.db.models.expressions import RawSQL
+
+# Полнотекстовые индексы: таблица -> ((колонка, вес), ...). Вес A – заголовок, B – текст.
+# Названия таблиц, а не модели: по ним же post_migrate восстанавливает индексы SQLite (ensure_search_indexes).
+# SQL миграции 0015 зафиксирован в ней самой. Изменение этого списка или перечисленных колонок (тип, длина,
+# переименование) требует новой миграции со своим SQL: на PostgreSQL колонку search_vector нужно удалить
+# (DROP COLUMN, GIN-индекс удалится вместе с ней) и создать заново с новым выражением – ADD COLUMN IF NOT EXISTS
+# существующую колонку не изменит, а ALTER COLUMN колонки, от которой зависит генерируемая, PostgreSQL не выполнит
+SEARCH_INDEXES = {
+    "goals_goal": (("title", "A"), ("description", "B")),
+    "goals_goalcategory": (("title", "A"),),
+    "goals_goalcomment": (("text", "A"),),
+}
+SEARCH_CONFIG = "simple"  # Без стемминга: названия целей бывают и на русском, и на английском
+SQLITE_WEIGHTS = {"A": 10.0, "B": 1.0}
+MAX_SEARCH_TERMS = 8
+
+TERM_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def search_terms(text: str) -> list:
+    """
+    Слова поискового запроса; каждое ищется как префикс, чтобы поиск работал по мере набора
+    """
+    return [term.lower() for term in TERM_RE.findall(text or "")][:MAX_SEARCH_TERMS]
+
+
+def postgresql_statements(table: str, fields: tuple) -> list:
+    document = " || ".join(
+        f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce({column}, '')), '{weight}')" for column, weight in fields
+    )
+    return [
+        # Генерируемая колонка пересчитывается самой БД при любом insert/update, в том числе bulk_create и update()
+        f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS search_vector tsvector "
+        f"GENERATED ALWAYS AS ({document}) STORED",
+        f"CREATE INDEX IF NOT EXISTS {table}_search_idx ON {table} USING gin (search_vector)",
+    ]
+
+
+def sqlite_statements(table: str, fields: tuple) -> list:
+    columns = ", ".join(column for column, _weight in fields)
+    new = ", ".join(f"new.{column}" for column, _weight in fields)
+    old = ", ".join(f"old.{column}" for column, _weight in fields)
+    delete = f"INSERT INTO {table}_fts({table}_fts, rowid, {columns}) VALUES ('delete', old.id, {old});"
+    insert = f"INSERT INTO {table}_fts(rowid, {columns}) VALUES (new.id, {new});"
+    return [
+        # external content: FTS5 хранит только индекс, текст читается из самой таблицы
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {table}_fts USING fts5({columns}, content='{table}', "
+        f"content_rowid='id', tokenize='unicode61 remove_diacritics 2')",
+        f"CREATE TRIGGER IF NOT EXISTS {table}_fts_insert AFTER INSERT ON {table} BEGIN {insert} END",
+        f"CREATE TRIGGER IF NOT EXISTS {table}_fts_delete AFTER DELETE ON {table} BEGIN {delete} END",
+        f"CREATE TRIGGER IF NOT EXISTS {table}_fts_update AFTER UPDATE OF {columns} ON {table} "
+        f"BEGIN {delete} {insert} END",
+    ]
+
+
+def install_search_indexes(connection) -> None:
+    """
+    Создает полнотекстовые индексы (повторный вызов ничего не меняет): на PostgreSQL – колонку search_vector
+    с GIN-индексом, на SQLite – таблицы FTS5 с триггерами. Для остальных БД поиск остается на icontains
+    """
+    with connection.cursor() as cursor:
+        for table, fields in SEARCH_INDEXES.items():
+            if connection.vendor == "postgresql":
+                for statement in postgresql_statements(table, fields):
+                    cursor.execute(statement)
+            elif connection.vendor == "sqlite":
+                cursor.execute("SELECT name FROM sqlite_master WHERE type = 'trigger' AND tbl_name = %s", [table])
+                triggers = {row[0] for row in cursor.fetchall()}
+                for statement in sqlite_statements(table, fields):
+                    cursor.execute(statement)
+                if len(triggers) < 3:
+                    # SQLite пересоздает таблицу при части изменений схемы и теряет триггеры:
+                    # индекс мог отстать от данных, поэтому строим его заново
+                    cursor.execute(f"INSERT INTO {table}_fts({table}_fts) VALUES ('rebuild')")
+
+
+def remove_search_indexes(connection) -> None:
+    with connection.cursor() as cursor:
+        for table in SEARCH_INDEXES:
+            if connection.vendor == "postgresql":
+                cursor.execute(f"DROP INDEX IF EXISTS {table}_search_idx")
+                cursor.execute(f"ALTER TABLE {table} DROP COLUMN IF EXISTS search_vector")
+            elif connection.vendor == "sqlite":
+                for suffix in ("insert", "delete", "update"):
+                    cursor.execute(f"DROP TRIGGER IF EXISTS {table}_fts_{suffix}")
+                cursor.execute(f"DROP TABLE IF EXISTS {table}_fts")
+
+
+def ensure_search_indexes(sender, using: str = "default", **kwargs) -> None:
+    """
+    Обработчик post_migrate: восстанавливает индексы SQLite после миграций, пересоздавших таблицы
+    """
+    connection = connections[using]
+    if connection.vendor != "sqlite":
+        return
+    with connection.cursor() as cursor:
+        tables = set(connection.introspection.table_names(cursor))
+    if set(SEARCH_INDEXES) <= tables:
+        install_search_indexes(connection)
+
+
+def has_search_index(model) -> bool:
+    return model._meta.db_table in SEARCH_INDEXES
+
+
+def search_queryset(queryset: QuerySet, text: str, rank: bool = True) -> QuerySet:
+    """
+    Записи queryset, подходящие под запрос text (все слова, как префиксы). С rank=True добавляется
+    аннотация search_rank – релевантность, чем больше, тем выше
+    """
+    terms = search_terms(text)
+    if not terms:
+        return queryset
+    table = queryset.model._meta.db_table
+    fields = SEARCH_INDEXES[table]
+    vendor = connections[queryset.db].vendor
+
+    if vendor == "postgresql":
+        query = " & ".join(f"{term}:*" for term in terms)
+        tsquery = f"to_tsquery('{SEARCH_CONFIG}', %s)"
+        # Условие через extra, а не filter(): filter() сравнил бы выражение с true, и GIN-индекс бы не использовался
+        queryset = queryset.extra(where=[f'"{table}"."search_vector" @@ {tsquery}'], params=[query])
+        rank_sql = RawSQL(f'ts_rank("{table}"."search_vector", {tsquery})', [query], output_field=FloatField())
+    elif vendor == "sqlite":
+        query = " ".join(f'"{term}"*' for term in terms)
+        queryset = queryset.filter(id__in=RawSQL(f"SELECT rowid FROM {table}_fts WHERE {table}_fts MATCH %s", [query]))
+        weights = ", ".join(str(SQLITE_WEIGHTS[weight]) for _column, weight in fields)
+        # bm25 тем меньше, чем запись релевантнее
+        rank_sql = RawSQL(
+            f'(SELECT -bm25({table}_fts, {weights}) FROM {table}_fts '
+            f'WHERE {table}_fts MATCH %s AND rowid = "{table}"."id")', [query], output_field=FloatField()
+        )
+    else:
+        queryset = queryset.filter(*[match_any(fields, term) for term in terms])
+        rank_sql = Value(0.0, output_field=FloatField())
+
+    return queryset.annotate(search_rank=rank_sql) if rank else queryset
+
+
+def match_any(fields: Iterable[tuple], term: str) -> Q:
+    return reduce(or_, (Q(**{f"{column}__icontains": term}) for column, _weight in fields))
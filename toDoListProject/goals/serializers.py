@@ -1,9 +1,15 @@
 from django.db import transaction
+from django.db.models import Prefetch, prefetch_related_objects
+from django.utils import timezone
+from django.utils.encoding import smart_str
 from rest_framework import serializers
 
 from toDoListProject.core.models import User
 from toDoListProject.core.serializers import UserSerializer
-from toDoListProject.goals.models import GoalCategory, Goal, GoalComment, Board, BoardParticipant
+from toDoListProject.goals.access import invalidate_board_roles, get_access_context
+from toDoListProject.goals.models import GoalCategory, Goal, GoalComment, Board, BoardParticipant, BoardSummary, \
+    ChangeLogEntry
+from toDoListProject.goals.summary import represent_summary
 
 
 class GoalCategoryCreateSerializer(serializers.ModelSerializer):
@@ -21,9 +27,7 @@ class GoalCategoryCreateSerializer(serializers.ModelSerializer):
         """
         Проверка прав пользователя перед созданием категории
         """
-        if not BoardParticipant.objects.filter(board_id=value.pk,
-                                               user_id=self.context["request"].user.id,
-                                               role__in=[BoardParticipant.Role.owner, BoardParticipant.Role.writer]):
+        if not get_access_context(self.context["request"]).can_write(value.pk):
             raise serializers.ValidationError("Permission Denied")
         return value
 
@@ -49,7 +53,8 @@ class GoalCreateSerializer(serializers.ModelSerializer):
     class Meta:
         model = Goal
         read_only_fields = ("id", "created", "updated", "user")
-        fields = "__all__"
+        # board – служебная денормализация (доска категории), в ответы API не входит
+        exclude = ("board",)
 
     def validate_category(self, value: GoalCategory) -> GoalCategory:
         """
@@ -58,11 +63,90 @@ class GoalCreateSerializer(serializers.ModelSerializer):
         if value.is_deleted:
             raise serializers.ValidationError("not allowed in deleted category")
 
-        if value.user != self.context["request"].user:
+        if value.user_id != self.context["request"].user.id:
             raise serializers.ValidationError("not owner of category")
 
+        # Доска могла быть удалена, а ее категории еще не обработаны фоновой архивацией
+        if not get_access_context(self.context["request"]).can_write(value.board_id):
+            raise serializers.ValidationError("Permission Denied")
+
+        return value
+
+
+class PreloadedPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """
+    PrimaryKeyRelatedField, который берет объекты из заранее загруженного словаря context[context_key]
+    ({pk: объект}), а не делает запрос к БД на каждое значение
+    """
+
+    def __init__(self, context_key: str, **kwargs):
+        self.context_key = context_key
+        super().__init__(**kwargs)
+
+    def to_internal_value(self, data):
+        try:
+            pk = int(data)
+        except (TypeError, ValueError):
+            self.fail("incorrect_type", data_type=type(data).__name__)
+        instance = self.context[self.context_key].get(pk)
+        if instance is None:
+            self.fail("does_not_exist", pk_value=data)
+        return instance
+
+
+class GoalBatchItemSerializer(GoalCreateSerializer):
+    """
+    Сериалайзер данных одной операции пакетного создания или изменения целей.
+    Категории загружаются заранее для всего пакета
+    """
+    category = PreloadedPrimaryKeyRelatedField("categories", queryset=GoalCategory.objects.all())
+
+
+class GoalBatchOperationSerializer(serializers.Serializer):
+    """
+    Операция пакета: create (data), update (id, data) или archive (id)
+    """
+    CREATE, UPDATE, ARCHIVE = "create", "update", "archive"
+
+    op = serializers.ChoiceField(choices=(CREATE, UPDATE, ARCHIVE))
+    id = serializers.IntegerField(required=False)
+    data = serializers.DictField(required=False)
+
+    def validate(self, attrs: dict) -> dict:
+        if attrs["op"] != self.CREATE and "id" not in attrs:
+            raise serializers.ValidationError({"id": "This field is required."})
+        if attrs["op"] != self.ARCHIVE and "data" not in attrs:
+            raise serializers.ValidationError({"data": "This field is required."})
+        return attrs
+
+
+class GoalBatchSerializer(serializers.Serializer):
+    """
+    Пакет операций над целями
+    """
+    operations = serializers.ListField(child=GoalBatchOperationSerializer(), min_length=1, max_length=500)
+
+
+class GoalBulkActionSerializer(serializers.Serializer):
+    """
+    Изменения для всех целей, подходящих под фильтр: статус, приоритет и/или категория.
+    dry_run – только посчитать цели, ничего не меняя
+    """
+    status = serializers.ChoiceField(choices=Goal.Status.choices, required=False)
+    priority = serializers.ChoiceField(choices=Goal.Priority.choices, required=False)
+    category = serializers.PrimaryKeyRelatedField(queryset=GoalCategory.objects.alive(), required=False)
+    dry_run = serializers.BooleanField(default=False)
+
+    def validate_category(self, value: GoalCategory) -> GoalCategory:
+        if not get_access_context(self.context["request"]).can_write(value.board_id):
+            raise serializers.ValidationError("Permission Denied")
         return value
 
+    def validate(self, attrs: dict) -> dict:
+        if not attrs["dry_run"] and not {"status", "priority", "category"} & set(attrs):
+            raise serializers.ValidationError("Nothing to change: pass status, priority or category")
+        return attrs
+
 
 class GoalSerializer(serializers.ModelSerializer):
     """
@@ -72,7 +156,7 @@ class GoalSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Goal
-        fields = "__all__"
+        exclude = ("board",)
         read_only_fields = ("id", "created", "updated", "user")
 
 
@@ -84,7 +168,8 @@ class GoalCommentCreateSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = GoalComment
-        fields = "__all__"
+        # board повторяет доску цели и в ответы API не входит
+        exclude = ("board",)
         read_only_fields = ("id", "created", "updated", "user")
 
 
@@ -96,7 +181,7 @@ class GoalCommentSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = GoalComment
-        fields = "__all__"
+        exclude = ("board",)
         read_only_fields = ("id", "created", "updated", "user", "goal")
 
 
@@ -122,15 +207,43 @@ class BoardCreateSerializer(serializers.ModelSerializer):
         BoardParticipant.objects.create(
             user=user, board=board, role=BoardParticipant.Role.owner
         )
+        invalidate_board_roles(board.pk, [user.id])
         return board
 
 
+def board_participants_prefetch() -> Prefetch:
+    """
+    Участники доски вместе с пользователями: BoardParticipantSerializer выводит username
+    """
+    return Prefetch("participants", queryset=BoardParticipant.objects.select_related("user"))
+
+
+class PreloadedSlugRelatedField(serializers.SlugRelatedField):
+    """
+    SlugRelatedField, который ищет объекты в заранее загруженном словаре context[context_key] ({slug: объект}),
+    если он есть, вместо запроса к БД на каждое значение
+    """
+
+    def __init__(self, context_key: str, **kwargs):
+        self.context_key = context_key
+        super().__init__(**kwargs)
+
+    def to_internal_value(self, data):
+        preloaded = self.context.get(self.context_key)
+        if preloaded is None:
+            return super().to_internal_value(data)
+        instance = preloaded.get(data) if isinstance(data, str) else None
+        if instance is None:
+            self.fail("does_not_exist", slug_name=self.slug_field, value=smart_str(data))
+        return instance
+
+
 class BoardParticipantSerializer(serializers.ModelSerializer):
     """
     Сериалайзер для внесения данных о доступе пользователей к доскам
     """
     role = serializers.ChoiceField(required=True, choices=BoardParticipant.Role.choices[1:])
-    user = serializers.SlugRelatedField(slug_field="username", queryset=User.objects.all())
+    user = PreloadedSlugRelatedField("users_by_username", slug_field="username", queryset=User.objects.all())
 
     class Meta:
         model = BoardParticipant
@@ -150,27 +263,83 @@ class BoardSerializer(serializers.ModelSerializer):
         fields = "__all__"
         read_only_fields = ("id", "created", "updated")
 
+    def to_internal_value(self, data):
+        # Пользователи участников загружаются одним запросом, а не по одному на каждого участника
+        participants = data.get("participants") if hasattr(data, "get") else None
+        if isinstance(participants, list):
+            usernames = {item.get("user") for item in participants if isinstance(item, dict)}
+            self.context["users_by_username"] = User.objects.in_bulk(
+                [name for name in usernames if isinstance(name, str)], field_name="username"
+            )
+        return super().to_internal_value(data)
+
     def update(self, instance: Board, validated_data: dict) -> Board:
         """
         Обновление списка пользователей, имеющих доступ к доске и их прав,
         изменение названия доски
         """
+        self.participant_changes = {"added": [], "updated": [], "removed": []}
         with transaction.atomic():
-            instance.participants.exclude(user=self.context["request"].user).delete()
-            if 'participants' in validated_data.keys():
-                for participant in validated_data["participants"]:
-                    BoardParticipant.objects.create(
-                        user_id=participant["user"].id,
-                        role=participant["role"],
-                        board_id=instance.pk
-                    )
-
-            if validated_data["title"]:
+            if "participants" in validated_data:
+                self.participant_changes = self.sync_participants(instance, validated_data["participants"])
+                changed_user_ids = [user_id for user_ids in self.participant_changes.values() for user_id in user_ids]
+                if changed_user_ids:
+                    invalidate_board_roles(instance.pk, changed_user_ids)
+
+            if validated_data.get("title"):
                 instance.title = validated_data["title"]
-                instance.save(update_fields=("title",))
+                instance.save(update_fields=("title", "updated"))
 
         return instance
 
+    def sync_participants(self, instance: Board, participants: list) -> dict:
+        """
+        Приводит участников доски (кроме текущего пользователя) к списку participants, изменяя только
+        разницу: новые добавляются, роли обновляются, лишние удаляются – не больше четырех запросов
+        (и по одной вставке в журнал изменений на каждый вид изменения) при любом размере доски.
+        Возвращает user_id измененных участников: {"added", "updated", "removed"}
+        """
+        current_user_id = self.context["request"].user.id
+        desired = {item["user"].id: item["role"] for item in participants if item["user"].id != current_user_id}
+        current = {
+            participant.user_id: participant
+            for participant in instance.participants.exclude(user_id=current_user_id).select_for_update()
+        }
+        now = timezone.now()
+
+        added = [
+            BoardParticipant(board_id=instance.pk, user_id=user_id, role=role, created=now, updated=now)
+            for user_id, role in desired.items() if user_id not in current
+        ]
+        updated = []
+        for user_id, participant in current.items():
+            if user_id in desired and participant.role != desired[user_id]:
+                participant.role, participant.updated = desired[user_id], now
+                updated.append(participant)
+        removed = [participant for user_id, participant in current.items() if user_id not in desired]
+
+        if added:
+            BoardParticipant.objects.bulk_create(added)
+        if updated:
+            BoardParticipant.objects.bulk_update(updated, ["role", "updated"])
+        if removed:
+            BoardParticipant.objects.filter(pk__in=[participant.pk for participant in removed]).delete()
+        for action, participants in ((ChangeLogEntry.Action.create, added), (ChangeLogEntry.Action.update, updated),
+                                     (ChangeLogEntry.Action.delete, removed)):
+            ChangeLogEntry.record(ChangeLogEntry.Kind.participant, action,
+                                  [(instance.pk, participant.pk) for participant in participants])
+        return {
+            "added": [participant.user_id for participant in added],
+            "updated": [participant.user_id for participant in updated],
+            "removed": [participant.user_id for participant in removed],
+        }
+
+    def to_representation(self, instance: Board) -> dict:
+        # После update DRF сбрасывает prefetch-кеш – загружаем участников заново одним запросом
+        if "participants" in self.fields and "participants" not in getattr(instance, "_prefetched_objects_cache", {}):
+            prefetch_related_objects([instance], board_participants_prefetch())
+        return super().to_representation(instance)
+
 
 class BoardListSerializer(serializers.ModelSerializer):
     """
@@ -180,3 +349,119 @@ class BoardListSerializer(serializers.ModelSerializer):
         model = Board
         fields = "__all__"
         read_only_fields = ("id", "created", "updated")
+
+
+class BoardListStatsSerializer(BoardListSerializer):
+    """
+    Сериалайзер списка досок со статистикой (BoardQuerySet.with_stats)
+    """
+    goals_to_do = serializers.IntegerField(read_only=True)
+    goals_in_progress = serializers.IntegerField(read_only=True)
+    goals_done = serializers.IntegerField(read_only=True)
+    participants_count = serializers.IntegerField(read_only=True)
+    role = serializers.IntegerField(read_only=True)
+    last_activity = serializers.DateTimeField(read_only=True)
+
+
+class BoardSummarySerializer(serializers.ModelSerializer):
+    """
+    Сериалайзер сводки по целям доски: число целей по статусам, приоритетам, категориям и просроченных
+    """
+    class Meta:
+        model = BoardSummary
+        fields = ("board", "updated")
+        read_only_fields = ("board", "updated")
+
+    def to_representation(self, instance: BoardSummary) -> dict:
+        data = super().to_representation(instance)
+        data.update(represent_summary(instance.counts))
+        return data
+
+
+class BoardSnapshotQuerySerializer(serializers.Serializer):
+    """
+    Параметры снимка доски: limit – целей на страницу, after – id последней полученной цели (продолжение),
+    comments – добавить к целям число комментариев
+    """
+    limit = serializers.IntegerField(min_value=1, max_value=5000, default=1000)
+    after = serializers.IntegerField(min_value=0, required=False)
+    comments = serializers.BooleanField(default=False)
+
+
+class GoalExportQuerySerializer(serializers.Serializer):
+    """
+    Параметры экспорта: board – одна доска (по умолчанию все доски пользователя), output – ndjson или csv,
+    gzip – сжимать ответ на лету
+    """
+    board = serializers.IntegerField(required=False)
+    output = serializers.ChoiceField(choices=("ndjson", "csv"), default="ndjson")
+    gzip = serializers.BooleanField(default=False)
+
+
+class ImportedDatesSerializer(serializers.Serializer):
+    """
+    Даты создания и изменения импортируемой записи; если их нет в файле – время импорта
+    """
+    created = serializers.DateTimeField(required=False)
+    updated = serializers.DateTimeField(required=False)
+
+
+class CategoryImportSerializer(ImportedDatesSerializer):
+    """
+    Сериалайзер категории из файла импорта
+    """
+    title = serializers.CharField(max_length=255)
+
+
+class GoalImportSerializer(ImportedDatesSerializer):
+    """
+    Сериалайзер цели из файла импорта: категория и автор сопоставляются отдельно (goals/importing.py)
+    """
+    title = serializers.CharField(max_length=255)
+    description = serializers.CharField(required=False, allow_null=True, allow_blank=True)
+    status = serializers.ChoiceField(choices=Goal.Status.choices, default=Goal.Status.to_do)
+    priority = serializers.ChoiceField(choices=Goal.Priority.choices, default=Goal.Priority.medium)
+    due_date = serializers.DateTimeField()
+
+
+class CommentImportSerializer(ImportedDatesSerializer):
+    """
+    Сериалайзер комментария из файла импорта
+    """
+    text = serializers.CharField(max_length=255)
+
+
+class GoalImportUploadSerializer(serializers.Serializer):
+    """
+    Файл для импорта в доску: NDJSON (формат выгрузки goals/export) или CSV целей, можно в gzip.
+    Формат по умолчанию определяется по имени файла
+    """
+    file = serializers.FileField()
+    format = serializers.ChoiceField(choices=("ndjson", "csv"), required=False)
+    batch_size = serializers.IntegerField(min_value=1, max_value=10000, default=1000)
+
+
+class ChangesQuerySerializer(serializers.Serializer):
+    """
+    Параметры ленты изменений: since – метка (next) из предыдущего ответа, limit – не больше стольких
+    записей журнала за запрос
+    """
+    since = serializers.IntegerField(min_value=0, required=False)
+    limit = serializers.IntegerField(min_value=1, max_value=5000, default=500)
+
+
+class GlobalSearchQuerySerializer(serializers.Serializer):
+    """
+    Параметры поиска по всем доскам: q – запрос, types – типы через запятую (goal,category,comment),
+    limit – не больше стольких результатов каждого типа
+    """
+    q = serializers.CharField(max_length=200)
+    types = serializers.CharField(required=False)
+    limit = serializers.IntegerField(min_value=1, max_value=50, default=10)
+
+    def validate_types(self, value: str) -> list:
+        types = [name.strip() for name in value.split(",") if name.strip()]
+        unknown = [name for name in types if name not in ("goal", "category", "comment")]
+        if unknown:
+            raise serializers.ValidationError([f"Unknown type: {name}" for name in unknown])
+        return list(dict.fromkeys(types))
@@ -0,0 +1,53 @@
+from typing import Optional
+
+from django.db.models import Count
+
+from toDoListProject.goals.models import Board, Goal, GoalCategory, GoalComment
+from toDoListProject.goals.projections import get_projection
+from toDoListProject.goals.serializers import BoardSerializer, GoalCategorySerializer, GoalSerializer, \
+    board_participants_prefetch
+
+
+def snapshot_goals(board_id: int, limit: int, after: Optional[int] = None, comments: bool = False) -> tuple:
+    """
+    Живые цели доски по возрастанию id, не больше limit штук, начиная после цели after.
+    Возвращает (цели, id последней цели или None, если целей больше нет).
+    С comments=True к каждой цели добавляется comments_count – одним GROUP BY на всю страницу
+    """
+    projection = get_projection(GoalSerializer)
+    queryset = Goal.objects.alive().filter(board_id=board_id).select_related("user").order_by("id")
+    if after is not None:
+        queryset = queryset.filter(id__gt=after)
+    # Одна лишняя строка показывает, есть ли продолжение, без отдельного COUNT
+    rows = list(queryset.values(*projection.columns)[:limit + 1])
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    goals = projection.represent(rows)
+
+    if comments and rows:
+        counts = dict(
+            GoalComment.objects.filter(board_id=board_id, goal_id__gte=rows[0]["id"], goal_id__lte=rows[-1]["id"])
+            .order_by().values_list("goal_id").annotate(count=Count("id"))
+        )
+        for goal in goals:
+            goal["comments_count"] = counts.get(goal["id"], 0)
+    return goals, rows[-1]["id"] if has_more else None
+
+
+def build_board_snapshot(board: Board, limit: int, comments: bool = False) -> tuple:
+    """
+    Первая страница снимка доски: доска с участниками, живые категории и первые limit целей.
+    Возвращает (данные, id последней цели или None)
+    """
+    projection = get_projection(GoalCategorySerializer)
+    categories = GoalCategory.objects.alive().filter(board_id=board.pk).select_related("user").order_by("id")
+    goals, last_id = snapshot_goals(board.pk, limit, comments=comments)
+    return {
+        "board": BoardSerializer(board).data,
+        "categories": projection.represent(categories.values(*projection.columns)),
+        "goals": goals,
+    }, last_id
+
+
+def get_snapshot_board(board_id: int) -> Optional[Board]:
+    return Board.objects.alive().prefetch_related(board_participants_prefetch()).filter(pk=board_id).first()
@@ -0,0 +1,107 @@
+import datetime
+from collections import Counter, defaultdict
+from typing import Iterable, Optional
+
+from django.db.models import Count, QuerySet
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+# Статусы задаются числами, как в ALIVE_GOAL: модуль импортируется из models.py
+OPEN_STATUSES = (1, 2)  # Goal.Status.to_do, Goal.Status.in_progress
+ARCHIVED = 4  # Goal.Status.archived
+
+TOTAL = "total"
+STATUS, PRIORITY, CATEGORY, DUE = "status", "priority", "category", "due"
+
+
+def goal_counts(status: int, priority: int, category_id: int, due_date, count: int = 1) -> Counter:
+    """
+    Вклад цели (или count одинаковых целей) в сводку доски. Счетчики хранятся плоским словарем:
+    "status:1", "priority:3", "category:7" и "due:2026-10-18" – число открытых целей с дедлайном в этот день.
+    Архивные цели в сводку не входят
+    """
+    if status == ARCHIVED or not count:
+        return Counter()
+    counts = Counter({TOTAL: count, f"{STATUS}:{status}": count, f"{PRIORITY}:{priority}": count,
+                      f"{CATEGORY}:{category_id}": count})
+    if status in OPEN_STATUSES and due_date is not None:
+        if isinstance(due_date, datetime.datetime):
+            if timezone.is_naive(due_date):
+                due_date = timezone.make_aware(due_date)
+            due_date = timezone.localtime(due_date).date()
+        counts[f"{DUE}:{due_date.isoformat()}"] += count
+    return counts
+
+
+def goal_summary_rows(queryset: QuerySet) -> QuerySet:
+    """
+    Цели queryset, сгруппированные по всему, что учитывается в сводке: один GROUP BY вместо загрузки целей
+    """
+    return queryset.annotate(due_day=TruncDate("due_date")).order_by().values(
+        "board_id", "status", "priority", "category_id", "due_day"
+    ).annotate(count=Count("id"))
+
+
+def count_goals(rows: Iterable[dict]) -> dict:
+    """
+    Сводки по строкам goal_summary_rows: {board_id: Counter}
+    """
+    summaries = defaultdict(Counter)
+    for row in rows:
+        summaries[row["board_id"]].update(
+            goal_counts(row["status"], row["priority"], row["category_id"], row["due_day"], row["count"])
+        )
+    return summaries
+
+
+def merge_deltas(*deltas: dict) -> dict:
+    """
+    Складывает изменения сводок нескольких досок: {board_id: Counter}
+    """
+    merged = defaultdict(Counter)
+    for delta in deltas:
+        for board_id, counts in delta.items():
+            merged[board_id].update(counts)
+    return merged
+
+
+def negate(delta: dict) -> dict:
+    return {board_id: Counter({key: -value for key, value in counts.items()}) for board_id, counts in delta.items()}
+
+
+def goal_delta(old_board_id: Optional[int], old: Optional[tuple], new_board_id: Optional[int],
+               new: Optional[tuple]) -> dict:
+    """
+    Изменение сводок при изменении одной цели. old/new – (status, priority, category_id, due_date) или None
+    """
+    delta = defaultdict(Counter)
+    if old is not None and old_board_id is not None:
+        delta[old_board_id].subtract(goal_counts(*old))
+    if new is not None and new_board_id is not None:
+        delta[new_board_id].update(goal_counts(*new))
+    return delta
+
+
+def represent_summary(counts: dict, today: Optional[datetime.date] = None) -> dict:
+    """
+    Сводка в виде ответа API: итог, разбивки по статусу, приоритету и категории, число просроченных целей
+    (открытых, с дедлайном раньше сегодняшнего дня)
+    """
+    today = (today or timezone.localdate()).isoformat()
+    sections = {STATUS: {}, PRIORITY: {}, CATEGORY: {}}
+    overdue = 0
+    for key, value in counts.items():
+        if key == TOTAL:
+            continue
+        section, _, name = key.partition(":")
+        if section == DUE:
+            overdue += value if name < today else 0
+        else:
+            sections[section][name] = value
+    return {
+        "total": counts.get(TOTAL, 0),
+        "by_status": sections[STATUS],
+        "by_priority": sections[PRIORITY],
+        "by_category": sections[CATEGORY],
+        "overdue": overdue,
+    }
@@ -9,13 +9,21 @@ urlpatterns = [
     path("goal_category/<pk>", views.GoalCategoryView.as_view(), name="category"),
     path("goal/create", views.GoalCreateView.as_view(), name="create_goal"),
     path("goal/list", views.GoalListView.as_view(), name="goal_list"),
+    path("goal/batch", views.GoalBatchView.as_view(), name="goal_batch"),
+    path("goal/bulk", views.GoalBulkActionView.as_view(), name="goal_bulk"),
     path("goal/<pk>", views.GoalView.as_view(), name="goal"),
+    path("export", views.GoalExportView.as_view(), name="export"),
+    path("search", views.GlobalSearchView.as_view(), name="search"),
+    path("changes", views.ChangesView.as_view(), name="changes"),
     path("goal_comment/create", views.GoalCommentCreateView.as_view(), name="create_comment"),
     path("goal_comment/list", views.GoalCommentListView.as_view(), name="comment_list"),
     path("goal_comment/<pk>", views.GoalCommentView.as_view(), name="comment"),
     path("board/create", views.BoardCreateView.as_view(), name="create_board"),
     path("board/list", views.BoardListView.as_view(), name="board_list"),
     path("board/<pk>", views.BoardView.as_view(), name="board"),
+    path("board/<pk>/summary", views.BoardSummaryView.as_view(), name="board_summary"),
+    path("board/<pk>/snapshot", views.BoardSnapshotView.as_view(), name="board_snapshot"),
+    path("board/<pk>/import", views.BoardImportView.as_view(), name="board_import"),
 
 ]
 
@@ -0,0 +1,88 @@
+import time
+from typing import Iterable
+
+from django.conf import settings
+from django.core.cache import DEFAULT_CACHE_ALIAS, cache, caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import transaction
+
+
+def board_version_key(board_id: int) -> str:
+    return f"goals:board_version:{board_id}"
+
+
+def user_version_key(user_id: int) -> str:
+    return f"goals:user_version:{user_id}"
+
+
+def is_process_local(backend) -> bool:
+    """
+    Кеш в памяти процесса: версии, которые в нем увеличивают другие процессы (telegram-бот, board_archiver,
+    команды импорта и архивации), до него не доходят. GOALS_ALLOW_LOCAL_CACHE разрешает такой кеш,
+    когда все изменения идут через один процесс (тесты, локальная разработка)
+    """
+    return isinstance(backend, LocMemCache) and not getattr(settings, "GOALS_ALLOW_LOCAL_CACHE", False)
+
+
+def versions_are_shared() -> bool:
+    """
+    Можно ли полагаться на версии досок: кеш версий общий для всех процессов
+    """
+    return not is_process_local(caches[DEFAULT_CACHE_ALIAS])
+
+
+def _now() -> int:
+    return time.time_ns() // 1000
+
+
+def _bump(keys: list) -> None:
+    # Версия – монотонная метка времени в микросекундах: даже если кеш потерял значение,
+    # новая версия не совпадет ни с одной из выданных раньше
+    now = _now()
+    current = cache.get_many(keys)
+    cache.set_many({key: max(now, current.get(key, 0) + 1) for key in keys}, None)
+
+
+def _bump_now_and_on_commit(keys: list) -> None:
+    if not keys:
+        return
+    _bump(keys)
+    # Повторно после коммита: иначе параллельный запрос может запомнить под новой версией старые данные
+    transaction.on_commit(lambda: _bump(keys))
+
+
+def bump_board_versions(board_ids: Iterable[int]) -> None:
+    """
+    Отмечает изменение данных досок: самой доски, ее участников, категорий, целей или комментариев
+    """
+    _bump_now_and_on_commit([board_version_key(board_id) for board_id in set(board_ids) if board_id])
+
+
+def bump_user_versions(user_ids: Iterable[int]) -> None:
+    """
+    Отмечает изменение набора досок, доступных пользователям
+    """
+    _bump_now_and_on_commit([user_version_key(user_id) for user_id in set(user_ids) if user_id])
+
+
+def _get_versions(keys: list) -> dict:
+    versions = cache.get_many(keys)
+    missing = {key: _now() for key in keys if key not in versions}
+    if missing:
+        cache.set_many(missing, None)
+        versions.update(missing)
+    return versions
+
+
+def get_board_versions(board_ids: Iterable[int]) -> dict:
+    """
+    Текущие версии досок: {board_id: version}
+    """
+    board_ids = list(board_ids)
+    versions = _get_versions([board_version_key(board_id) for board_id in board_ids])
+    return {board_id: versions[board_version_key(board_id)] for board_id in board_ids}
+
+
+def get_user_version(user_id: int) -> int:
+    key = user_version_key(user_id)
+    return _get_versions([key])[key]
@@ -1,18 +1,35 @@
-from django.db import transaction
-from django.db.models import Q
+from django.http import StreamingHttpResponse
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework.generics import CreateAPIView, ListAPIView, RetrieveUpdateDestroyAPIView
+from rest_framework.generics import CreateAPIView, GenericAPIView, ListAPIView, RetrieveAPIView, \
+    RetrieveUpdateDestroyAPIView
 from rest_framework import permissions, filters, status
-from rest_framework.pagination import LimitOffsetPagination
+from rest_framework.exceptions import NotFound, ValidationError
 from rest_framework.response import Response
-
-from toDoListProject.goals.filters import GoalDateFilter
-from toDoListProject.goals.models import GoalCategory, Goal, GoalComment, Board, BoardParticipant
+from rest_framework.utils.urls import replace_query_param
+
+from toDoListProject.goals.access import get_access_context
+from toDoListProject.goals.archiving import schedule_board_archive
+from toDoListProject.goals.batch import GoalBatch, bulk_change_goals
+from toDoListProject.goals.changes import collect_changes
+from toDoListProject.goals.conditional import ConditionalGetMixin
+from toDoListProject.goals.export import CSV, encode_stream, iter_export
+from toDoListProject.goals.fieldsets import SparseFieldsetMixin
+from toDoListProject.goals.filters import FullTextSearchFilter, GoalDateFilter
+from toDoListProject.goals.global_search import SEARCH_TYPES, search_everywhere
+from toDoListProject.goals.importing import GoalImport, ImportFileError, guess_format, open_import_file, read_records
+from toDoListProject.goals.models import GoalCategory, Goal, GoalComment, Board, BoardSummary
+from toDoListProject.goals.pagination import CursorOrLimitOffsetPagination
 from toDoListProject.goals.permissions import BoardPermissions, GoalPermission, IsOwnerOrReadOnly, \
-    CommentCreatePermission
+    CommentCreatePermission, GoalCategoryPermission
+from toDoListProject.goals.projections import ProjectionListMixin
+from toDoListProject.goals.response_cache import ResponseCacheMixin
 from toDoListProject.goals.serializers import GoalCreateSerializer, GoalCategorySerializer, \
     GoalCategoryCreateSerializer, GoalSerializer, GoalCommentCreateSerializer, GoalCommentSerializer, \
-    BoardCreateSerializer, BoardSerializer, BoardListSerializer
+    BoardCreateSerializer, BoardSerializer, BoardListSerializer, BoardListStatsSerializer, GoalBatchSerializer, \
+    GoalBulkActionSerializer, BoardSummarySerializer, BoardSnapshotQuerySerializer, GoalExportQuerySerializer, \
+    GoalImportUploadSerializer, GlobalSearchQuerySerializer, ChangesQuerySerializer, board_participants_prefetch
+from toDoListProject.goals.snapshot import build_board_snapshot, get_snapshot_board, snapshot_goals
+from toDoListProject.goals.versions import get_board_versions
 
 
 class BoardCreateView(CreateAPIView):
@@ -24,7 +41,7 @@ class BoardCreateView(CreateAPIView):
     serializer_class = BoardCreateSerializer
 
 
-class BoardView(RetrieveUpdateDestroyAPIView):
+class BoardView(ConditionalGetMixin, SparseFieldsetMixin, RetrieveUpdateDestroyAPIView):
     """
     View для отображения, изменения и удаления конкретной доски
     """
@@ -33,36 +50,162 @@ class BoardView(RetrieveUpdateDestroyAPIView):
     serializer_class = BoardSerializer
 
     def get_queryset(self):
-        return Board.objects.filter(is_deleted=False)
+        return Board.objects.alive().prefetch_related(board_participants_prefetch())
+
+    def get_version_board_ids(self):
+        try:
+            board_id = int(self.kwargs["pk"])
+        except ValueError:
+            return None
+        return [board_id] if get_access_context(self.request).can_read(board_id) else None
 
     def perform_destroy(self, instance: Board):
-        # При удалении доски помечаем ее как is_deleted,
-        # «удаляем» категории, помечая их как is_deleted, обновляем статус целей
-        with transaction.atomic():
-            instance.is_deleted = True
-            instance.save()
-            instance.categories.update(is_deleted=True)
-            Goal.objects.filter(category__board=instance).update(
-                status=Goal.Status.archived
-            )
+        # При удалении доски помечаем ее как is_deleted, а категории и цели «удаляет» фоновая задача
+        # (команда archive_boards): на больших досках одна транзакция держала бы блокировки слишком долго
+        schedule_board_archive(instance)
         return instance
 
 
-class BoardListView(ListAPIView):
+class BoardSummaryView(RetrieveAPIView):
+    """
+    View для получения сводки по целям доски: одна выборка по первичному ключу из BoardSummary
+    """
+    model = BoardSummary
+    permission_classes = [permissions.IsAuthenticated]
+    serializer_class = BoardSummarySerializer
+
+    def get_object(self) -> BoardSummary:
+        try:
+            board_id = int(self.kwargs["pk"])
+        except ValueError:
+            raise NotFound
+        if not get_access_context(self.request).can_read(board_id):
+            raise permissions.exceptions.PermissionDenied
+        # Сводка создается с первой целью доски; до этого – пустая
+        return BoardSummary.objects.filter(board_id=board_id).first() or BoardSummary(board_id=board_id)
+
+
+class BoardSnapshotView(ConditionalGetMixin, ResponseCacheMixin, RetrieveAPIView):
+    """
+    View для получения снимка доски одним ответом: доска с участниками, живые категории и цели
+    (?comments=true – с числом комментариев). Ответ строится фиксированным числом запросов
+    и кешируется под версией доски.
+
+    Цели отдаются страницами по ?limit= (по умолчанию 1000, не больше 5000) в порядке id. Если целей больше,
+    в ответе есть next – ссылка на продолжение (?after=<id последней цели>), которая возвращает только goals
+    и next. version – версия доски: если она изменилась между страницами, снимок нужно начать заново
+    """
+    model = Board
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_board_id(self) -> int:
+        try:
+            return int(self.kwargs["pk"])
+        except ValueError:
+            raise NotFound
+
+    def get_params(self) -> dict:
+        serializer = BoardSnapshotQuerySerializer(data=self.request.query_params)
+        if not serializer.is_valid():
+            raise ValidationError(serializer.errors)
+        return serializer.validated_data
+
+    def get_version_board_ids(self):
+        board_id = self.get_board_id()
+        return [board_id] if get_access_context(self.request).can_read(board_id) else None
+
+    def get_response_cache_key(self):
+        # Снимок одинаков для всех, кто может читать доску: роль в ключ не входит
+        board_id = self.get_board_id()
+        return self.make_response_cache_key(board_id, get_board_versions([board_id])[board_id])
+
+    def retrieve(self, request, *args, **kwargs) -> Response:
+        board_id = self.get_board_id()
+        if not get_access_context(request).can_read(board_id):
+            raise permissions.exceptions.PermissionDenied
+        params = self.get_params()
+        return self.get_cached_response(lambda: self.build_response(board_id, params))
+
+    def build_response(self, board_id: int, params: dict) -> Response:
+        version = get_board_versions([board_id])[board_id]
+        if "after" in params:
+            goals, last_id = snapshot_goals(board_id, params["limit"], params["after"], params["comments"])
+            data = {"goals": goals}
+        else:
+            board = get_snapshot_board(board_id)
+            if board is None:
+                raise NotFound
+            data, last_id = build_board_snapshot(board, params["limit"], params["comments"])
+        data["version"] = version
+        data["next"] = None if last_id is None else replace_query_param(
+            self.request.build_absolute_uri(), "after", last_id
+        )
+        return Response(data)
+
+
+class BoardImportView(GenericAPIView):
+    """
+    View для загрузки категорий, целей и комментариев в доску из файла (multipart, поле file):
+    NDJSON в формате goals/export или CSV целей, в том числе в gzip. Записи с ошибками пропускаются,
+    в ответе – число созданных записей и ошибки по номерам строк. Автор всех записей – текущий пользователь.
+    Если файл не читается (кодировка, gzip, CSV) – 400 с отчетом о том, что успело загрузиться до ошибки
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    serializer_class = GoalImportUploadSerializer
+
+    def post(self, request, *args, **kwargs) -> Response:
+        try:
+            board_id = int(self.kwargs["pk"])
+        except ValueError:
+            raise NotFound
+        if not get_access_context(request).can_write(board_id):
+            raise permissions.exceptions.PermissionDenied
+        board = Board.objects.alive().filter(pk=board_id).first()
+        if board is None:
+            raise NotFound
+
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        upload = serializer.validated_data["file"]
+        records = read_records(open_import_file(upload),
+                               serializer.validated_data.get("format") or guess_format(upload.name))
+        # Авторы из файла не сопоставляются: иначе можно было бы создать записи от имени любого пользователя
+        goal_import = GoalImport(board, request.user, batch_size=serializer.validated_data["batch_size"],
+                                 map_users=False)
+        try:
+            return Response(goal_import.run(records))
+        except ImportFileError as error:
+            raise ValidationError({"file": [str(error)], "report": goal_import.report()})
+
+
+class BoardListView(SparseFieldsetMixin, ProjectionListMixin, ListAPIView):
     """
     View для получения списка досок, доступных пользователю
     """
     model = Board
     permission_classes = [permissions.IsAuthenticated, BoardPermissions]
     serializer_class = BoardListSerializer
-    pagination_class = LimitOffsetPagination
+    pagination_class = CursorOrLimitOffsetPagination
     filter_backends = [filters.OrderingFilter, ]
     ordering_fields = ["title", "created"]
     ordering = ["title"]
+    stats_query_param = "stats"
+
+    def with_stats(self) -> bool:
+        """
+        ?stats=true – добавить к доскам число целей по статусам, участников, роль пользователя и время
+        последней активности
+        """
+        return self.request.query_params.get(self.stats_query_param, "").lower() in ("1", "true")
+
+    def get_serializer_class(self):
+        return BoardListStatsSerializer if self.with_stats() else BoardListSerializer
 
     def get_queryset(self):
-        return Board.objects.prefetch_related("participants").filter(participants__user_id=self.request.user.pk,
-                                                                     is_deleted=False)
+        queryset = Board.objects.visible_to(self.request.user)
+        if self.with_stats():
+            queryset = queryset.with_stats(self.request.user, fields=self.get_requested_fields())
+        return queryset
 
 
 class GoalCategoryCreateView(CreateAPIView):
@@ -79,26 +222,29 @@ class GoalCategoryCreateView(CreateAPIView):
         и если у пользователя есть права на изменение доски (роль admin или writer),
         то создаем категорию.
         """
-        request = request
-        role = BoardParticipant.objects.get(board_id=request.data["board"], user_id=request.user.id).role
-        if role == BoardParticipant.Role.reader:
-            raise permissions.exceptions.PermissionDenied
-        else:
+        try:
+            board_id = int(request.data["board"])
+        except (KeyError, TypeError, ValueError):
+            # Некорректную доску отклонит сериалайзер
             return super().create(request, *args, **kwargs)
+        if not get_access_context(request).can_write(board_id):
+            raise permissions.exceptions.PermissionDenied
+        return super().create(request, *args, **kwargs)
 
 
-class GoalCategoryListView(ListAPIView):
+class GoalCategoryListView(ConditionalGetMixin, ResponseCacheMixin, SparseFieldsetMixin, ProjectionListMixin,
+                           ListAPIView):
     """
     View для получения списка категорий, доступных пользователю
     """
     model = GoalCategory
     permission_classes = [permissions.IsAuthenticated]
     serializer_class = GoalCategorySerializer
-    pagination_class = LimitOffsetPagination
+    pagination_class = CursorOrLimitOffsetPagination
     filter_backends = [
         DjangoFilterBackend,
         filters.OrderingFilter,
-        filters.SearchFilter,
+        FullTextSearchFilter,
     ]
     filterset_fields = ["board"]
     ordering_fields = ["title", "created"]
@@ -106,34 +252,23 @@ class GoalCategoryListView(ListAPIView):
     search_fields = ["title"]
 
     def get_queryset(self):
-        return GoalCategory.objects.prefetch_related("board__participants").\
-            filter(board__participants__user_id=self.request.user.id, is_deleted=False)
+        return GoalCategory.objects.visible_to(self.request.user).select_related("user")
 
+    def get_version_board_ids(self):
+        return get_access_context(self.request).board_ids
 
-class GoalCategoryView(RetrieveUpdateDestroyAPIView):
+
+class GoalCategoryView(SparseFieldsetMixin, RetrieveUpdateDestroyAPIView):
     """
     View для получения, изменения и удаления конкретной категории
     """
     model = GoalCategory
     serializer_class = GoalCategorySerializer
-    permission_classes = [permissions.IsAuthenticated]
+    # Изменять и удалять категорию могут только владелец и редакторы доски
+    permission_classes = [permissions.IsAuthenticated, GoalCategoryPermission]
 
     def get_queryset(self):
-        return GoalCategory.objects.prefetch_related("board__participants").\
-            filter(board__participants__user_id=self.request.user.id,
-                   is_deleted=False)
-
-    def update(self, request, *args, **kwargs) -> Response:
-        """
-        Функция для изменения категории. Сначала проверяем,
-        есть ли права у пользователя на изменение категории (роль writer/owner)
-        """
-        board_id = GoalCategory.objects.get(id=kwargs["pk"]).board_id
-        role = BoardParticipant.objects.get(board_id=board_id, user_id=request.user.id).role
-        if role == BoardParticipant.Role.reader:
-            raise permissions.exceptions.PermissionDenied
-        else:
-            return super().update(request, *args, **kwargs)
+        return GoalCategory.objects.visible_to(self.request.user).select_related("user")
 
     def perform_destroy(self, instance):
         """
@@ -153,18 +288,98 @@ class GoalCreateView(CreateAPIView):
     serializer_class = GoalCreateSerializer
 
 
-class GoalListView(ListAPIView):
+class GoalBatchView(GenericAPIView):
+    """
+    View для пакетного создания, изменения и архивирования целей
+    """
+    model = Goal
+    permission_classes = [permissions.IsAuthenticated]
+    serializer_class = GoalBatchSerializer
+
+    def post(self, request, *args, **kwargs) -> Response:
+        """
+        Выполняет операции пакета и возвращает результат каждой из них в порядке запроса:
+        {"status": 201/200, "data": цель} или {"status": 400/403/404, "errors": ...}
+        """
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        results = GoalBatch(request, serializer.validated_data["operations"]).run()
+        return Response({"results": results})
+
+
+class GoalBulkActionView(GenericAPIView):
+    """
+    View для массового изменения статуса, приоритета или категории целей, подходящих под фильтр.
+    Фильтры и поиск передаются в параметрах запроса, как для списка целей; изменяются только цели досок,
+    на которых пользователь – владелец или редактор
+    """
+    model = Goal
+    permission_classes = [permissions.IsAuthenticated]
+    serializer_class = GoalBulkActionSerializer
+    filter_backends = [
+        DjangoFilterBackend,
+        FullTextSearchFilter,
+    ]
+    filterset_class = GoalDateFilter
+    search_fields = ["title", "description"]
+
+    def get_queryset(self):
+        access = get_access_context(self.request)
+        writable = [board_id for board_id in access.board_ids if access.can_write(board_id)]
+        return Goal.objects.alive().filter(board_id__in=writable)
+
+    def post(self, request, *args, **kwargs) -> Response:
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        changes = dict(serializer.validated_data)
+        dry_run = changes.pop("dry_run")
+        return Response(bulk_change_goals(self.filter_queryset(self.get_queryset()), changes, dry_run))
+
+
+class GoalExportView(GenericAPIView):
+    """
+    View для потоковой выгрузки целей доски (?board=<id>) или всех досок пользователя.
+    ?output=ndjson – доски, категории, цели и комментарии по строке на запись; ?output=csv – только цели.
+    ?gzip=true – ответ сжимается на лету. Записи читаются серверным курсором и отдаются по мере чтения,
+    поэтому размер доски не влияет на память
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    serializer_class = GoalExportQuerySerializer
+
+    def get(self, request, *args, **kwargs) -> StreamingHttpResponse:
+        serializer = self.get_serializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        params = serializer.validated_data
+        access = get_access_context(request)
+        if "board" in params:
+            if not access.can_read(params["board"]):
+                raise permissions.exceptions.PermissionDenied
+            board_ids, name = [params["board"]], f"board-{params['board']}"
+        else:
+            board_ids, name = access.board_ids, "goals"
+
+        filename = f"{name}.{params['output']}" + (".gz" if params["gzip"] else "")
+        content_type = "text/csv" if params["output"] == CSV else "application/x-ndjson"
+        response = StreamingHttpResponse(
+            encode_stream(iter_export(board_ids, params["output"]), compress=params["gzip"]),
+            content_type="application/gzip" if params["gzip"] else f"{content_type}; charset=utf-8",
+        )
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
+        return response
+
+
+class GoalListView(ConditionalGetMixin, ResponseCacheMixin, SparseFieldsetMixin, ProjectionListMixin, ListAPIView):
     """
     View для получения списка целей, доступных пользователю
     """
     model = Goal
     permission_classes = [permissions.IsAuthenticated]
     serializer_class = GoalSerializer
-    pagination_class = LimitOffsetPagination
+    pagination_class = CursorOrLimitOffsetPagination
     filter_backends = [
         DjangoFilterBackend,
         filters.OrderingFilter,
-        filters.SearchFilter,
+        FullTextSearchFilter,
     ]
     filterset_class = GoalDateFilter
     ordering_fields = ["title", "created"]
@@ -172,14 +387,13 @@ class GoalListView(ListAPIView):
     search_fields = ["title", "description"]
 
     def get_queryset(self):
-        return Goal.objects.filter(
-            Q(category__board__participants__user_id=self.request.user.id)
-            & ~Q(status=Goal.Status.archived)
-            & Q(category__is_deleted=False)
-        )
+        return Goal.objects.visible_to(self.request.user).select_related("user")
+
+    def get_version_board_ids(self):
+        return get_access_context(self.request).board_ids
 
 
-class GoalView(RetrieveUpdateDestroyAPIView):
+class GoalView(SparseFieldsetMixin, RetrieveUpdateDestroyAPIView):
     """
     View для получения, изменения и удаления цели
     """
@@ -188,10 +402,7 @@ class GoalView(RetrieveUpdateDestroyAPIView):
     permission_classes = [GoalPermission]
 
     def get_queryset(self):
-        return Goal.objects.filter(
-            ~Q(status=Goal.Status.archived)
-            & Q(category__is_deleted=False)
-        )
+        return Goal.objects.alive().select_related("user")
 
     def perform_destroy(self, instance: Goal):
         """
@@ -211,14 +422,14 @@ class GoalCommentCreateView(CreateAPIView):
     serializer_class = GoalCommentCreateSerializer
 
 
-class GoalCommentListView(ListAPIView):
+class GoalCommentListView(SparseFieldsetMixin, ProjectionListMixin, ListAPIView):
     """
     View для получения списка комментариев к цели
     """
     model = GoalComment
     permission_classes = [permissions.IsAuthenticated, IsOwnerOrReadOnly]
     serializer_class = GoalCommentSerializer
-    pagination_class = LimitOffsetPagination
+    pagination_class = CursorOrLimitOffsetPagination
     filter_backends = [
         DjangoFilterBackend,
         filters.OrderingFilter
@@ -226,12 +437,10 @@ class GoalCommentListView(ListAPIView):
     filterset_fields = ["goal"]
 
     def get_queryset(self):
-        return GoalComment.objects.filter(
-            goal__category__board__participants__user_id=self.request.user.id,
-        )
+        return GoalComment.objects.visible_to(self.request.user).select_related("user")
 
 
-class GoalCommentView(RetrieveUpdateDestroyAPIView):
+class GoalCommentView(SparseFieldsetMixin, RetrieveUpdateDestroyAPIView):
     """
     View для получения, изменения и удаления комментария
     """
@@ -240,4 +449,42 @@ class GoalCommentView(RetrieveUpdateDestroyAPIView):
     permission_classes = [permissions.IsAuthenticated, IsOwnerOrReadOnly]
 
     def get_queryset(self):
-        return GoalComment.objects.filter(user=self.request.user)
+        return GoalComment.objects.visible_to(self.request.user).filter(user=self.request.user).select_related("user")
+
+
+class ChangesView(GenericAPIView):
+    """
+    View для синхронизации клиентов: изменения досок пользователя после метки ?since= (см. goals/changes.py)
+    вместо повторной загрузки списков. Клиент хранит next из ответа и передает его в следующем запросе;
+    has_more – стоит запросить продолжение сразу, reset – данные нужно загрузить заново
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    serializer_class = ChangesQuerySerializer
+
+    def get(self, request, *args, **kwargs) -> Response:
+        serializer = self.get_serializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        params = serializer.validated_data
+        return Response(collect_changes(request.user, params.get("since"), params["limit"]))
+
+
+class GlobalSearchView(ResponseCacheMixin, GenericAPIView):
+    """
+    View для поиска по целям, категориям и комментариям всех досок пользователя (?q=).
+    Результаты всех типов в одном списке по убыванию релевантности, с фрагментом текста, где найденные
+    слова выделены <mark>. Ответ кешируется под версиями досок пользователя
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    serializer_class = GlobalSearchQuerySerializer
+
+    def get(self, request, *args, **kwargs) -> Response:
+        serializer = self.get_serializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        params = serializer.validated_data
+        return self.get_cached_response(lambda: Response(search_everywhere(
+            request.user, params["q"], params.get("types") or SEARCH_TYPES, params["limit"]
+        )))
+
+    def is_response_cacheable(self, response: Response) -> bool:
+        # Неполный ответ (часть типов не уложилась во время) не кешируем
+        return super().is_response_cacheable(response) and not response.data["timed_out"]
@@ -95,6 +95,20 @@ DATABASES = {
     'default': env.db()
 }
 
+# Cache
+# https://docs.djangoproject.com/en/4.1/topics/cache/
+# По умолчанию – кеш в памяти процесса; для нескольких воркеров задайте общий бэкенд через CACHE_URL.
+# Страницы списков целей и категорий кешируются в отдельном бэкенде (RESPONSE_CACHE_URL),
+# чтобы объемные ответы не вытесняли роли и версии досок.
+# Данные досок меняют и другие процессы (бот, board_archiver, команды), поэтому с кешем в памяти процесса
+# условный GET и кеш страниц отключены; GOALS_ALLOW_LOCAL_CACHE включает их, если процесс один
+
+CACHES = {
+    'default': env.cache('CACHE_URL', default='locmemcache://'),
+    'goals_responses': env.cache('RESPONSE_CACHE_URL', default='locmemcache://goals_responses'),
+}
+GOALS_ALLOW_LOCAL_CACHE = env.bool('GOALS_ALLOW_LOCAL_CACHE', default=False)
+
 # Password validation
 # https://docs.djangoproject.com/en/4.1/ref/settings/#auth-password-validators
 
@@ -0,0 +1,39 @@
+import pytest
+from django.urls import reverse
+from rest_framework import status
+
+from toDoListProject.core.models import User
+
+
+@pytest.mark.django_db
+class TestUserAutocomplete:
+    url = reverse('users:user_autocomplete')
+
+    @pytest.fixture(autouse=True)
+    def setup(self, user):
+        self.user = user
+        for username in ('annabel', 'Anna', 'anna_k', 'bob', 'annette'):
+            User.objects.create(username=username, first_name=username.title(), email=f'{username}@example.com')
+        User.objects.filter(username='annette').update(is_active=False)
+
+    def usernames(self, client, **params) -> list:
+        response = client.get(self.url, params)
+        assert response.status_code == status.HTTP_200_OK
+        return [user['username'] for user in response.json()]
+
+    def test_prefix_matches(self, auth_client):
+        assert self.usernames(auth_client, q='ANN') == ['Anna', 'anna_k', 'annabel']
+        assert self.usernames(auth_client, q='ann', limit=2) == ['Anna', 'anna_k']
+
+    def test_no_email_in_response(self, auth_client):
+        response = auth_client.get(self.url, {'q': 'bob'})
+        assert response.json() == [{'id': User.objects.get(username='bob').pk, 'username': 'bob',
+                                    'first_name': 'Bob', 'last_name': ''}]
+
+    def test_excludes_current_user(self, auth_client):
+        assert self.usernames(auth_client, q=self.user.username[:3]).count(self.user.username) == 0
+
+    def test_validation_and_auth(self, auth_client, client):
+        assert auth_client.get(self.url, {'q': 'a'}).status_code == status.HTTP_400_BAD_REQUEST
+        client.logout()
+        assert client.get(self.url, {'q': 'ann'}).status_code == status.HTTP_403_FORBIDDEN
@@ -0,0 +1,103 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework import status
+
+from toDoListProject.goals import archiving
+from toDoListProject.goals.archiving import archive_chunk, run_archive_job
+from toDoListProject.goals.models import BoardArchiveJob, Goal, GoalCategory, GoalComment
+
+
+@pytest.mark.django_db
+class TestBoardArchiveJob:
+
+    @pytest.fixture(autouse=True)
+    def setup(self, board_participant, user, category_factory, goal_factory):
+        self.board = board_participant.board
+        self.user = user
+        self.categories = category_factory.create_batch(2, board=self.board, user=user)
+        self.goals = goal_factory.create_batch(5, category=self.categories[0], user=user, status=Goal.Status.to_do)
+
+    def delete_board(self, auth_client):
+        response = auth_client.delete(reverse('goals:board', kwargs={'pk': self.board.pk}))
+        assert response.status_code == status.HTTP_204_NO_CONTENT
+
+    def test_delete_only_schedules_job(self, auth_client):
+        self.delete_board(auth_client)
+        job = BoardArchiveJob.objects.get(board=self.board)
+        assert job.status == BoardArchiveJob.Status.pending
+        assert Goal.objects.filter(board=self.board, status=Goal.Status.to_do).count() == 5
+
+    def test_board_data_is_gone_immediately(self, auth_client):
+        comment = GoalComment.objects.create(goal=self.goals[0], user=self.user, text='text')
+        auth_client.get(reverse('goals:goal', kwargs={'pk': self.goals[0].pk}))  # Роль попадает в кеш
+        self.delete_board(auth_client)
+
+        assert auth_client.get(reverse('goals:goal_list')).data == []
+        assert auth_client.get(reverse('goals:category_list')).data == []
+        assert auth_client.get(reverse('goals:comment_list'), {'goal': self.goals[0].pk}).data == []
+        assert auth_client.get(
+            reverse('goals:goal', kwargs={'pk': self.goals[0].pk})
+        ).status_code == status.HTTP_403_FORBIDDEN
+        assert auth_client.get(
+            reverse('goals:category', kwargs={'pk': self.categories[0].pk})
+        ).status_code == status.HTTP_404_NOT_FOUND
+        assert auth_client.get(
+            reverse('goals:comment', kwargs={'pk': comment.pk})
+        ).status_code == status.HTTP_404_NOT_FOUND
+        response = auth_client.post(reverse('goals:create_comment'), data={'goal': self.goals[0].pk, 'text': 'new'})
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+        response = auth_client.post(reverse('goals:create_goal'), data={
+            'title': 'new', 'category': self.categories[1].pk, 'due_date': '2030-01-01T00:00:00Z',
+        })
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_job_processes_chunks_and_reports_progress(self, auth_client):
+        self.delete_board(auth_client)
+        out = StringIO()
+        call_command('archive_boards', '--once', '--chunk-size', '2', stdout=out)
+
+        job = BoardArchiveJob.objects.get(board=self.board)
+        assert job.status == BoardArchiveJob.Status.done
+        assert (job.goals_archived, job.goals_total) == (5, 5)
+        assert (job.categories_deleted, job.categories_total) == (2, 2)
+        assert not Goal.objects.filter(board=self.board).exclude(status=Goal.Status.archived).exists()
+        assert not GoalCategory.objects.filter(board=self.board, is_deleted=False).exists()
+        assert f'Доска {self.board.pk}: целей 2/5, категорий 0/2' in out.getvalue()
+        assert f'Доска {self.board.pk}: целей 5/5, категорий 2/2' in out.getvalue()
+
+    def test_interrupted_job_resumes(self, auth_client):
+        self.delete_board(auth_client)
+        job = BoardArchiveJob.objects.get(board=self.board)
+
+        def interrupt(job):
+            raise KeyboardInterrupt
+
+        with pytest.raises(KeyboardInterrupt):
+            run_archive_job(job, chunk_size=3, progress=interrupt)
+        job.refresh_from_db()
+        assert (job.status, job.goals_archived) == (BoardArchiveJob.Status.running, 3)
+
+        run_archive_job(job, chunk_size=3)
+        job.refresh_from_db()
+        assert (job.status, job.goals_archived, job.goals_total) == (BoardArchiveJob.Status.done, 5, 5)
+
+    def test_job_claimed_by_other_worker_is_skipped(self, auth_client, monkeypatch):
+        self.delete_board(auth_client)
+        job = BoardArchiveJob.objects.get(board=self.board)
+        # Строку задачи держит другой обработчик: SKIP LOCKED ее не вернет
+        monkeypatch.setattr(archiving, 'claim_archive_job', lambda job_id: None)
+        out = StringIO()
+        call_command('archive_boards', '--once', stdout=out)
+        job.refresh_from_db()
+        assert (job.status, job.goals_archived) == (BoardArchiveJob.Status.pending, 0)
+        assert Goal.objects.filter(board=self.board).exclude(status=Goal.Status.archived).count() == 5
+        assert out.getvalue() == ''
+
+    def test_archive_chunk_skips_processed_rows(self):
+        goals = Goal.objects.filter(board=self.board).exclude(status=Goal.Status.archived)
+        assert archive_chunk(goals, {'status': Goal.Status.archived}, 4) == 4
+        assert archive_chunk(goals, {'status': Goal.Status.archived}, 4) == 1
+        assert archive_chunk(goals, {'status': Goal.Status.archived}, 4) == 0
@@ -0,0 +1,65 @@
+import datetime
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+
+from toDoListProject.goals.models import BoardParticipant, Goal, GoalComment
+
+
+@pytest.mark.django_db
+class TestBoardListStats:
+    url = reverse('goals:board_list')
+
+    @pytest.fixture(autouse=True)
+    def setup(self, board_participant, user, user_factory, category_factory, goal_factory):
+        self.board = board_participant.board
+        self.user = user
+        BoardParticipant.objects.create(board=self.board, user=user_factory.create(), role=BoardParticipant.Role.reader)
+        category = category_factory.create(board=self.board, user=user)
+        for state in (Goal.Status.to_do, Goal.Status.to_do, Goal.Status.done, Goal.Status.archived):
+            goal_factory.create(category=category, user=user, status=state)
+        self.comment = GoalComment.objects.create(goal=Goal.objects.filter(board=self.board).first(), user=user,
+                                                  text='text')
+        self.empty_board = BoardParticipant.objects.create(
+            board=category_factory.create().board, user=user, role=BoardParticipant.Role.writer
+        ).board
+
+    def test_list_without_stats(self, auth_client):
+        response = auth_client.get(self.url)
+        assert set(response.json()[0]) == {'id', 'created', 'updated', 'title', 'is_deleted'}
+
+    def test_stats_in_single_query(self, auth_client):
+        with CaptureQueriesContext(connection) as context:
+            response = auth_client.get(self.url, {'stats': 'true'})
+        assert response.status_code == status.HTTP_200_OK
+        boards = {board['id']: board for board in response.json()}
+
+        board = boards[self.board.pk]
+        assert (board['goals_to_do'], board['goals_in_progress'], board['goals_done']) == (2, 0, 1)
+        assert board['participants_count'] == 2
+        assert board['role'] == BoardParticipant.Role.owner
+        self.comment.refresh_from_db()
+        assert board['last_activity'] == self.comment.updated.isoformat().replace('+00:00', 'Z')
+
+        empty = boards[self.empty_board.pk]
+        assert (empty['goals_to_do'], empty['participants_count'], empty['role']) == (0, 1, BoardParticipant.Role.writer)
+        # Сессия, пользователь и одна выборка досок вместе со статистикой
+        assert len([query for query in context.captured_queries if 'goals_board' in query['sql']]) == 1
+
+    def test_last_activity_follows_goal_changes(self, auth_client):
+        goal = Goal.objects.filter(board=self.board).first()
+        goal.updated = timezone.now() + datetime.timedelta(hours=1)
+        Goal.objects.filter(pk=goal.pk).update(updated=goal.updated)
+        board = auth_client.get(self.url, {'stats': '1', 'fields': 'id,last_activity'}).json()
+        assert [item for item in board if item['id'] == self.board.pk] == [
+            {'id': self.board.pk, 'last_activity': goal.updated.isoformat().replace('+00:00', 'Z')}
+        ]
+
+    def test_stats_with_cursor_pagination(self, auth_client):
+        response = auth_client.get(self.url, {'stats': 'true', 'pagination': 'cursor', 'limit': 1})
+        assert response.status_code == status.HTTP_200_OK
+        assert 'goals_done' in response.json()['results'][0]
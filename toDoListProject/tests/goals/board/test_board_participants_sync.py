@@ -0,0 +1,81 @@
+import factory
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIRequestFactory
+
+from toDoListProject.goals.models import BoardParticipant
+from toDoListProject.goals.serializers import BoardSerializer
+
+Role = BoardParticipant.Role
+
+
+@pytest.mark.django_db
+class TestBoardParticipantsSync:
+
+    @pytest.fixture(autouse=True)
+    def setup(self, board_participant, user, user_factory):
+        self.board = board_participant.board
+        self.user = user
+        self.url = reverse('goals:board', kwargs={'pk': self.board.pk})
+        self.members = user_factory.create_batch(3, username=factory.Sequence(lambda number: f'sync{number}'))
+        for member in self.members:
+            BoardParticipant.objects.create(board=self.board, user=member, role=Role.reader)
+
+    def put(self, client, participants: list):
+        return client.put(self.url, data={'title': self.board.title, 'participants': participants}, format='json')
+
+    def update(self, participants: list) -> BoardSerializer:
+        request = APIRequestFactory().put(self.url)
+        request.user = self.user
+        serializer = BoardSerializer(self.board, data={'title': self.board.title, 'participants': participants},
+                                     context={'request': request})
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+        return serializer
+
+    def test_only_difference_is_written(self, user_factory):
+        newcomer = user_factory.create(username='newcomer')
+        kept_ids = dict(BoardParticipant.objects.filter(user__in=self.members[:2]).values_list('user_id', 'id'))
+
+        serializer = self.update([
+            {'user': self.members[0].username, 'role': Role.reader},
+            {'user': self.members[1].username, 'role': Role.writer},
+            {'user': newcomer.username, 'role': Role.reader},
+        ])
+
+        assert serializer.participant_changes == {
+            'added': [newcomer.pk], 'updated': [self.members[1].pk], 'removed': [self.members[2].pk],
+        }
+        roles = dict(BoardParticipant.objects.filter(board=self.board).values_list('user_id', 'role'))
+        assert roles == {self.user.pk: Role.owner, self.members[0].pk: Role.reader,
+                         self.members[1].pk: Role.writer, newcomer.pk: Role.reader}
+        # Неизменные и измененные участники не пересоздаются
+        assert dict(BoardParticipant.objects.filter(user__in=self.members[:2]).values_list('user_id', 'id')) == kept_ids
+
+    def test_same_participants_change_nothing(self):
+        serializer = self.update([{'user': member.username, 'role': Role.reader} for member in self.members])
+        assert serializer.participant_changes == {'added': [], 'updated': [], 'removed': []}
+
+    def test_patch_without_participants_keeps_them(self, auth_client):
+        response = auth_client.patch(self.url, data={'title': 'new title'}, format='json')
+        assert response.status_code == status.HTTP_200_OK
+        assert BoardParticipant.objects.filter(board=self.board).count() == 4
+
+    def test_unknown_user(self, auth_client):
+        response = self.put(auth_client, [{'user': 'nobody', 'role': Role.reader}])
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    @pytest.mark.parametrize('size', [5, 40])
+    def test_query_count_does_not_depend_on_board_size(self, auth_client, user_factory, size):
+        users = user_factory.create_batch(size, username=factory.Sequence(lambda number: f'bulk{size}-{number}'))
+        participants = [{'user': user.username, 'role': Role.writer} for user in users]
+        participants += [{'user': self.members[0].username, 'role': Role.writer}]
+        with CaptureQueriesContext(connection) as context:
+            response = self.put(auth_client, participants)
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.json()['participants']) == size + 2
+        # Не больше одной вставки в журнал изменений на каждый вид изменения участников
+        assert len(context.captured_queries) <= 18
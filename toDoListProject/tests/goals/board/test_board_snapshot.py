@@ -0,0 +1,107 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from toDoListProject.goals.models import BoardParticipant, Goal, GoalComment
+
+
+@pytest.mark.django_db
+class TestBoardSnapshot:
+
+    @pytest.fixture(autouse=True)
+    def setup(self, board_participant, user, category_factory, goal_factory):
+        self.board = board_participant.board
+        self.user = user
+        self.url = reverse('goals:board_snapshot', kwargs={'pk': self.board.pk})
+        self.category = category_factory.create(board=self.board, user=user)
+        self.deleted_category = category_factory.create(board=self.board, user=user, is_deleted=True)
+        self.goals = [goal_factory.create(category=self.category, user=user, status=Goal.Status.to_do)
+                      for _ in range(3)]
+        self.archived = goal_factory.create(category=self.category, user=user, status=Goal.Status.archived)
+        GoalComment.objects.create(goal=self.goals[0], user=user, text='first')
+        GoalComment.objects.create(goal=self.goals[0], user=user, text='second')
+
+    def test_snapshot(self, auth_client):
+        response = auth_client.get(self.url)
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        assert data['board'] == auth_client.get(reverse('goals:board', kwargs={'pk': self.board.pk})).json()
+        assert [category['id'] for category in data['categories']] == [self.category.pk]
+        assert data['categories'][0] == auth_client.get(
+            reverse('goals:category', kwargs={'pk': self.category.pk})
+        ).json()
+        assert [goal['id'] for goal in data['goals']] == [goal.pk for goal in self.goals]
+        assert data['goals'][0] == auth_client.get(reverse('goals:goal', kwargs={'pk': self.goals[0].pk})).json()
+        assert data['next'] is None
+
+    def test_comment_counts(self, auth_client):
+        goals = auth_client.get(self.url, {'comments': 'true'}).json()['goals']
+        assert [goal['comments_count'] for goal in goals] == [2, 0, 0]
+        assert 'comments_count' not in auth_client.get(self.url).json()['goals'][0]
+
+    def test_query_count_does_not_grow(self, auth_client, goal_factory):
+        def count_queries() -> int:
+            with CaptureQueriesContext(connection) as context:
+                assert auth_client.get(self.url, {'comments': 'true'})['X-Cache'] == 'MISS'
+            return len(context.captured_queries)
+
+        # Первый запрос еще и заполняет кеш ролей пользователя
+        auth_client.get(self.url)
+        few = count_queries()
+        goal_factory.create_batch(10, category=self.category, user=self.user, status=Goal.Status.done)
+        # Сессия, пользователь, доска, участники, категории, цели и комментарии
+        assert count_queries() == few <= 7
+
+    def test_continuation(self, auth_client):
+        first = auth_client.get(self.url, {'limit': 2}).json()
+        assert [goal['id'] for goal in first['goals']] == [goal.pk for goal in self.goals[:2]]
+        assert f'after={self.goals[1].pk}' in first['next']
+
+        second = auth_client.get(first['next']).json()
+        assert set(second) == {'goals', 'next', 'version'}
+        assert [goal['id'] for goal in second['goals']] == [self.goals[2].pk]
+        assert second['next'] is None
+        assert second['version'] == first['version']
+
+    def test_invalid_limit(self, auth_client):
+        assert auth_client.get(self.url, {'limit': 0}).status_code == status.HTTP_400_BAD_REQUEST
+        assert auth_client.get(self.url, {'limit': 5001}).status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_cached_under_board_version(self, auth_client, user_factory):
+        assert auth_client.get(self.url)['X-Cache'] == 'MISS'
+
+        reader = user_factory.create()
+        BoardParticipant.objects.create(board=self.board, user=reader, role=BoardParticipant.Role.reader)
+        client = APIClient()
+        client.force_login(reader)
+        # Новый участник меняет версию доски, а с ней и снимок
+        response = client.get(self.url)
+        assert response['X-Cache'] == 'MISS'
+        assert len(response.json()['board']['participants']) == 2
+        assert auth_client.get(self.url)['X-Cache'] == 'HIT'
+
+        self.goals[0].title = 'changed'
+        self.goals[0].save()
+        response = client.get(self.url)
+        assert response['X-Cache'] == 'MISS'
+        assert response.json()['goals'][0]['title'] == 'changed'
+
+    def test_not_modified(self, auth_client):
+        etag = auth_client.get(self.url)['ETag']
+        assert auth_client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code == status.HTTP_304_NOT_MODIFIED
+
+    def test_other_user(self, client, user_factory):
+        client.force_login(user_factory.create())
+        assert client.get(self.url).status_code == status.HTTP_403_FORBIDDEN
+
+    def test_profile_edit_invalidates_snapshot(self, auth_client):
+        assert auth_client.get(self.url)['X-Cache'] == 'MISS'
+        auth_client.patch(reverse('users:user_details'), {'username': 'renamed'}, format='json')
+        response = auth_client.get(self.url)
+        assert response['X-Cache'] == 'MISS'
+        data = response.json()
+        assert [participant['user'] for participant in data['board']['participants']] == ['renamed']
+        assert data['goals'][0]['user']['username'] == 'renamed'
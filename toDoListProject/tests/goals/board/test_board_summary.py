@@ -0,0 +1,123 @@
+import datetime
+from io import StringIO
+
+import pytest
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+
+from toDoListProject.goals.models import BoardSummary, Goal
+
+
+@pytest.mark.django_db
+class TestBoardSummary:
+
+    @pytest.fixture(autouse=True)
+    def setup(self, board_participant, user, category_factory, goal_factory):
+        self.board = board_participant.board
+        self.user = user
+        self.url = reverse('goals:board_summary', kwargs={'pk': self.board.pk})
+        self.categories = category_factory.create_batch(2, board=self.board, user=user)
+        yesterday = timezone.now() - datetime.timedelta(days=1)
+        tomorrow = timezone.now() + datetime.timedelta(days=1)
+        self.goals = [
+            goal_factory.create(category=self.categories[0], user=user, status=Goal.Status.to_do,
+                                priority=Goal.Priority.high, due_date=yesterday),
+            goal_factory.create(category=self.categories[0], user=user, status=Goal.Status.done,
+                                priority=Goal.Priority.high, due_date=yesterday),
+            goal_factory.create(category=self.categories[1], user=user, status=Goal.Status.in_progress,
+                                priority=Goal.Priority.low, due_date=tomorrow),
+        ]
+
+    def get_summary(self, client) -> dict:
+        response = client.get(self.url)
+        assert response.status_code == status.HTTP_200_OK
+        return response.json()
+
+    def test_summary(self, auth_client):
+        with CaptureQueriesContext(connection) as context:
+            summary = self.get_summary(auth_client)
+        assert summary['board'] == self.board.pk
+        assert summary['total'] == 3
+        assert summary['by_status'] == {str(Goal.Status.to_do): 1, str(Goal.Status.done): 1,
+                                        str(Goal.Status.in_progress): 1}
+        assert summary['by_priority'] == {str(Goal.Priority.high): 2, str(Goal.Priority.low): 1}
+        assert summary['by_category'] == {str(self.categories[0].pk): 2, str(self.categories[1].pk): 1}
+        assert summary['overdue'] == 1
+        # Сводка читается одним запросом по первичному ключу, цели не читаются
+        assert not any('goals_goal"' in query['sql'] for query in context.captured_queries)
+
+    def test_goal_update_and_archive(self, auth_client):
+        goal_url = reverse('goals:goal', kwargs={'pk': self.goals[0].pk})
+        auth_client.patch(goal_url, data={'status': Goal.Status.done, 'category': self.categories[1].pk})
+        summary = self.get_summary(auth_client)
+        assert summary['by_status'][str(Goal.Status.done)] == 2
+        assert summary['by_category'] == {str(self.categories[0].pk): 1, str(self.categories[1].pk): 2}
+        assert summary['overdue'] == 0
+
+        auth_client.delete(goal_url)
+        summary = self.get_summary(auth_client)
+        assert summary['total'] == 2
+        assert summary['by_status'][str(Goal.Status.done)] == 1
+
+    def test_category_delete(self, auth_client):
+        auth_client.delete(reverse('goals:category', kwargs={'pk': self.categories[0].pk}))
+        summary = self.get_summary(auth_client)
+        assert summary['total'] == 1
+        assert summary['by_category'] == {str(self.categories[1].pk): 1}
+
+    def test_bulk_operations(self, auth_client):
+        auth_client.post(reverse('goals:goal_bulk'), data={'status': Goal.Status.done}, format='json')
+        assert self.get_summary(auth_client)['by_status'] == {str(Goal.Status.done): 3}
+
+        auth_client.post(reverse('goals:goal_batch'), data={'operations': [
+            {'op': 'archive', 'id': self.goals[0].pk},
+            {'op': 'create', 'data': {'title': 'new', 'category': self.categories[1].pk,
+                                      'due_date': '2000-01-01T00:00:00Z'}},
+        ]}, format='json')
+        summary = self.get_summary(auth_client)
+        assert summary['by_status'] == {str(Goal.Status.done): 2, str(Goal.Status.to_do): 1}
+        assert summary['overdue'] == 1
+        call_command('board_summary', stdout=StringIO())
+
+    def test_empty_board(self, auth_client, board_participant_factory):
+        board = board_participant_factory.create(user=self.user).board
+        response = auth_client.get(reverse('goals:board_summary', kwargs={'pk': board.pk}))
+        assert response.json()['total'] == 0
+
+    def test_other_user(self, client, user_factory):
+        client.force_login(user_factory.create())
+        assert client.get(self.url).status_code == status.HTTP_403_FORBIDDEN
+
+    def test_check_and_fix_drift(self):
+        call_command('board_summary', stdout=StringIO())
+
+        Goal.objects.filter(pk=self.goals[0].pk).update(status=Goal.Status.done)
+        with pytest.raises(CommandError):
+            call_command('board_summary', stdout=StringIO())
+
+        call_command('board_summary', '--fix', stdout=StringIO())
+        assert BoardSummary.objects.get(board=self.board).counts[f'status:{Goal.Status.done}'] == 2
+        call_command('board_summary', stdout=StringIO())
+
+    def test_rebuild(self):
+        BoardSummary.objects.all().delete()
+        call_command('board_summary', '--rebuild', stdout=StringIO())
+        assert BoardSummary.objects.get(board=self.board).counts['total'] == 3
+
+    def test_fix_in_chunks(self, board_participant_factory, category_factory, goal_factory):
+        other = board_participant_factory.create(user=self.user).board
+        goal_factory.create(category=category_factory.create(board=other, user=self.user), user=self.user,
+                            status=Goal.Status.to_do)
+        BoardSummary.objects.filter(board=self.board).update(counts={})
+        BoardSummary.objects.filter(board=other).delete()
+
+        out = StringIO()
+        call_command('board_summary', '--fix', '--chunk-size', '1', stdout=out)
+        assert 'Пересчитано сводок: 2' in out.getvalue()
+        assert BoardSummary.objects.get(board=self.board).counts['total'] == 3
+        assert BoardSummary.objects.get(board=other).counts['total'] == 1
+        call_command('board_summary', '--chunk-size', '1', stdout=StringIO())
@@ -1,6 +1,8 @@
 import json
+from io import StringIO
 
 import pytest
+from django.core.management import call_command
 from django.urls import reverse
 from rest_framework import status
 
@@ -129,6 +131,7 @@ class TestBoardView:
         category_factory.create(board=board, user=user)
         response = auth_client.delete(self.url)
         assert response.status_code == status.HTTP_204_NO_CONTENT
+        call_command('archive_boards', '--once', stdout=StringIO())
         assert GoalCategory.objects.get(board_id=board.pk).is_deleted is True
 
     def test_goal_marked_archived_when_board_is_deleted(self, auth_client, board, user, category_factory, goal_factory):
@@ -139,6 +142,7 @@ class TestBoardView:
         goal_factory.create_batch(5, category=category, user=user)
         response = auth_client.delete(self.url)
         assert response.status_code == status.HTTP_204_NO_CONTENT
+        call_command('archive_boards', '--once', '--chunk-size', '2', stdout=StringIO())
         for state in Goal.objects.filter(category=category):
             assert state.status == Goal.Status.archived
     #
@@ -0,0 +1,98 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+
+from toDoListProject.goals.models import BoardParticipant, Goal, GoalComment
+
+
+@pytest.mark.django_db
+class TestGoalBatch:
+    url = reverse('goals:goal_batch')
+
+    @pytest.fixture(autouse=True)
+    def setup(self, board_participant, user, category_factory, goal_factory):
+        self.board = board_participant.board
+        self.user = user
+        self.category = category_factory.create(board=self.board, user=user)
+        self.goals = goal_factory.create_batch(3, category=self.category, user=user, status=Goal.Status.to_do)
+
+    def test_create_update_archive(self, auth_client):
+        response = auth_client.post(self.url, data={'operations': [
+            {'op': 'create', 'data': {'title': 'new', 'category': self.category.pk,
+                                      'due_date': '2030-01-01T00:00:00Z'}},
+            {'op': 'update', 'id': self.goals[0].pk, 'data': {'title': 'renamed', 'priority': 4}},
+            {'op': 'archive', 'id': self.goals[1].pk},
+        ]}, format='json')
+
+        assert response.status_code == status.HTTP_200_OK
+        results = response.data['results']
+        assert [result['status'] for result in results] == [201, 200, 200]
+
+        created = Goal.objects.get(pk=results[0]['data']['id'])
+        assert created.title == 'new'
+        assert created.board_id == self.board.pk
+        assert created.user_id == self.user.pk
+        assert created.created is not None and created.updated is not None
+
+        updated = Goal.objects.get(pk=self.goals[0].pk)
+        assert (updated.title, updated.priority) == ('renamed', 4)
+        assert updated.updated > self.goals[0].updated
+        assert results[1]['data']['title'] == 'renamed'
+        assert Goal.objects.get(pk=self.goals[1].pk).status == Goal.Status.archived
+
+    def test_item_errors_do_not_cancel_batch(self, auth_client, category_factory, goal_factory):
+        foreign_goal = goal_factory.create()
+        response = auth_client.post(self.url, data={'operations': [
+            {'op': 'create', 'data': {'title': 'new', 'category': category_factory.create().pk}},
+            {'op': 'update', 'id': foreign_goal.pk, 'data': {'title': 'hacked'}},
+            {'op': 'archive', 'id': 0},
+            {'op': 'update', 'id': self.goals[0].pk, 'data': {'status': 100}},
+            {'op': 'archive', 'id': self.goals[2].pk},
+            {'op': 'archive', 'id': self.goals[2].pk},
+        ]}, format='json')
+
+        assert response.status_code == status.HTTP_200_OK
+        assert [result['status'] for result in response.data['results']] == [400, 403, 404, 400, 200, 400]
+        assert Goal.objects.get(pk=foreign_goal.pk).title != 'hacked'
+        assert Goal.objects.get(pk=self.goals[2].pk).status == Goal.Status.archived
+
+    def test_reader_cannot_write(self, auth_client):
+        BoardParticipant.objects.filter(board=self.board, user=self.user).update(role=BoardParticipant.Role.reader)
+        response = auth_client.post(self.url, data={'operations': [
+            {'op': 'archive', 'id': self.goals[0].pk},
+        ]}, format='json')
+        assert response.data['results'][0]['status'] == status.HTTP_403_FORBIDDEN
+
+    def test_move_to_other_board(self, auth_client, board_participant_factory, category_factory):
+        other_board = board_participant_factory.create(user=self.user).board
+        other_category = category_factory.create(board=other_board, user=self.user)
+        comment = GoalComment.objects.create(goal=self.goals[0], user=self.user, text='text')
+
+        response = auth_client.post(self.url, data={'operations': [
+            {'op': 'update', 'id': self.goals[0].pk, 'data': {'category': other_category.pk}},
+        ]}, format='json')
+
+        assert response.data['results'][0]['status'] == status.HTTP_200_OK
+        assert Goal.objects.get(pk=self.goals[0].pk).board_id == other_board.pk
+        comment.refresh_from_db()
+        assert comment.board_id == other_board.pk
+
+    def test_invalid_operations(self, auth_client):
+        response = auth_client.post(self.url, data={'operations': [{'op': 'delete', 'id': 1}, {'op': 'update'}]},
+                                    format='json')
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_query_count_does_not_depend_on_batch_size(self, auth_client):
+        operations = [{'op': 'create', 'data': {'title': f'goal {number}', 'category': self.category.pk,
+                                                  'due_date': '2030-01-01T00:00:00Z'}}
+                      for number in range(50)]
+        operations += [{'op': 'update', 'id': goal.pk, 'data': {'priority': 1}} for goal in self.goals]
+        with CaptureQueriesContext(connection) as context:
+            response = auth_client.post(self.url, data={'operations': operations}, format='json')
+        assert response.status_code == status.HTTP_200_OK
+        assert all(result['status'] in (200, 201) for result in response.data['results'])
+        # Аутентификация, роли, категории, цели, вставка, обновление, журнал изменений, сводка доски
+        # и точки сохранения транзакции
+        assert len(context.captured_queries) <= 16
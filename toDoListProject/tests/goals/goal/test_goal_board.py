@@ -0,0 +1,56 @@
+import pytest
+from django.urls import reverse
+from rest_framework import status
+
+from toDoListProject.goals.models import GoalComment, Goal
+
+
+@pytest.mark.django_db
+class TestGoalBoard:
+
+    def test_goal_and_comment_copy_board(self, goal, user):
+        """
+        Цель и комментарий получают доску своей категории
+        """
+        comment = GoalComment.objects.create(goal=goal, user=user, text='text')
+        assert goal.board_id == goal.category.board_id
+        assert comment.board_id == goal.board_id
+
+    def test_moving_goal_moves_comments(self, goal, user, category_factory):
+        """
+        При переносе цели в категорию другой доски переносятся и ее комментарии
+        """
+        comment = GoalComment.objects.create(goal=goal, user=user, text='text')
+        other_category = category_factory.create()
+        goal = Goal.objects.get(pk=goal.pk)
+        goal.category_id = other_category.pk
+        goal.save()
+        comment.refresh_from_db()
+        assert goal.board_id == other_category.board_id
+        assert comment.board_id == other_category.board_id
+
+    def test_goal_list_filter_by_board(self, auth_client, board_participant, user, category_factory,
+                                       goal_factory, board_factory):
+        """
+        Список целей фильтруется по доске
+        """
+        other_board = board_factory.create()
+        other_board.participants.create(user=user)
+        goal_factory.create_batch(2, category=category_factory.create(board=board_participant.board), user=user)
+        goals = goal_factory.create_batch(3, category=category_factory.create(board=other_board), user=user)
+        response = auth_client.get(reverse('goals:goal_list'), {'board': other_board.pk})
+        assert response.status_code == status.HTTP_200_OK
+        assert {item['id'] for item in response.json()} == {goal.pk for goal in goals}
+
+    def test_board_not_in_responses(self, auth_client, board_participant, user, category_factory, goal_factory):
+        """
+        Денормализованная доска – деталь хранения: форма ответов целей и комментариев не меняется
+        """
+        goal = goal_factory.create(category=category_factory.create(board=board_participant.board), user=user)
+        assert 'board' not in auth_client.get(reverse('goals:goal', kwargs={'pk': goal.pk})).json()
+        assert 'board' not in auth_client.get(reverse('goals:goal_list')).json()[0]
+        response = auth_client.post(reverse('goals:create_comment'), {'goal': goal.pk, 'text': 'text'}, format='json')
+        assert response.status_code == status.HTTP_201_CREATED
+        assert 'board' not in response.json()
+        comments = auth_client.get(reverse('goals:comment_list'), {'goal': goal.pk}).json()
+        assert comments and 'board' not in comments[0]
@@ -0,0 +1,73 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+
+from toDoListProject.goals.models import BoardParticipant, Goal, GoalComment
+
+
+@pytest.mark.django_db
+class TestGoalBulkAction:
+    url = reverse('goals:goal_bulk')
+
+    @pytest.fixture(autouse=True)
+    def setup(self, board_participant, user, category_factory, goal_factory):
+        self.board = board_participant.board
+        self.user = user
+        self.category = category_factory.create(board=self.board, user=user)
+        self.todo = goal_factory.create_batch(3, category=self.category, user=user,
+                                              status=Goal.Status.to_do, priority=Goal.Priority.low)
+        self.in_progress = goal_factory.create(category=self.category, user=user,
+                                              status=Goal.Status.in_progress, priority=Goal.Priority.low)
+
+    def test_set_status_by_filter(self, auth_client):
+        with CaptureQueriesContext(connection) as context:
+            response = auth_client.post(f'{self.url}?status={Goal.Status.to_do}',
+                                        data={'status': Goal.Status.done}, format='json')
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['count'] == 3
+        assert response.data['by_board'] == {self.board.pk: 3}
+        assert Goal.objects.filter(status=Goal.Status.done).count() == 3
+        assert Goal.objects.get(pk=self.in_progress.pk).status == Goal.Status.in_progress
+        assert Goal.objects.get(pk=self.todo[0].pk).updated > self.todo[0].updated
+        # Цели не загружаются целиком: подсчет по доскам, id для журнала изменений и один UPDATE
+        assert sum('UPDATE "goals_goal"' in query['sql'] for query in context.captured_queries) == 1
+        assert not any(query['sql'].startswith('SELECT') and '"goals_goal"."title"' in query['sql']
+                       for query in context.captured_queries)
+
+    def test_dry_run(self, auth_client):
+        response = auth_client.post(self.url, data={'priority': Goal.Priority.critical, 'dry_run': True},
+                                    format='json')
+        assert response.data['count'] == 4
+        assert response.data['dry_run'] is True
+        assert not Goal.objects.filter(priority=Goal.Priority.critical).exists()
+
+    def test_move_to_category(self, auth_client, board_participant_factory, category_factory):
+        other_board = board_participant_factory.create(user=self.user).board
+        other_category = category_factory.create(board=other_board, user=self.user)
+        comment = GoalComment.objects.create(goal=self.todo[0], user=self.user, text='text')
+
+        response = auth_client.post(f'{self.url}?status={Goal.Status.to_do}',
+                                    data={'category': other_category.pk}, format='json')
+        assert response.data['count'] == 3
+        assert set(Goal.objects.filter(board=other_board).values_list('id', flat=True)) == {g.pk for g in self.todo}
+        assert Goal.objects.get(pk=self.todo[0].pk).category_id == other_category.pk
+        comment.refresh_from_db()
+        assert comment.board_id == other_board.pk
+
+    def test_only_writable_boards(self, auth_client, goal_factory):
+        foreign = goal_factory.create(status=Goal.Status.to_do)
+        BoardParticipant.objects.create(board=foreign.board, user=self.user, role=BoardParticipant.Role.reader)
+
+        response = auth_client.post(self.url, data={'status': Goal.Status.done}, format='json')
+        assert response.data['count'] == 4
+        assert Goal.objects.get(pk=foreign.pk).status == Goal.Status.to_do
+
+    def test_category_of_other_board_is_rejected(self, auth_client, category_factory):
+        response = auth_client.post(self.url, data={'category': category_factory.create().pk}, format='json')
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_nothing_to_change(self, auth_client):
+        response = auth_client.post(self.url, data={}, format='json')
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
@@ -0,0 +1,74 @@
+import pytest
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.utils.urls import replace_query_param
+
+
+@pytest.mark.django_db
+class TestGoalListPagination:
+    url = reverse('goals:goal_list')
+
+    @pytest.fixture(autouse=True)
+    def setup(self, board_participant, user, category_factory, goal_factory):
+        category = category_factory.create(board=board_participant.board, user=user)
+        # Одинаковые названия: позиция страницы определяется только через id (tie-breaker)
+        self.goals = goal_factory.create_batch(7, category=category, user=user, title='same') + \
+            goal_factory.create_batch(5, category=category, user=user, title='other')
+
+    def walk(self, client, url) -> list:
+        ids = []
+        while url:
+            response = client.get(url)
+            assert response.status_code == status.HTTP_200_OK
+            assert 'count' not in response.json()
+            ids += [item['id'] for item in response.json()['results']]
+            url = response.json()['next']
+        return ids
+
+    def test_limit_offset_is_default(self, auth_client):
+        """
+        Без явного выбора режима сохраняется контракт limit/offset
+        """
+        response = auth_client.get(self.url, {'limit': 5, 'offset': 5})
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()['count'] == len(self.goals)
+        assert len(response.json()['results']) == 5
+
+    def test_cursor_pages_cover_all_goals_once(self, auth_client):
+        """
+        Курсорная пагинация проходит все цели ровно один раз в порядке title, created, id
+        """
+        ids = self.walk(auth_client, f'{self.url}?pagination=cursor&limit=5')
+        expected = [goal.id for goal in sorted(self.goals, key=lambda g: (g.title, g.created, g.id))]
+        assert ids == expected
+
+    def test_cursor_respects_ordering_param(self, auth_client):
+        """
+        Порядок, выбранный через ?ordering, сохраняется между страницами
+        """
+        ids = self.walk(auth_client, f'{self.url}?pagination=cursor&limit=4&ordering=-created')
+        expected = [goal.id for goal in sorted(self.goals, key=lambda g: (g.created, g.id), reverse=True)]
+        assert ids == expected
+
+    def test_previous_link_returns_previous_page(self, auth_client):
+        """
+        Ссылка previous возвращает ту же страницу, с которой пришли
+        """
+        first = auth_client.get(self.url, {'pagination': 'cursor', 'limit': 5}).json()
+        assert first['previous'] is None
+        second = auth_client.get(first['next']).json()
+        back = auth_client.get(second['previous']).json()
+        assert [item['id'] for item in back['results']] == [item['id'] for item in first['results']]
+
+    def test_invalid_cursor(self, auth_client):
+        response = auth_client.get(self.url, {'cursor': 'garbage'})
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_cursor_with_other_ordering(self, auth_client):
+        """
+        Курсор другой сортировки той же длины не применяется к чужим колонкам
+        """
+        first = auth_client.get(self.url, {'pagination': 'cursor', 'limit': 4, 'ordering': '-created'}).json()
+        url = replace_query_param(first['next'], 'ordering', '-updated')
+        assert auth_client.get(url).status_code == status.HTTP_404_NOT_FOUND
+        assert auth_client.get(first['next']).status_code == status.HTTP_200_OK
@@ -0,0 +1,50 @@
+import pytest
+from django.db import connection
+
+from toDoListProject.goals.models import Board, BoardParticipant, Goal, GoalCategory, GoalComment
+
+
+@pytest.mark.django_db
+class TestVisibleTo:
+
+    @pytest.fixture(autouse=True)
+    def setup(self, board_participant, user, user_factory, category_factory, goal_factory):
+        self.board = board_participant.board
+        # Другие участники доски: при join'е по participants цели бы размножались
+        for role in (BoardParticipant.Role.writer, BoardParticipant.Role.reader):
+            BoardParticipant.objects.create(board=self.board, user=user_factory.create(), role=role)
+        self.category = category_factory.create(board=self.board, user=user)
+        self.goals = goal_factory.create_batch(3, category=self.category, user=user)
+        self.foreign_goal = goal_factory.create()
+
+    def test_goals_are_unique_and_scoped(self, user):
+        goals = list(Goal.objects.visible_to(user))
+        assert sorted(goal.id for goal in goals) == sorted(goal.id for goal in self.goals)
+
+    def test_every_model_is_scoped(self, user):
+        assert list(Board.objects.visible_to(user)) == [self.board]
+        assert list(GoalCategory.objects.visible_to(user)) == [self.category]
+        GoalComment.objects.create(goal=self.goals[0], user=user, text='text')
+        GoalComment.objects.create(goal=self.foreign_goal, user=user, text='text')
+        assert GoalComment.objects.visible_to(user).count() == 1
+
+    def test_deleted_and_archived_are_hidden(self, user):
+        self.goals[0].status = Goal.Status.archived
+        self.goals[0].save()
+        assert Goal.objects.visible_to(user).count() == 2
+        self.category.is_deleted = True
+        self.category.save()
+        assert not Goal.objects.visible_to(user).exists()
+        assert not GoalCategory.objects.visible_to(user).exists()
+
+    def test_access_is_checked_with_exists(self, user):
+        sql = str(Goal.objects.visible_to(user).query).upper()
+        assert 'EXISTS' in sql
+        assert sql.count('GOALS_BOARDPARTICIPANT') == 1
+
+    @pytest.mark.skipif(connection.vendor != 'postgresql', reason='Планы запросов проверяются только на PostgreSQL')
+    def test_access_check_uses_participant_index(self, user):
+        with connection.cursor() as cursor:
+            cursor.execute('SET enable_seqscan = off')
+        plan = Goal.objects.visible_to(user).explain()
+        assert 'goals_participant_access_idx' in plan or 'goals_boardparticipant_board_id_user_id' in plan
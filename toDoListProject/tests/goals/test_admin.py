@@ -0,0 +1,69 @@
+import pytest
+from django.urls import reverse
+
+from toDoListProject.goals.models import Goal, GoalComment
+from toDoListProject.goals.pagination import EstimatedCountPaginator
+
+
+@pytest.mark.django_db
+class TestGoalsAdmin:
+
+    @pytest.fixture(autouse=True)
+    def setup(self, client, user):
+        user.is_staff = user.is_superuser = True
+        user.save()
+        client.force_login(user)
+        self.user = user
+
+    def test_category_search_by_username(self, client, category_factory, user_factory):
+        author = user_factory.create(username='category_author')
+        category = category_factory.create(user=author, title='Работа')
+        category_factory.create(title='Дом')
+        response = client.get(reverse('admin:goals_goalcategory_changelist'), {'q': 'category_auth'})
+        assert [item.pk for item in response.context['cl'].result_list] == [category.pk]
+
+    def test_goal_changelist_queries_do_not_grow(self, client, django_assert_max_num_queries, goal_category,
+                                                 goal_factory):
+        url = reverse('admin:goals_goal_changelist')
+        goal_factory.create_batch(2, category=goal_category, user=self.user)
+        client.get(url)
+        with django_assert_max_num_queries(10) as few:
+            client.get(url)
+        goal_factory.create_batch(20, category=goal_category, user=self.user)
+        with django_assert_max_num_queries(len(few)):
+            response = client.get(url)
+        assert response.context['cl'].result_count == 22
+        assert response.context['cl'].full_result_count is None
+
+    def test_goal_changelist_filter(self, client, goal_category, goal_factory):
+        done = goal_factory.create(category=goal_category, user=self.user, status=Goal.Status.done)
+        goal_factory.create(category=goal_category, user=self.user, status=Goal.Status.to_do)
+        response = client.get(reverse('admin:goals_goal_changelist'), {'status__exact': Goal.Status.done})
+        assert [item.pk for item in response.context['cl'].result_list] == [done.pk]
+
+    def test_comment_changelist(self, client, goal):
+        comments = [GoalComment.objects.create(goal=goal, user=self.user, text=f'text {index}') for index in range(3)]
+        response = client.get(reverse('admin:goals_goalcomment_changelist'))
+        assert [item.pk for item in response.context['cl'].result_list] == [comment.pk for comment in comments[::-1]]
+
+
+class FixedEstimatePaginator(EstimatedCountPaginator):
+    exact_count_limit = 10
+    estimate = None
+
+    def estimate_count(self):
+        return self.estimate
+
+
+@pytest.mark.django_db
+class TestEstimatedCountPaginator:
+
+    @pytest.mark.parametrize('estimate, count', [(None, 3), (5, 3), (500, 500)])
+    def test_count(self, goal_category, goal_factory, estimate, count):
+        goal_factory.create_batch(3, category=goal_category, user=goal_category.user)
+        paginator = FixedEstimatePaginator(Goal.objects.order_by('-id'), 2)
+        paginator.estimate = estimate
+        assert paginator.count == count
+
+    def test_no_estimate_outside_postgresql(self, goal):
+        assert EstimatedCountPaginator(Goal.objects.order_by('-id'), 2).estimate_count() is None
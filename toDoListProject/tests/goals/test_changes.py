@@ -0,0 +1,190 @@
+import datetime
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import DatabaseError
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+
+from toDoListProject.goals import changes
+from toDoListProject.goals.archiving import run_archive_job
+from toDoListProject.goals.batch import bulk_change_goals
+from toDoListProject.goals.models import BoardArchiveJob, BoardParticipant, ChangeLogEntry, Goal, GoalComment
+
+
+@pytest.mark.django_db
+class TestChanges:
+    url = reverse('goals:changes')
+
+    @pytest.fixture(autouse=True)
+    def setup(self, settings, board_participant, user, category_factory, goal_factory):
+        settings.GOALS_CHANGES_LAG_SECONDS = 0
+        self.user = user
+        self.board = board_participant.board
+        self.category = category_factory.create(board=self.board, user=user)
+        self.goal = goal_factory.create(category=self.category, user=user, status=Goal.Status.to_do)
+        self.category_factory, self.goal_factory = category_factory, goal_factory
+
+    def changes(self, client, since=None, **params) -> dict:
+        response = client.get(self.url, {'since': since, **params} if since is not None else params)
+        assert response.status_code == status.HTTP_200_OK
+        return response.json()
+
+    def token(self, client) -> int:
+        result = self.changes(client)
+        assert result['changes'] == [] and not result['reset']
+        return result['next']
+
+    def test_changes_since_token(self, auth_client):
+        token = self.token(auth_client)
+        auth_client.patch(reverse('goals:goal', kwargs={'pk': self.goal.pk}), {'title': 'first'}, format='json')
+        auth_client.patch(reverse('goals:goal', kwargs={'pk': self.goal.pk}), {'title': 'second'}, format='json')
+        comment = GoalComment.objects.create(goal=self.goal, user=self.user, text='text')
+
+        result = self.changes(auth_client, token)
+        assert [(change['type'], change['id'], change['action']) for change in result['changes']] == [
+            ('goal', self.goal.pk, 'update'), ('comment', comment.pk, 'create'),
+        ]
+        assert result['changes'][0]['data']['title'] == 'second'
+        assert result['changes'][0]['board'] == self.board.pk
+        assert result['changes'][1]['data']['text'] == 'text'
+        assert result['next'] > token and not result['has_more']
+        assert self.changes(auth_client, result['next'])['changes'] == []
+
+    def test_archive_and_delete(self, auth_client):
+        token = self.token(auth_client)
+        auth_client.delete(reverse('goals:goal', kwargs={'pk': self.goal.pk}))
+        auth_client.delete(reverse('goals:category', kwargs={'pk': self.category.pk}))
+        comment = GoalComment.objects.create(goal=self.goal, user=self.user, text='text')
+        comment_id = comment.pk
+        comment.delete()
+        assert self.changes(auth_client, token)['changes'] == [
+            {'type': 'goal', 'id': self.goal.pk, 'board': self.board.pk, 'action': 'archive'},
+            {'type': 'category', 'id': self.category.pk, 'board': self.board.pk, 'action': 'archive'},
+            {'type': 'comment', 'id': comment_id, 'board': self.board.pk, 'action': 'delete'},
+        ]
+
+    def test_board_deletion(self, auth_client):
+        token = self.token(auth_client)
+        auth_client.delete(reverse('goals:board', kwargs={'pk': self.board.pk}))
+        run_archive_job(BoardArchiveJob.objects.get(board=self.board))
+        changes = self.changes(auth_client, token)['changes']
+        assert [(change['type'], change['action']) for change in changes] == [
+            ('board', 'archive'), ('goal', 'archive'), ('category', 'archive'),
+        ]
+
+    def test_scoped_to_user_boards(self, auth_client, goal_factory):
+        token = self.token(auth_client)
+        goal_factory.create(title='foreign')
+        result = self.changes(auth_client, token)
+        assert result['changes'] == []
+        # Метка сдвигается и по чужим изменениям
+        assert result['next'] > token
+
+    def test_goal_moved_to_foreign_board(self, auth_client, category_factory):
+        comment = GoalComment.objects.create(goal=self.goal, user=self.user, text='text')
+        token = self.token(auth_client)
+        self.goal.category = category_factory.create()
+        self.goal.save()
+        assert self.changes(auth_client, token)['changes'] == [
+            {'type': 'goal', 'id': self.goal.pk, 'board': self.board.pk, 'action': 'delete'},
+            {'type': 'comment', 'id': comment.pk, 'board': self.board.pk, 'action': 'delete'},
+        ]
+
+    def test_bulk_move(self, auth_client, category_factory):
+        comment = GoalComment.objects.create(goal=self.goal, user=self.user, text='text')
+        target = category_factory.create()
+        token = self.token(auth_client)
+        bulk_change_goals(Goal.objects.filter(pk=self.goal.pk), {'category': target})
+        assert self.changes(auth_client, token)['changes'] == [
+            {'type': 'goal', 'id': self.goal.pk, 'board': self.board.pk, 'action': 'delete'},
+            {'type': 'comment', 'id': comment.pk, 'board': self.board.pk, 'action': 'delete'},
+        ]
+        moved = ChangeLogEntry.objects.filter(board=target.board, id__gt=token)
+        assert set(moved.values_list('kind', 'object_id', 'action')) == {
+            (ChangeLogEntry.Kind.goal, self.goal.pk, ChangeLogEntry.Action.update),
+            (ChangeLogEntry.Kind.comment, comment.pk, ChangeLogEntry.Action.update),
+        }
+
+    def test_paging(self, auth_client):
+        token = self.token(auth_client)
+        goals = self.goal_factory.create_batch(3, category=self.category, user=self.user)
+        first = self.changes(auth_client, token, limit=2)
+        assert [change['id'] for change in first['changes']] == [goals[0].pk, goals[1].pk]
+        assert first['has_more']
+        second = self.changes(auth_client, first['next'], limit=2)
+        assert [change['id'] for change in second['changes']] == [goals[2].pk]
+        assert not second['has_more']
+
+    def test_bulk_paths(self, auth_client, user_factory):
+        token = self.token(auth_client)
+        bulk_change_goals(Goal.objects.filter(board=self.board), {'status': Goal.Status.archived})
+        member = user_factory.create()
+        auth_client.patch(reverse('goals:board', kwargs={'pk': self.board.pk}),
+                          {'participants': [{'user': member.username, 'role': BoardParticipant.Role.reader}]},
+                          format='json')
+        participant = BoardParticipant.objects.get(board=self.board, user=member)
+        changes = self.changes(auth_client, token)['changes']
+        assert [(change['type'], change['id'], change['action']) for change in changes] == [
+            ('goal', self.goal.pk, 'archive'), ('participant', participant.pk, 'create'),
+        ]
+        assert changes[1]['data']['user'] == member.username
+
+    def test_recent_changes_wait_for_lag(self, auth_client, settings):
+        token = self.token(auth_client)
+        settings.GOALS_CHANGES_LAG_SECONDS = 60
+        self.goal_factory.create(category=self.category, user=self.user)
+        assert self.changes(auth_client, token) == {'changes': [], 'next': token, 'has_more': False, 'reset': False}
+
+    def test_open_transaction_holds_back_changes(self, auth_client, monkeypatch):
+        token = self.token(auth_client)
+        # Транзакция, начатая до изменения, еще не завершена: ее записи с меньшими id могут появиться позже
+        started = timezone.now()
+        self.goal_factory.create(category=self.category, user=self.user)
+        monkeypatch.setattr(changes, 'oldest_write_transaction_start', lambda: started)
+        assert self.changes(auth_client, token) == {'changes': [], 'next': token, 'has_more': False, 'reset': False}
+        monkeypatch.setattr(changes, 'oldest_write_transaction_start', lambda: None)
+        assert len(self.changes(auth_client, token)['changes']) == 1
+
+    # Без обертки теста в транзакцию: сохранение цели – самая внешняя транзакция и откатывается целиком
+    @pytest.mark.django_db(transaction=True)
+    def test_failed_log_write_rolls_back_change(self, auth_client, monkeypatch):
+        def fail(*args, **kwargs):
+            raise DatabaseError('change log is unavailable')
+
+        monkeypatch.setattr(ChangeLogEntry.objects, 'bulk_create', fail)
+        with pytest.raises(DatabaseError):
+            auth_client.patch(reverse('goals:goal', kwargs={'pk': self.goal.pk}), {'title': 'lost'}, format='json')
+        self.goal.refresh_from_db()
+        assert self.goal.title != 'lost'
+
+    def test_compaction(self, auth_client):
+        token = self.token(auth_client)
+        for title in ('first', 'second', 'third'):
+            self.goal.title = title
+            self.goal.save()
+        ChangeLogEntry.objects.update(created=timezone.now() - datetime.timedelta(hours=2))
+        stdout = StringIO()
+        call_command('compact_changes', stdout=stdout)
+        # Создание и два первых изменения цели
+        assert 'схлопнуто: 3' in stdout.getvalue()
+        assert ChangeLogEntry.objects.filter(kind=ChangeLogEntry.Kind.goal, object_id=self.goal.pk).count() == 1
+        result = self.changes(auth_client, token)
+        assert [(change['id'], change['data']['title']) for change in result['changes']] == [
+            (self.goal.pk, 'third')
+        ]
+
+        ChangeLogEntry.objects.update(created=timezone.now() - datetime.timedelta(days=60))
+        call_command('compact_changes', stdout=StringIO())
+        # Самая новая запись остается, по ней видно, что журнал обрезан
+        assert ChangeLogEntry.objects.count() == 1
+        result = self.changes(auth_client, token)
+        assert result['reset'] and result['changes'] == []
+        assert not self.changes(auth_client, result['next'])['reset']
+
+    def test_invalid_params(self, auth_client, client):
+        assert auth_client.get(self.url, {'since': -1}).status_code == status.HTTP_400_BAD_REQUEST
+        client.logout()
+        assert client.get(self.url).status_code in (status.HTTP_401_UNAUTHORIZED, status.HTTP_403_FORBIDDEN)
@@ -0,0 +1,133 @@
+import time
+
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils.http import http_date
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from toDoListProject.goals.models import BoardParticipant
+from toDoListProject.goals.versions import board_version_key, user_version_key
+
+
+@pytest.mark.django_db
+class TestConditionalGet:
+
+    @pytest.fixture(autouse=True)
+    def setup(self, board_participant, user, category_factory, goal_factory):
+        self.board = board_participant.board
+        self.user = user
+        self.category = category_factory.create(board=self.board, user=user)
+        self.goal = goal_factory.create(category=self.category, user=user)
+
+    def test_not_modified_goal_list(self, auth_client):
+        url = reverse('goals:goal_list')
+        response = auth_client.get(url)
+        assert response.status_code == status.HTTP_200_OK
+        etag = response['ETag']
+
+        with CaptureQueriesContext(connection) as context:
+            response = auth_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        assert response['ETag'] == etag
+        # Список целей при 304 не запрашивается
+        assert not any('goals_goal' in query['sql'] for query in context.captured_queries)
+
+    def test_goal_change_invalidates_list(self, auth_client, goal_factory):
+        url = reverse('goals:goal_list')
+        etag = auth_client.get(url)['ETag']
+        goal_factory.create(category=self.category, user=self.user)
+        response = auth_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_200_OK
+        assert response['ETag'] != etag
+        assert len(response.data) == 2
+
+    def test_category_delete_invalidates_goal_list(self, auth_client):
+        url = reverse('goals:goal_list')
+        etag = auth_client.get(url)['ETag']
+        auth_client.delete(reverse('goals:category', kwargs={'pk': self.category.pk}))
+        response = auth_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data == []
+
+    def test_query_params_are_part_of_etag(self, auth_client):
+        url = reverse('goals:goal_list')
+        etag = auth_client.get(url)['ETag']
+        response = auth_client.get(url, {'search': 'nothing'}, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_200_OK
+
+    def test_if_modified_since(self, auth_client):
+        # Последнее изменение – несколько секунд назад
+        version = time.time_ns() // 1000 - 5_000_000
+        cache.set_many({board_version_key(self.board.pk): version, user_version_key(self.user.pk): version}, None)
+        url = reverse('goals:category_list')
+        response = auth_client.get(url)
+        assert response.status_code == status.HTTP_200_OK
+        response = auth_client.get(url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+    def test_no_last_modified_within_change_second(self, auth_client, goal_factory):
+        # Изменение в текущую секунду: If-Modified-Since по такой дате пропустил бы следующее изменение
+        version = (int(time.time()) + 1) * 1_000_000 - 1
+        cache.set_many({board_version_key(self.board.pk): version, user_version_key(self.user.pk): version}, None)
+        url = reverse('goals:goal_list')
+        response = auth_client.get(url)
+        assert 'Last-Modified' not in response
+        goal_factory.create(category=self.category, user=self.user)
+        response = auth_client.get(url, HTTP_IF_MODIFIED_SINCE=http_date(time.time()))
+        assert response.status_code == status.HTTP_200_OK
+
+    def test_disabled_with_process_local_cache(self, auth_client, settings):
+        settings.GOALS_ALLOW_LOCAL_CACHE = False
+        url = reverse('goals:goal_list')
+        response = auth_client.get(url)
+        assert response.status_code == status.HTTP_200_OK
+        assert 'ETag' not in response
+        assert auth_client.get(url, HTTP_IF_NONE_MATCH='*').status_code == status.HTTP_200_OK
+
+    def test_new_participant_gets_fresh_list(self, user_factory):
+        stranger = user_factory.create()
+        client = APIClient()
+        client.force_login(stranger)
+        url = reverse('goals:goal_list')
+        etag = client.get(url)['ETag']
+        BoardParticipant.objects.create(board=self.board, user=stranger, role=BoardParticipant.Role.reader)
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.data) == 1
+
+    def test_board_not_modified(self, auth_client):
+        url = reverse('goals:board', kwargs={'pk': self.board.pk})
+        etag = auth_client.get(url)['ETag']
+        assert auth_client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == status.HTTP_304_NOT_MODIFIED
+
+        auth_client.patch(url, data={'title': 'new'})
+        assert auth_client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == status.HTTP_200_OK
+
+    def test_board_of_other_user(self, user_factory):
+        stranger = user_factory.create()
+        client = APIClient()
+        client.force_login(stranger)
+        url = reverse('goals:board', kwargs={'pk': self.board.pk})
+        response = client.get(url, HTTP_IF_NONE_MATCH='*')
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+        assert 'ETag' not in response
+
+    def test_profile_edit_invalidates_list(self, auth_client):
+        # Автор цели выводится в списке: после изменения профиля старый ETag не подходит
+        url = reverse('goals:goal_list')
+        etag = auth_client.get(url)['ETag']
+        response = auth_client.patch(reverse('users:user_details'), {'first_name': 'Новое'}, format='json')
+        assert response.status_code == status.HTTP_200_OK
+        response = auth_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data[0]['user']['first_name'] == 'Новое'
+
+    def test_login_keeps_versions(self, auth_client):
+        url = reverse('goals:goal_list')
+        etag = auth_client.get(url)['ETag']
+        self.user.save(update_fields=['last_login'])
+        assert auth_client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == status.HTTP_304_NOT_MODIFIED
@@ -0,0 +1,79 @@
+import csv
+import gzip
+import io
+import json
+from io import StringIO
+
+import pytest
+from django.core.management import CommandError, call_command
+from django.urls import reverse
+from rest_framework import status
+
+from toDoListProject.goals.models import Goal, GoalComment
+
+
+@pytest.mark.django_db
+class TestGoalExport:
+    url = reverse('goals:export')
+
+    @pytest.fixture(autouse=True)
+    def setup(self, board_participant, user, category_factory, goal_factory):
+        self.board = board_participant.board
+        self.user = user
+        self.category = category_factory.create(board=self.board, user=user)
+        self.goals = goal_factory.create_batch(3, category=self.category, user=user, status=Goal.Status.to_do)
+        goal_factory.create(category=self.category, user=user, status=Goal.Status.archived)
+        self.comment = GoalComment.objects.create(goal=self.goals[0], user=user, text='comment')
+        # Чужая доска не должна попасть в выгрузку
+        self.other_goal = goal_factory.create()
+
+    @staticmethod
+    def read_ndjson(content: bytes) -> list:
+        return [json.loads(line) for line in content.decode().splitlines()]
+
+    def test_ndjson(self, auth_client):
+        response = auth_client.get(self.url, {'board': self.board.pk})
+        assert response.status_code == status.HTTP_200_OK
+        assert response.streaming
+        assert response['Content-Disposition'] == f'attachment; filename="board-{self.board.pk}.ndjson"'
+        records = self.read_ndjson(b''.join(response.streaming_content))
+
+        assert [record['type'] for record in records] == ['board', 'category', 'goal', 'goal', 'goal', 'comment']
+        assert [record['id'] for record in records if record['type'] == 'goal'] == [goal.pk for goal in self.goals]
+        goal = records[2]
+        assert goal['user'] == self.user.username
+        assert goal['category'] == self.category.pk
+        assert records[-1] == {
+            'type': 'comment', 'id': self.comment.pk, 'goal': self.goals[0].pk, 'text': 'comment',
+            'user': self.user.username, 'created': self.comment.created.isoformat()[:23] + 'Z',
+            'updated': self.comment.updated.isoformat()[:23] + 'Z',
+        }
+
+    def test_all_user_boards(self, auth_client):
+        response = auth_client.get(self.url)
+        goal_ids = {record['id'] for record in self.read_ndjson(b''.join(response.streaming_content))
+                    if record['type'] == 'goal'}
+        assert goal_ids == {goal.pk for goal in self.goals}
+
+    def test_csv_gzip(self, auth_client):
+        response = auth_client.get(self.url, {'board': self.board.pk, 'output': 'csv', 'gzip': 'true'})
+        assert response['Content-Type'] == 'application/gzip'
+        rows = list(csv.DictReader(io.StringIO(gzip.decompress(b''.join(response.streaming_content)).decode())))
+        assert [int(row['id']) for row in rows] == [goal.pk for goal in self.goals]
+        assert rows[0]['category_title'] == self.category.title
+
+    def test_other_board(self, auth_client):
+        response = auth_client.get(self.url, {'board': self.other_goal.board_id})
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    def test_command(self, tmp_path):
+        stdout = StringIO()
+        call_command('export_goals', '--user', self.user.username, stdout=stdout)
+        assert len(self.read_ndjson(stdout.getvalue().encode())) == 6
+
+        path = tmp_path / 'goals.csv.gz'
+        call_command('export_goals', '--board', self.board.pk, '--format', 'csv', '--gzip', '--output', str(path))
+        assert len(gzip.decompress(path.read_bytes()).decode().splitlines()) == 4
+
+        with pytest.raises(CommandError):
+            call_command('export_goals', '--board', self.board.pk, '--gzip')
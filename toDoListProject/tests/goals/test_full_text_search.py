@@ -0,0 +1,96 @@
+import pytest
+from django.db import connection
+from django.urls import reverse
+
+from toDoListProject.goals.models import Goal, GoalComment
+from toDoListProject.goals.search import install_search_indexes, search_queryset, search_terms
+
+
+@pytest.mark.django_db
+class TestFullTextSearch:
+    url = reverse('goals:goal_list')
+
+    @pytest.fixture(autouse=True)
+    def setup(self, board_participant, user, category_factory, goal_factory):
+        self.user = user
+        self.category = category_factory.create(board=board_participant.board, user=user, title='Отчеты')
+        self.in_title = goal_factory.create(category=self.category, user=user, status=Goal.Status.to_do,
+                                            title='Квартальный отчет', description='сдать в пятницу')
+        self.in_description = goal_factory.create(category=self.category, user=user, status=Goal.Status.to_do,
+                                                  title='Пятница', description='подготовить отчет для клиента')
+        self.other = goal_factory.create(category=self.category, user=user, status=Goal.Status.to_do,
+                                         title='Купить молоко', description=None)
+        # Цель с тем же словом на чужой доске
+        self.foreign = goal_factory.create(title='Чужой отчет')
+
+    def search(self, client, text, **params) -> list:
+        response = client.get(self.url, {'search': text, **params})
+        return [goal['id'] for goal in response.json()]
+
+    def test_terms(self):
+        assert search_terms('  Отчет, для-клиента!') == ['отчет', 'для', 'клиента']
+
+    def test_ranked_by_relevance(self, auth_client):
+        # Совпадение в названии весит больше, чем в описании
+        assert self.search(auth_client, 'отчет') == [self.in_title.pk, self.in_description.pk]
+
+    def test_prefix_and_all_terms(self, auth_client):
+        assert self.search(auth_client, 'кварт') == [self.in_title.pk]
+        assert self.search(auth_client, 'отчет клиен') == [self.in_description.pk]
+        assert self.search(auth_client, 'отчет молоко') == []
+
+    @pytest.mark.parametrize('text', ['!!!', '-'])
+    def test_query_without_words(self, auth_client, text):
+        # Запрос без слов не фильтрует список и не ломает сортировку по релевантности
+        response = auth_client.get(self.url, {'search': text})
+        assert response.status_code == 200
+        assert {goal['id'] for goal in response.json()} == {self.in_title.pk, self.in_description.pk, self.other.pk}
+        response = auth_client.get(reverse('goals:category_list'), {'search': text})
+        assert response.status_code == 200
+        assert [category['id'] for category in response.json()] == [self.category.pk]
+        response = auth_client.get(reverse('goals:search'), {'q': text})
+        assert response.status_code == 200
+        assert response.json() == {'results': [], 'timed_out': []}
+
+    def test_explicit_ordering(self, auth_client):
+        assert self.search(auth_client, 'пятниц', ordering='-title') == [self.in_description.pk, self.in_title.pk]
+
+    def test_cursor_pagination(self, auth_client):
+        response = auth_client.get(self.url, {'search': 'отчет', 'pagination': 'cursor', 'limit': 1})
+        assert [goal['id'] for goal in response.json()['results']] == [self.in_title.pk]
+
+    def test_index_follows_changes(self, auth_client):
+        self.other.title = 'Отчет о покупках'
+        self.other.save()
+        Goal.objects.filter(pk=self.in_description.pk).update(description='ничего')
+        assert set(self.search(auth_client, 'отчет')) == {self.in_title.pk, self.other.pk}
+
+        self.in_title.delete()
+        assert self.search(auth_client, 'отчет') == [self.other.pk]
+
+    def test_categories_and_comments(self, auth_client):
+        response = auth_client.get(reverse('goals:category_list'), {'search': 'отчет'})
+        assert [category['id'] for category in response.json()] == [self.category.pk]
+
+        comment = GoalComment.objects.create(goal=self.other, user=self.user, text='Нужно обезжиренное')
+        assert list(search_queryset(GoalComment.objects.all(), 'обезжир').values_list('id', flat=True)) == [comment.pk]
+
+    def test_admin_search(self, client, user):
+        user.is_staff = user.is_superuser = True
+        user.save()
+        client.force_login(user)
+        response = client.get(reverse('admin:goals_goal_changelist'), {'q': 'отчет'})
+        assert {goal.pk for goal in response.context['cl'].result_list} == {
+            self.in_title.pk, self.in_description.pk, self.foreign.pk
+        }
+
+    def test_lost_triggers_are_restored(self):
+        with connection.cursor() as cursor:
+            cursor.execute('DROP TRIGGER goals_goal_fts_insert')
+        Goal.objects.filter(pk=self.other.pk).delete()
+        goal = Goal.objects.create(category=self.category, user=self.user, board=self.category.board,
+                                   title='Годовой отчет', due_date=self.in_title.due_date)
+        assert not search_queryset(Goal.objects.all(), 'годовой').exists()
+
+        install_search_indexes(connection)
+        assert list(search_queryset(Goal.objects.all(), 'годовой').values_list('id', flat=True)) == [goal.pk]
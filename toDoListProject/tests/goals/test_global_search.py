@@ -0,0 +1,76 @@
+import pytest
+from django.urls import reverse
+from rest_framework import status
+
+from toDoListProject.goals.global_search import highlight
+from toDoListProject.goals.models import Goal, GoalComment
+
+
+@pytest.mark.django_db
+class TestGlobalSearch:
+    url = reverse('goals:search')
+
+    @pytest.fixture(autouse=True)
+    def setup(self, board_participant, board_participant_factory, user, category_factory, goal_factory):
+        self.user = user
+        self.category = category_factory.create(board=board_participant.board, user=user, title='Релиз')
+        self.goal = goal_factory.create(category=self.category, user=user, status=Goal.Status.to_do,
+                                        title='Подготовить релиз', description='Собрать <b>сборку</b> релиза')
+        self.comment = GoalComment.objects.create(goal=self.goal, user=user, text='Релиз перенесли на вторник')
+        # Вторая доска пользователя и чужая доска
+        other_board = board_participant_factory.create(user=user).board
+        self.second_goal = goal_factory.create(category=category_factory.create(board=other_board, user=user),
+                                               user=user, status=Goal.Status.in_progress, title='Релизные заметки')
+        self.foreign = goal_factory.create(title='Чужой релиз')
+
+    def search(self, client, **params) -> dict:
+        response = client.get(self.url, params)
+        assert response.status_code == status.HTTP_200_OK
+        return response.json()
+
+    def test_all_types_across_boards(self, auth_client):
+        results = self.search(auth_client, q='релиз')['results']
+        assert {(item['type'], item['id']) for item in results} == {
+            ('goal', self.goal.pk), ('goal', self.second_goal.pk), ('category', self.category.pk),
+            ('comment', self.comment.pk),
+        }
+        ranks = [item['rank'] for item in results]
+        assert ranks == sorted(ranks, reverse=True)
+
+        comment = next(item for item in results if item['type'] == 'comment')
+        assert comment['goal'] == self.goal.pk
+        assert comment['title'] == self.goal.title
+        assert comment['snippet'] == '<mark>Релиз</mark> перенесли на вторник'
+
+    def test_snippet_is_escaped(self, auth_client):
+        goal = next(item for item in self.search(auth_client, q='сборк', types='goal')['results'])
+        assert goal['snippet'] == 'Собрать &lt;b&gt;<mark>сборку</mark>&lt;/b&gt; релиза'
+
+    def test_snippet_falls_back_to_title(self, auth_client):
+        goal = next(item for item in self.search(auth_client, q='подготовить', types='goal')['results'])
+        # В описании слова нет – фрагмент из названия, а не начало описания
+        assert goal['snippet'] == '<mark>Подготовить</mark> релиз'
+
+    def test_types_and_limit(self, auth_client):
+        results = self.search(auth_client, q='релиз', types='goal', limit=1)['results']
+        assert len(results) == 1 and results[0]['type'] == 'goal'
+
+        response = auth_client.get(self.url, {'q': 'релиз', 'types': 'board'})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_empty_query(self, auth_client):
+        assert self.search(auth_client, q='!!!') == {'results': [], 'timed_out': []}
+        assert auth_client.get(self.url).status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_cached_until_boards_change(self, auth_client):
+        assert auth_client.get(self.url, {'q': 'вторник'})['X-Cache'] == 'MISS'
+        assert auth_client.get(self.url, {'q': 'вторник'})['X-Cache'] == 'HIT'
+        GoalComment.objects.create(goal=self.goal, user=self.user, text='Во вторник утром')
+        response = auth_client.get(self.url, {'q': 'вторник'})
+        assert response['X-Cache'] == 'MISS'
+        assert len(response.json()['results']) == 2
+
+    def test_highlight_window(self):
+        text = 'начало ' * 40 + 'релиз в конце'
+        snippet = highlight(text, ['релиз'], width=60)
+        assert snippet.startswith('…') and '<mark>релиз</mark>' in snippet
@@ -0,0 +1,148 @@
+import gzip
+import json
+from io import StringIO
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework import status
+
+from toDoListProject.goals.export import iter_export
+from toDoListProject.goals.importing import GoalImport, ImportCheckpoint, ImportRecord, read_ndjson
+from toDoListProject.goals.models import BoardParticipant, BoardSummary, Goal, GoalCategory, GoalComment
+
+CSV_CONTENT = (
+    'title,category_title,status,priority,due_date,user\n'
+    'first,Work,1,2,2030-01-01T00:00:00Z,\n'
+    'second,Home,3,4,2030-01-02T00:00:00Z,nobody\n'
+    'bad status,Work,9,2,2030-01-01T00:00:00Z,\n'
+    'no due date,Work,1,2,,\n'
+)
+
+
+@pytest.mark.django_db
+class TestGoalImport:
+
+    @pytest.fixture(autouse=True)
+    def setup(self, board_participant, user, board_factory, category_factory, goal_factory):
+        self.user = user
+        self.source = board_participant.board
+        categories = category_factory.create_batch(2, board=self.source, user=user)
+        self.goals = [goal_factory.create(category=categories[index % 2], user=user, status=Goal.Status.to_do)
+                      for index in range(5)]
+        for goal in self.goals[:3]:
+            GoalComment.objects.create(goal=goal, user=user, text=f'comment {goal.title}')
+        self.target = board_factory.create()
+        BoardParticipant.objects.create(board=self.target, user=user, role=BoardParticipant.Role.owner)
+        self.url = reverse('goals:board_import', kwargs={'pk': self.target.pk})
+
+    def export(self) -> str:
+        return ''.join(iter_export([self.source.pk]))
+
+    def assert_copied(self):
+        goals = Goal.objects.filter(board=self.target).order_by('id')
+        assert [goal.title for goal in goals] == [goal.title for goal in self.goals]
+        assert [goal.category.title for goal in goals] == [goal.category.title for goal in self.goals]
+        assert GoalCategory.objects.filter(board=self.target).count() == 2
+        comments = GoalComment.objects.filter(board=self.target).select_related('goal').order_by('id')
+        assert [(comment.goal.title, comment.text) for comment in comments] == [
+            (goal.title, f'comment {goal.title}') for goal in self.goals[:3]
+        ]
+        assert BoardSummary.objects.get(board=self.target).counts['total'] == 5
+
+    def test_command_round_trip(self, tmp_path):
+        path = tmp_path / 'board.ndjson'
+        path.write_text(self.export())
+        stdout = StringIO()
+        call_command('import_goals', str(path), '--board', self.target.pk, '--user', self.user.username,
+                     '--batch-size', 2, stdout=stdout)
+        assert 'целей 5' in stdout.getvalue()
+        self.assert_copied()
+        call_command('board_summary', stdout=StringIO())
+
+    def test_resume_from_checkpoint(self, tmp_path):
+        records = list(read_ndjson(StringIO(self.export())))
+        checkpoint = ImportCheckpoint(str(tmp_path / 'checkpoint'), self.target.pk)
+
+        def interrupted():
+            yield from records[:6]
+            raise RuntimeError('connection lost')
+
+        with pytest.raises(RuntimeError):
+            GoalImport(self.target, self.user, batch_size=3, checkpoint=checkpoint).run(interrupted())
+        assert Goal.objects.filter(board=self.target).count() == 4
+
+        report = GoalImport(self.target, self.user, batch_size=3, checkpoint=checkpoint).run(records)
+        assert report['created'] == {'category': 2, 'goal': 5, 'comment': 3}
+        self.assert_copied()
+
+    def test_uncommitted_checkpoint_is_dropped(self, tmp_path):
+        checkpoint = ImportCheckpoint(str(tmp_path / 'checkpoint'), self.target.pk)
+        checkpoint.save({'line': 10, 'last': ['goal', 10 ** 6], 'created': {'goal': 1}, 'errors': 0,
+                         'categories': {}, 'goals': {'1': 10 ** 6}})
+        assert checkpoint.load() == []
+
+    def test_upload_csv(self, auth_client):
+        upload = SimpleUploadedFile('goals.csv.gz', gzip.compress(CSV_CONTENT.encode()))
+        response = auth_client.post(self.url, {'file': upload})
+        assert response.status_code == status.HTTP_200_OK
+        report = response.json()
+        assert report['created'] == {'category': 2, 'goal': 2, 'comment': 0}
+        assert [error['line'] for error in report['errors']] == [4, 5]
+        assert set(report['errors'][0]['errors']) == {'status'}
+        assert set(report['errors'][1]['errors']) == {'due_date'}
+
+        goals = Goal.objects.filter(board=self.target).order_by('id')
+        assert [(goal.title, goal.category.title, goal.user_id) for goal in goals] == [
+            ('first', 'Work', self.user.pk), ('second', 'Home', self.user.pk)
+        ]
+
+    def test_upload_invalid_json(self, auth_client):
+        content = '{"type": "category", "id": 1, "title": "Work"}\nnot json\n{"type": "comment", "goal": 7, "text": "x"}\n'
+        response = auth_client.post(self.url, {'file': SimpleUploadedFile('board.ndjson', content.encode())})
+        report = response.json()
+        assert report['created'] == {'category': 1, 'goal': 0, 'comment': 0}
+        assert report['errors'] == [
+            {'line': 2, 'errors': {'non_field_errors': ['Invalid JSON']}},
+            {'line': 3, 'errors': {'goal': ['Unknown goal']}},
+        ]
+
+    def test_reader_cannot_import(self, auth_client):
+        BoardParticipant.objects.filter(board=self.target).update(role=BoardParticipant.Role.reader)
+        response = auth_client.post(self.url, {'file': SimpleUploadedFile('board.ndjson', json.dumps({}).encode())})
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    def test_upload_ignores_authors_from_file(self, auth_client, user_factory):
+        victim = user_factory.create(username='victim')
+        content = '\n'.join(json.dumps(record) for record in (
+            {'type': 'category', 'id': 1, 'title': 'Work', 'user': victim.username},
+            {'type': 'goal', 'id': 2, 'category': 1, 'title': 'goal', 'due_date': '2030-01-01T00:00:00Z',
+             'user': victim.username},
+        ))
+        response = auth_client.post(self.url, {'file': SimpleUploadedFile('board.ndjson', content.encode())})
+        assert response.json()['created'] == {'category': 1, 'goal': 1, 'comment': 0}
+        assert set(GoalCategory.objects.filter(board=self.target).values_list('user_id', flat=True)) == {self.user.pk}
+        assert set(Goal.objects.filter(board=self.target).values_list('user_id', flat=True)) == {self.user.pk}
+
+    def test_invalid_field_types_are_row_errors(self, tmp_path):
+        content = '\n'.join(json.dumps(record) for record in (
+            {'type': 'category', 'id': 1, 'title': 'Work', 'user': ['x']},
+            {'type': 'goal', 'title': 'goal', 'due_date': '2030-01-01T00:00:00Z', 'category_title': ['x']},
+            {'type': 'goal', 'title': 'goal', 'due_date': '2030-01-01T00:00:00Z', 'category_title': 'x' * 300},
+        ))
+        report = GoalImport(self.target, self.user).run(read_ndjson(StringIO(content)))
+        assert [(error['line'], set(error['errors'])) for error in report['errors']] == [
+            (1, {'user'}), (2, {'category_title'}), (3, {'category_title'}),
+        ]
+        assert not GoalCategory.objects.filter(board=self.target).exists()
+
+    @pytest.mark.parametrize('name, content', [
+        ('board.ndjson', b'\xff\xfe{"type": "category"}\n'),
+        ('board.ndjson.gz', b'\x1f\x8b' + b'\x00' * 20),
+        ('goals.csv', b'title\n"' + b'x' * 200000 + b'"\n'),
+    ])
+    def test_unreadable_file(self, auth_client, name, content):
+        response = auth_client.post(self.url, {'file': SimpleUploadedFile(name, content)})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert 'file' in response.json()
@@ -0,0 +1,48 @@
+import pytest
+from django.db import connection
+
+from toDoListProject.goals.models import Board, Goal, GoalCategory, ALIVE_GOAL
+
+
+@pytest.fixture
+def force_index_scan():
+    """
+    На пустых таблицах PostgreSQL предпочитает seq scan, поэтому для проверки плана он запрещается
+    """
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute('SET enable_seqscan = off')
+
+
+@pytest.mark.django_db
+class TestPartialIndexes:
+    querysets = {
+        'goals_board_alive_title_idx': (Board, lambda: Board.objects.alive().order_by('title')),
+        'goals_category_alive_idx': (
+            GoalCategory, lambda: GoalCategory.objects.alive().filter(board_id=1).order_by('title')
+        ),
+        'goals_goal_alive_idx': (
+            Goal, lambda: Goal.objects.filter(ALIVE_GOAL, board_id=1).order_by('title', 'created')
+        ),
+    }
+
+    @pytest.mark.parametrize('index_name', querysets.keys())
+    def test_index_exists(self, index_name):
+        """
+        Частичные индексы созданы миграциями на любой БД
+        """
+        model, _queryset = self.querysets[index_name]
+        with connection.cursor() as cursor:
+            constraints = connection.introspection.get_constraints(cursor, model._meta.db_table)
+        assert index_name in constraints
+
+    @pytest.mark.skipif(connection.vendor not in ('postgresql', 'sqlite'),
+                        reason='Проверка планов поддерживается только для PostgreSQL и SQLite')
+    @pytest.mark.parametrize('index_name', querysets.keys())
+    def test_alive_queries_use_partial_index(self, index_name, force_index_scan):
+        """
+        Фильтры «живых» строк в querysets совпадают с условиями индексов, и планировщик их использует
+        """
+        _model, queryset = self.querysets[index_name]
+        plan = queryset().explain()
+        assert index_name in plan
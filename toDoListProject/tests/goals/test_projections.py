@@ -0,0 +1,40 @@
+import pytest
+from django.urls import reverse
+from rest_framework import status
+
+from toDoListProject.goals.models import BoardParticipant, GoalComment
+from toDoListProject.goals.projections import ProjectionListMixin
+
+
+@pytest.mark.django_db
+class TestProjectionListResponses:
+
+    @pytest.fixture(autouse=True)
+    def setup(self, board_participant, user, user_factory, category_factory, goal_factory):
+        board = board_participant.board
+        BoardParticipant.objects.create(board=board, user=user_factory.create(), role=BoardParticipant.Role.reader)
+        category = category_factory.create(board=board, user=user)
+        goals = goal_factory.create_batch(5, category=category, user=user)
+        goals[0].description = None
+        goals[0].save()
+        for goal in goals[:2]:
+            GoalComment.objects.create(goal=goal, user=user, text='text')
+
+    @pytest.mark.parametrize('name, params', [
+        ('board_list', {}),
+        ('category_list', {}),
+        ('category_list', {'limit': 2, 'offset': 1}),
+        ('goal_list', {}),
+        ('goal_list', {'ordering': '-created', 'pagination': 'cursor', 'limit': 2}),
+        ('comment_list', {}),
+    ])
+    def test_response_is_byte_compatible(self, auth_client, monkeypatch, name, params):
+        """
+        Ответ, собранный из values(), совпадает побайтно с ответом ModelSerializer
+        """
+        url = reverse(f'goals:{name}')
+        response = auth_client.get(url, params)
+        monkeypatch.setattr(ProjectionListMixin, 'use_projection', False)
+        expected = auth_client.get(url, params)
+        assert response.status_code == expected.status_code == status.HTTP_200_OK
+        assert response.content == expected.content
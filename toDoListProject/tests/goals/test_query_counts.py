@@ -0,0 +1,78 @@
+import factory
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+
+from toDoListProject.goals.models import BoardParticipant, GoalComment
+
+
+# Размеры досок: (участников кроме владельца, целей, комментариев к цели).
+# Число запросов не должно зависеть от размера доски – иначе где-то появился N+1
+BOARD_SIZES = {'small': (2, 3, 1), 'large': (30, 120, 40)}
+
+
+@pytest.fixture(params=BOARD_SIZES.keys())
+def board_data(request, board_participant, user, user_factory, category_factory, goal_factory) -> dict:
+    participants, goals_count, comments_count = BOARD_SIZES[request.param]
+    board = board_participant.board
+    users = user_factory.create_batch(participants, username=factory.Sequence(lambda number: f'member{number}'))
+    roles = [BoardParticipant.Role.writer, BoardParticipant.Role.reader]
+    for number, participant in enumerate(users):
+        BoardParticipant.objects.create(board=board, user=participant, role=roles[number % 2])
+    category_factory.create_batch(goals_count // 10, board=board, user=users[0])
+    category = category_factory.create(board=board, user=user)
+    goals = [goal_factory.create(category=category, user=users[number % len(users)])
+             for number in range(goals_count)]
+    for number in range(comments_count):
+        comment = GoalComment.objects.create(goal=goals[0], user=users[number % len(users)], text='text')
+    return {'board': board, 'category': category, 'goal': goals[0], 'comment': comment}
+
+
+# (метод, имя url, kwargs url, тело запроса, ожидаемый статус, максимум запросов).
+# Два запроса из каждого лимита – сессия и пользователь при аутентификации, еще один – роль на доске,
+# если ее нет в кеше: дальше в пределах запроса роль берется из AccessContext.
+# Списки целей и категорий читают роли пользователя для ETag (см. ConditionalGetMixin).
+# Каждое изменение добавляет одну вставку в журнал изменений (ChangeLogEntry, после коммита)
+ENDPOINTS = [
+    ('get', 'board_list', {}, None, status.HTTP_200_OK, 4),
+    ('get', 'board', {'pk': 'board'}, None, status.HTTP_200_OK, 5),
+    ('patch', 'board', {'pk': 'board'}, {'title': 'new'}, status.HTTP_200_OK, 11),
+    ('get', 'category_list', {}, None, status.HTTP_200_OK, 4),
+    ('get', 'category', {'pk': 'category'}, None, status.HTTP_200_OK, 4),
+    ('patch', 'category', {'pk': 'category'}, {'title': 'new'}, status.HTTP_200_OK, 6),
+    ('post', 'create_category', {}, {'board': 'board', 'title': 'new'}, status.HTTP_201_CREATED, 6),
+    ('get', 'goal_list', {}, None, status.HTTP_200_OK, 4),
+    ('get', 'goal', {'pk': 'goal'}, None, status.HTTP_200_OK, 4),
+    ('patch', 'goal', {'pk': 'goal'}, {'title': 'new'}, status.HTTP_200_OK, 6),
+    ('get', 'comment_list', {}, None, status.HTTP_200_OK, 3),
+    ('post', 'create_comment', {}, {'goal': 'goal', 'text': 'new'}, status.HTTP_201_CREATED, 7),
+]
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('method, name, url_kwargs, data, expected_status, max_queries', ENDPOINTS)
+def test_endpoint_query_count(auth_client, board_data, django_assert_max_num_queries,
+                              method, name, url_kwargs, data, expected_status, max_queries):
+    """
+    Каждый endpoint укладывается в фиксированное число запросов к БД:
+    роль пользователя вычисляется не более одного раза за запрос
+    """
+    url = reverse(f'goals:{name}', kwargs={key: board_data[value].pk for key, value in url_kwargs.items()})
+    data = {key: board_data[value].pk if value in board_data else value for key, value in (data or {}).items()}
+    with django_assert_max_num_queries(max_queries):
+        response = getattr(auth_client, method)(url, data=data, format='json')
+    assert response.status_code == expected_status
+
+
+@pytest.mark.django_db
+def test_role_is_resolved_once_per_request(auth_client, board_data):
+    """
+    Проверка роли в view и в GoalCategoryCreateSerializer.validate_board – один запрос к участникам
+    """
+    with CaptureQueriesContext(connection) as context:
+        response = auth_client.post(reverse('goals:create_category'),
+                                    data={'board': board_data['board'].pk, 'title': 'new'})
+    assert response.status_code == status.HTTP_201_CREATED
+    assert len([query for query in context.captured_queries if 'goals_boardparticipant' in query['sql']]) == 1
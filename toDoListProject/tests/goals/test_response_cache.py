@@ -0,0 +1,101 @@
+from io import StringIO
+
+import pytest
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from toDoListProject.goals.models import BoardParticipant
+from toDoListProject.goals.response_cache import HIT, MISS, get_counters
+
+
+@pytest.mark.django_db
+class TestResponseCache:
+
+    @pytest.fixture(autouse=True)
+    def setup(self, board_participant, user, category_factory, goal_factory):
+        self.board = board_participant.board
+        self.user = user
+        self.category = category_factory.create(board=self.board, user=user)
+        self.goal = goal_factory.create(category=self.category, user=user)
+
+    def participant_client(self, user_factory, role) -> APIClient:
+        participant = user_factory.create()
+        BoardParticipant.objects.create(board=self.board, user=participant, role=role)
+        client = APIClient()
+        client.force_login(participant)
+        return client
+
+    def test_page_is_shared_between_participants(self, auth_client, user_factory):
+        url = reverse('goals:goal_list')
+        owner = self.participant_client(user_factory, BoardParticipant.Role.owner)
+        reader = self.participant_client(user_factory, BoardParticipant.Role.reader)
+
+        first = auth_client.get(url)
+        assert first['X-Cache'] == 'MISS'
+        with CaptureQueriesContext(connection) as context:
+            response = owner.get(url)
+        assert response.status_code == status.HTTP_200_OK
+        assert response['X-Cache'] == 'HIT'
+        assert response.json() == first.json()
+        assert not any('goals_goal' in query['sql'] for query in context.captured_queries)
+
+        # Роль на доске – часть ключа
+        assert reader.get(url)['X-Cache'] == 'MISS'
+
+    def test_write_invalidates_page(self, auth_client, goal_factory):
+        url = reverse('goals:goal_list')
+        auth_client.get(url)
+        assert auth_client.get(url)['X-Cache'] == 'HIT'
+
+        auth_client.patch(reverse('goals:goal', kwargs={'pk': self.goal.pk}), data={'title': 'renamed'})
+        response = auth_client.get(url)
+        assert response['X-Cache'] == 'MISS'
+        assert response.data[0]['title'] == 'renamed'
+
+    def test_board_delete_invalidates_page(self, auth_client):
+        url = reverse('goals:category_list')
+        assert len(auth_client.get(url).data) == 1
+        auth_client.delete(reverse('goals:board', kwargs={'pk': self.board.pk}))
+        assert auth_client.get(url).data == []
+
+    def test_params_are_normalized(self, auth_client):
+        url = reverse('goals:goal_list')
+        auth_client.get(url + '?ordering=title&search=a')
+        assert auth_client.get(url + '?search=a&ordering=title')['X-Cache'] == 'HIT'
+        assert auth_client.get(url + '?search=b&ordering=title')['X-Cache'] == 'MISS'
+
+    def test_counters(self, auth_client):
+        url = reverse('goals:category_list')
+        auth_client.get(url)
+        auth_client.get(url)
+        auth_client.get(url)
+        assert get_counters(['GoalCategoryListView']) == {'GoalCategoryListView': {HIT: 2, MISS: 1}}
+
+        out = StringIO()
+        call_command('response_cache_stats', '--reset', stdout=out)
+        assert 'GoalCategoryListView: попаданий 2, промахов 1' in out.getvalue()
+        assert get_counters(['GoalCategoryListView']) == {'GoalCategoryListView': {HIT: 0, MISS: 0}}
+
+    def test_disabled_with_process_local_cache(self, auth_client, settings):
+        settings.GOALS_ALLOW_LOCAL_CACHE = False
+        url = reverse('goals:category_list')
+        auth_client.get(url)
+        response = auth_client.get(url)
+        assert response.status_code == status.HTTP_200_OK
+        assert 'X-Cache' not in response
+        # Счетчики в памяти процесса команда не увидела бы
+        with pytest.raises(CommandError):
+            call_command('response_cache_stats', stdout=StringIO())
+
+    def test_profile_edit_invalidates_page(self, auth_client):
+        url = reverse('goals:goal_list')
+        assert auth_client.get(url)['X-Cache'] == 'MISS'
+        assert auth_client.get(url)['X-Cache'] == 'HIT'
+        auth_client.patch(reverse('users:user_details'), {'last_name': 'Новая'}, format='json')
+        response = auth_client.get(url)
+        assert response['X-Cache'] == 'MISS'
+        assert response.data[0]['user']['last_name'] == 'Новая'
@@ -0,0 +1,60 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from toDoListProject.goals.access import get_board_role
+from toDoListProject.goals.models import BoardParticipant
+
+
+def participant_queries(context: CaptureQueriesContext) -> list:
+    return [query['sql'] for query in context.captured_queries if 'goals_boardparticipant' in query['sql']]
+
+
+@pytest.mark.django_db
+class TestRoleCache:
+
+    @pytest.fixture(autouse=True)
+    def setup(self, board_participant, user, category_factory, goal_factory):
+        self.board = board_participant.board
+        self.goal = goal_factory.create(category=category_factory.create(board=self.board, user=user), user=user)
+
+    def test_role_is_cached_between_requests(self, auth_client):
+        """
+        Повторная проверка прав на изменение цели не обращается к таблице участников
+        """
+        url = reverse('goals:goal', kwargs={'pk': self.goal.pk})
+        auth_client.patch(url, data={'title': 'first'})
+        with CaptureQueriesContext(connection) as context:
+            response = auth_client.patch(url, data={'title': 'second'})
+        assert response.status_code == status.HTTP_200_OK
+        assert participant_queries(context) == []
+
+    def test_non_participant_is_cached_too(self, user_factory):
+        stranger = user_factory.create()
+        assert get_board_role(stranger.id, self.board.pk) is None
+        with CaptureQueriesContext(connection) as context:
+            assert get_board_role(stranger.id, self.board.pk) is None
+        assert context.captured_queries == []
+
+    def test_board_update_invalidates_roles(self, auth_client, user_factory):
+        """
+        После выдачи доступа через BoardSerializer.update новый участник сразу видит доску
+        """
+        reader = user_factory.create()
+        url = reverse('goals:board', kwargs={'pk': self.board.pk})
+        client = APIClient()
+        client.force_login(reader)
+        assert client.get(url).status_code == status.HTTP_403_FORBIDDEN
+
+        data = {'title': self.board.title, 'participants': [{'role': BoardParticipant.Role.reader,
+                                                              'user': reader.username}]}
+        response = auth_client.put(url, data=data, format='json')
+        assert response.status_code == status.HTTP_200_OK
+        assert client.get(url).status_code == status.HTTP_200_OK
+
+        response = auth_client.put(url, data={'title': self.board.title, 'participants': []}, format='json')
+        assert response.status_code == status.HTTP_200_OK
+        assert client.get(url).status_code == status.HTTP_403_FORBIDDEN
@@ -0,0 +1,64 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+
+
+@pytest.mark.django_db
+class TestSparseFieldsets:
+
+    @pytest.fixture(autouse=True)
+    def setup(self, board_participant, user, category_factory, goal_factory):
+        self.board = board_participant.board
+        self.category = category_factory.create(board=self.board, user=user)
+        self.goal = goal_factory.create(category=self.category, user=user)
+
+    def test_goal_list_fields(self, auth_client):
+        """
+        В списке целей остаются только запрошенные поля, а в SQL нет описания и join'а пользователя
+        """
+        with CaptureQueriesContext(connection) as context:
+            response = auth_client.get(reverse('goals:goal_list'), {'fields': 'id,title,status,due_date'})
+        assert response.status_code == status.HTTP_200_OK
+        assert list(response.json()[0].keys()) == ['id', 'title', 'status', 'due_date']
+        goal_query = [query['sql'] for query in context.captured_queries if 'FROM "goals_goal"' in query['sql']][0]
+        assert 'description' not in goal_query
+        assert 'core_user' not in goal_query
+
+    def test_goal_list_exclude(self, auth_client):
+        response = auth_client.get(reverse('goals:goal_list'), {'exclude': 'description,user'})
+        assert response.status_code == status.HTTP_200_OK
+        assert 'description' not in response.json()[0]
+        assert 'user' not in response.json()[0]
+        assert 'title' in response.json()[0]
+
+    def test_goal_detail_fields(self, auth_client):
+        response = auth_client.get(reverse('goals:goal', kwargs={'pk': self.goal.pk}), {'fields': 'id,user'})
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == {'id': self.goal.pk, 'user': {
+            'id': self.goal.user.id, 'username': self.goal.user.username, 'first_name': self.goal.user.first_name,
+            'last_name': self.goal.user.last_name, 'email': self.goal.user.email,
+        }}
+
+    def test_board_detail_without_participants(self, auth_client):
+        with CaptureQueriesContext(connection) as context:
+            response = auth_client.get(reverse('goals:board', kwargs={'pk': self.board.pk}), {'fields': 'id,title'})
+        assert response.json() == {'id': self.board.pk, 'title': self.board.title}
+        # Участники не запрошены – prefetch не выполняется (остается только проверка роли)
+        assert not [query for query in context.captured_queries
+                    if query['sql'].startswith('SELECT "goals_boardparticipant"."id"')]
+
+    def test_cursor_pagination_with_sparse_fields(self, auth_client, goal_factory, user):
+        goal_factory.create_batch(3, category=self.category, user=user)
+        response = auth_client.get(reverse('goals:goal_list'), {'fields': 'status', 'pagination': 'cursor',
+                                                                'limit': 2})
+        second = auth_client.get(response.json()['next'])
+        assert second.status_code == status.HTTP_200_OK
+        assert len(response.json()['results']) == len(second.json()['results']) == 2
+
+    @pytest.mark.parametrize('params', [{'fields': 'id,unknown'}, {'exclude': 'password'}])
+    def test_unknown_fields_are_rejected(self, auth_client, params):
+        response = auth_client.get(reverse('goals:goal_list'), params)
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert set(response.json().keys()) == set(params.keys())